@@ -2,7 +2,7 @@
 CourseCompanion - Configuration Settings
 """
 import os
-from typing import List
+from typing import Dict, List
 from pydantic_settings import BaseSettings
 from functools import lru_cache
 
@@ -53,8 +53,52 @@ class Settings(BaseSettings):
     RAG_CHUNK_OVERLAP: int = 200
     RAG_TOP_K: int = 5
     
+    # Reranking (optional CPU-only second stage over first-stage candidates)
+    RAG_RERANK_ENABLED: bool = False
+    RAG_RERANK_CANDIDATES: int = 20
+    RAG_RERANK_TIMEOUT_MS: float = 50.0  # Falls back to first-stage order when exceeded
+    RAG_RERANK_MODULE_PRIORS: Dict[int, float] = {}  # module number -> prior weight (0-1)
+    
+    # Answer Cache (per-course cache for near-duplicate chat questions)
+    ANSWER_CACHE_ENABLED: bool = True
+    ANSWER_CACHE_TTL_SECONDS: int = 3600
+    ANSWER_CACHE_MAX_ENTRIES: int = 500  # Per course
+    ANSWER_CACHE_SIMILARITY_THRESHOLD: float = 0.9
+    
+    # Fake LLM (deterministic local token stream used until a real model is wired in)
+    FAKE_LLM_TOKEN_DELAY_MS: float = 0.0
+    FAKE_LLM_LATENCY_MS: float = 0.0  # Per-call latency of the fake gateway backend
+    
+    # LLM Gateway (shared access to chat model deployments)
+    LLM_GATEWAY_BACKEND: str = "fake"  # "fake" or "openai" (ignored in MOCK_MODE)
+    LLM_GATEWAY_MAX_CONCURRENCY: int = 8  # In-flight calls per deployment
+    LLM_GATEWAY_MAX_QUEUE: int = 256  # Waiting calls per deployment before rejecting
+    
+    # Conversation Memory (server-side session history)
+    CONVERSATION_TOKEN_BUDGET: int = 2000  # Summary + recent messages sent to the model
+    CONVERSATION_SUMMARY_TOKENS: int = 300
+    CONVERSATION_WINDOW_MESSAGES: int = 12
+    
+    # Quiz bulk import (/quiz/submit/bulk)
+    QUIZ_BULK_BATCH_SIZE: int = 1000  # Submissions scored and persisted together
+    QUIZ_BULK_MAX_LINE_BYTES: int = 65536  # Longer NDJSON lines are rejected
+    
+    # Results leaderboard
+    LEADERBOARD_SIZE: int = 100  # Top entries kept per course
+    
+    # Adaptive quiz (/quiz/adaptive/*)
+    ADAPTIVE_QUIZ_SE_THRESHOLD: float = 0.5  # Stop once the ability standard error is below this
+    ADAPTIVE_QUIZ_MIN_SE_REDUCTION: float = 0.03  # Stop once the next question would lower the SE by less (ends the 4-5 question banks after ~3.5 items)
+    ADAPTIVE_QUIZ_MAX_ITEMS: int = 20  # Hard cap on questions per adaptive session
+    ADAPTIVE_QUIZ_SESSION_TTL_HOURS: float = 24  # Sessions not answered for this long are deleted
+    
     # Discovery Agent
     MAX_DISCOVERY_TURNS: int = 5
+    DISCOVERY_FUZZY_MATCHING: bool = True  # Typo-tolerant role/interest keywords
+    DISCOVERY_SEMANTIC_ENABLED: bool = True  # Blend course-embedding similarity into keyword matching
+    DISCOVERY_SEMANTIC_WEIGHT: float = 3.0  # Score added for a cosine similarity of 1.0
+    DISCOVERY_SEMANTIC_MIN_SIMILARITY: float = 0.3
+    DISCOVERY_SEMANTIC_TOP_K: int = 10
     
     class Config:
         env_file = ".env"
@@ -1,13 +1,17 @@
 """
 CourseCompanion - FastAPI Backend Main Entry Point
 """
-from fastapi import FastAPI
+from fastapi import FastAPI, Query
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
+from typing import List, Optional
 
 from config import settings
-from models.local_storage import initialize_storage, close_storage
-from routers import discovery, chat, notes, artifacts, quiz
+from models.local_storage import initialize_storage, close_storage, get_passed_courses_sync
+from routers import discovery, chat, notes, artifacts, quiz, review
+from services.course_search import get_course_search_index
+from services.learning_path import get_prerequisite_graph
+from services.llm_gateway import get_llm_gateway
 
 
 @asynccontextmanager
@@ -17,6 +21,7 @@ async def lifespan(app: FastAPI):
     await initialize_storage()
     yield
     # Shutdown
+    await get_llm_gateway().close()
     await close_storage()
 
 
@@ -43,6 +48,7 @@ app.include_router(chat.router, prefix="/api", tags=["Chat"])
 app.include_router(notes.router, prefix="/api", tags=["Notes"])
 app.include_router(artifacts.router, prefix="/api", tags=["Artifacts"])
 app.include_router(quiz.router, prefix="/api", tags=["Quiz"])
+app.include_router(review.router, prefix="/api", tags=["Review"])
 
 
 @app.get("/")
@@ -70,40 +76,47 @@ async def health_check():
     }
 
 
+@app.get("/api/llm/metrics")
+async def llm_metrics():
+    """LLM gateway queue depth, wait time and latency per deployment"""
+    return get_llm_gateway().metrics()
+
+
 # Course endpoints (simple CRUD - not in separate router for simplicity)
 @app.get("/api/courses")
 async def get_courses():
     """Get all available courses"""
-    # Mock data - in production, fetch from MongoDB
-    return [
-        {
-            "course_id": "xm-cloud-101",
-            "title": "XM Cloud Fundamentals",
-            "description": "Learn the basics of XM Cloud architecture and implementation",
-            "difficulty": "Beginner",
-            "duration": "4 hours",
-            "modules": 5,
-            "topics": ["architecture", "development", "deployment"]
-        },
-        {
-            "course_id": "search-fundamentals",
-            "title": "Sitecore Search Fundamentals",
-            "description": "Master Sitecore Search configuration and optimization",
-            "difficulty": "Intermediate",
-            "duration": "3 hours",
-            "modules": 4,
-            "topics": ["indexing", "facets", "optimization"]
+    return get_course_search_index().summaries
+
+
+@app.get("/api/courses/search")
+async def search_courses(
+    q: Optional[str] = None,
+    difficulty: Optional[List[str]] = Query(None),
+    role: Optional[List[str]] = Query(None),
+    topic: Optional[List[str]] = Query(None),
+    duration: Optional[List[str]] = Query(None, description="short (<3h), medium (3-5h), long (5h+)"),
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0)
+):
+    """
+    Search the course catalog with facet filters.
+
+    Repeat a filter parameter to select several values (OR within a facet,
+    AND across facets). Facet counts for each dimension ignore that
+    dimension's own selection.
+    """
+    return get_course_search_index().search(
+        query=q,
+        filters={
+            "difficulty": difficulty,
+            "role": role,
+            "topic": topic,
+            "duration": duration
         },
-        {
-            "course_id": "content-hub-101",
-            "title": "Content Hub Basics",
-            "description": "Introduction to Sitecore Content Hub DAM and CMP",
-            "difficulty": "Beginner",
-            "duration": "5 hours",
-            "modules": 6,
-            "topics": ["dam", "cmp", "workflows", "integration"]
-        }
-    ]
+        limit=limit,
+        offset=offset
+    )
 
 
 @app.get("/api/courses/{course_id}")
@@ -184,6 +197,52 @@ async def get_user_progress(user_id: str):
     }
 
 
+def _completed_courses(user_id: str, completed: Optional[List[str]]) -> List[str]:
+    """Courses with any passed quiz attempt, plus any listed explicitly"""
+    return get_passed_courses_sync(user_id) + (completed or [])
+
+
+@app.get("/api/users/{user_id}/learning-path/{course_id}")
+async def get_learning_path(
+    user_id: str,
+    course_id: str,
+    completed: Optional[List[str]] = Query(None)
+):
+    """
+    Shortest learning path to a target course.
+    
+    Lists every course still needed (missing prerequisites, then the target)
+    in an order that respects prerequisites. Courses with a passed quiz and
+    any `completed` course ids count as done.
+    """
+    graph = get_prerequisite_graph()
+    done = _completed_courses(user_id, completed)
+    steps = graph.path_to(course_id, graph.mask(done))
+    
+    if steps is None:
+        from fastapi import HTTPException
+        raise HTTPException(status_code=404, detail="Course not found")
+    
+    return {
+        "user_id": user_id,
+        "target": course_id,
+        "completed": course_id in done,
+        "steps": [{"step": i, **course} for i, course in enumerate(steps, start=1)]
+    }
+
+
+@app.get("/api/users/{user_id}/next-courses")
+async def get_next_courses(user_id: str, completed: Optional[List[str]] = Query(None)):
+    """
+    Courses the user can take next (all prerequisites completed).
+    """
+    graph = get_prerequisite_graph()
+    return {
+        "user_id": user_id,
+        "courses": graph.next_unlocked(graph.mask(_completed_courses(user_id, completed)))
+    }
+
+
 @app.post("/api/users/{user_id}/enroll")
 async def enroll_user(user_id: str, course_ids: list):
     """Enroll user in selected courses"""
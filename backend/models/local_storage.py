@@ -4,17 +4,28 @@ Uses JSON files for data persistence and FAISS for vector embeddings
 """
 import os
 import json
-from typing import Optional, List, Dict, Any
+import re
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Optional, List, Dict, Any, Iterable, Iterator, Tuple
 from datetime import datetime
 import logging
 from pathlib import Path
 
+try:
+    import fcntl
+except ImportError:
+    fcntl = None  # Not available on Windows; appends then rely on O_APPEND alone
+
 logger = logging.getLogger(__name__)
 
 # Storage directory paths
 BASE_DIR = Path(__file__).parent.parent.parent
 DATA_DIR = BASE_DIR / "data" / "storage"
 EMBEDDINGS_DIR = DATA_DIR / "embeddings"
+COURSE_CATALOG_FILE = BASE_DIR / "data" / "courses" / "course_catalog.json"  # Bundled catalog
 
 # Ensure directories exist
 DATA_DIR.mkdir(parents=True, exist_ok=True)
@@ -24,12 +35,23 @@ EMBEDDINGS_DIR.mkdir(parents=True, exist_ok=True)
 USERS_FILE = DATA_DIR / "users.json"
 COURSES_FILE = DATA_DIR / "courses.json"
 KNOWLEDGE_BASE_FILE = DATA_DIR / "knowledge_base.json"
-CONVERSATIONS_FILE = DATA_DIR / "conversations.json"
-QUIZ_RESULTS_FILE = DATA_DIR / "quiz_results.json"
+CONVERSATIONS_FILE = DATA_DIR / "conversations.json"  # Legacy single-file store, migrated to CONVERSATIONS_DIR
+CONVERSATIONS_DIR = DATA_DIR / "conversations"  # One file per conversation session
+QUIZ_RESULTS_FILE = DATA_DIR / "quiz_results.json"  # Legacy latest-result map, migrated to the attempt log
+QUIZ_ATTEMPTS_FILE = DATA_DIR / "quiz_attempts.jsonl"
+QUIZ_ANALYTICS_FILE = DATA_DIR / "quiz_analytics.json"  # Snapshot of the folded analytics log
+QUIZ_ANALYTICS_LOG_FILE = DATA_DIR / "quiz_analytics.jsonl"
+QUIZ_LEADERBOARDS_FILE = DATA_DIR / "quiz_leaderboards.json"  # Snapshot of the boards folded from the attempt log
+REVIEW_CARDS_FILE = DATA_DIR / "review_cards.jsonl"
+ADAPTIVE_SESSIONS_DIR = DATA_DIR / "adaptive_sessions"  # One file per adaptive quiz in progress
 NOTES_FILE = DATA_DIR / "notes.json"
 ARTIFACTS_FILE = DATA_DIR / "artifacts.json"
 
 
+# Session ids that map to a file name (generated hex ids and legacy user_course_timestamp ids)
+_SESSION_ID_PATTERN = re.compile(r"\w[\w.-]*")
+
+
 # ==================== Helper Functions ====================
 
 def _load_json(file_path: Path) -> Dict:
@@ -57,12 +79,53 @@ def _save_json(file_path: Path, data: Dict):
         raise
 
 
+def _session_file(directory: Path, session_id: str) -> Optional[Path]:
+    """File for a client-supplied session id, or None if the id could escape the directory"""
+    if not session_id or not _SESSION_ID_PATTERN.fullmatch(session_id):
+        return None
+    return directory / f"{session_id}.json"
+
+
+def get_file_version(file_path: Path) -> str:
+    """Cheap version stamp for a storage file (changes whenever the file is rewritten)"""
+    try:
+        stat = file_path.stat()
+    except FileNotFoundError:
+        return "missing"
+    return f"{stat.st_mtime_ns}:{stat.st_size}"
+
+
+def get_courses_version_sync() -> str:
+    """Version stamp of the course catalog in storage"""
+    return get_file_version(COURSES_FILE)
+
+
 def load_courses_sync() -> List[Dict]:
     """Load all courses (sync helper for services)"""
     courses = _load_json(COURSES_FILE)
     return list(courses.values())
 
 
+def get_course_catalog_version_sync() -> str:
+    """Combined version stamp of the storage courses and the bundled catalog file"""
+    return f"{get_courses_version_sync()}|{get_file_version(COURSE_CATALOG_FILE)}"
+
+
+def load_bundled_catalog_sync() -> List[Dict]:
+    """Courses from the bundled catalog file (data/courses/course_catalog.json)"""
+    try:
+        with open(COURSE_CATALOG_FILE, "r", encoding="utf-8") as f:
+            return json.load(f).get("courses", [])
+    except (FileNotFoundError, json.JSONDecodeError):
+        logger.warning(f"Course catalog not available: {COURSE_CATALOG_FILE}")
+        return []
+
+
+def load_course_catalog_sync() -> List[Dict]:
+    """Courses from storage, falling back to the bundled catalog file"""
+    return load_courses_sync() or load_bundled_catalog_sync()
+
+
 def load_courses_map_sync() -> Dict:
     """Load courses as a map keyed by course_id"""
     return _load_json(COURSES_FILE)
@@ -79,6 +142,11 @@ def load_knowledge_base_map_sync() -> Dict:
     return _load_json(KNOWLEDGE_BASE_FILE)
 
 
+def get_knowledge_base_version_sync() -> str:
+    """Version stamp of the knowledge base in storage"""
+    return get_file_version(KNOWLEDGE_BASE_FILE)
+
+
 def load_course_chunks_sync(course_id: str, limit: Optional[int] = None) -> List[Dict]:
     """Load knowledge base chunks for a course (sync helper for services)"""
     knowledge_base = _load_json(KNOWLEDGE_BASE_FILE)
@@ -98,6 +166,128 @@ def save_knowledge_base_map_sync(knowledge_base_map: Dict):
     _save_json(KNOWLEDGE_BASE_FILE, knowledge_base_map)
 
 
+def _is_source_chunk(chunk: Dict, course_id: str, source_id: str) -> bool:
+    """Whether a chunk (or vector document) came from one ingested source"""
+    if chunk.get("course_id") != course_id:
+        return False
+    if "source_id" in chunk:
+        return chunk["source_id"] == source_id
+    # Chunks ingested before source_id was stored: "{course_id}-{source_id}-00001"
+    prefix = f"{course_id}-{source_id}-"
+    chunk_id = chunk.get("chunk_id") or ""
+    return chunk_id.startswith(prefix) and chunk_id[len(prefix):].isdigit()
+
+
+def _iter_json_object(file_path: Path, read_size: int = 65536) -> Iterator[Tuple[str, Any]]:
+    """
+    Stream the members of a top-level JSON object without loading the file.
+
+    Raises:
+        ValueError: If the file isn't a well-formed JSON object
+    """
+    if not file_path.exists() or file_path.stat().st_size == 0:
+        return
+    decoder = json.JSONDecoder()
+    with open(file_path, "r", encoding="utf-8") as f:
+        buffer, position, eof = "", 0, False
+
+        def read_more() -> bool:
+            nonlocal buffer, position, eof
+            data = f.read(read_size)
+            eof = not data
+            buffer, position = buffer[position:] + data, 0
+            return not eof
+
+        def next_char() -> str:
+            nonlocal position
+            while True:
+                while position < len(buffer) and buffer[position].isspace():
+                    position += 1
+                if position < len(buffer):
+                    return buffer[position]
+                if not read_more():
+                    raise ValueError(f"Unexpected end of {file_path.name}")
+
+        def next_value() -> Any:
+            nonlocal position
+            next_char()
+            while True:
+                try:
+                    value, end = decoder.raw_decode(buffer, position)
+                    # A value ending exactly at the buffer end may continue (e.g. a number)
+                    if end < len(buffer) or eof:
+                        position = end
+                        return value
+                except json.JSONDecodeError:
+                    if eof:
+                        raise ValueError(f"Malformed JSON in {file_path.name}")
+                read_more()
+
+        if next_char() != "{":
+            raise ValueError(f"{file_path.name} is not a JSON object")
+        position += 1
+        if next_char() == "}":
+            return
+        while True:
+            key = next_value()
+            if next_char() != ":":
+                raise ValueError(f"Malformed JSON in {file_path.name}")
+            position += 1
+            yield key, next_value()
+            separator = next_char()
+            position += 1
+            if separator == "}":
+                return
+            if separator != ",":
+                raise ValueError(f"Malformed JSON in {file_path.name}")
+
+
+def replace_knowledge_source_sync(course_id: str, source_id: str, chunks: Iterable[Dict]) -> int:
+    """
+    Replace every chunk of one ingested source with a new set.
+
+    The store is streamed into a temporary file, one chunk at a time:
+    existing chunks minus the source's old ones, then the new chunks, so
+    memory doesn't grow with the size of the store or of the source. The
+    file then replaces the store atomically (under its lock, so concurrent
+    ingestions don't drop each other's chunks), and readers see either the
+    old or the new chunks of the source, never a mix.
+
+    Args:
+        course_id: Course the source belongs to
+        source_id: Ingested source identifier
+        chunks: New chunks for the source (consumed lazily)
+
+    Returns:
+        Number of old chunks removed
+    """
+    def member(chunk_id: str, chunk: Dict) -> str:
+        # Same layout as json.dump(..., indent=2) of the whole map
+        body = json.dumps(chunk, indent=2, ensure_ascii=False).replace("\n", "\n  ")
+        return f"  {json.dumps(chunk_id, ensure_ascii=False)}: {body}"
+
+    removed = 0
+    written = 0
+    temp_file = KNOWLEDGE_BASE_FILE.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+    with _locked_log(KNOWLEDGE_BASE_FILE):
+        with open(temp_file, "w", encoding="utf-8") as f:
+            f.write("{")
+            for chunk_id, chunk in _iter_json_object(KNOWLEDGE_BASE_FILE):
+                if _is_source_chunk(chunk, course_id, source_id):
+                    removed += 1
+                    continue
+                f.write(("," if written else "") + "\n" + member(chunk_id, chunk))
+                written += 1
+            for chunk in chunks:
+                f.write(("," if written else "") + "\n" + member(chunk["chunk_id"], chunk))
+                written += 1
+            f.write("\n}" if written else "}")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_file, KNOWLEDGE_BASE_FILE)
+    return removed
+
+
 # ==================== Initialization ====================
 
 async def initialize_storage():
@@ -120,6 +310,9 @@ async def initialize_storage():
             _save_json(file_path, default_data)
             logger.info(f"Created {file_path.name}")
     
+    _migrate_legacy_quiz_results()
+    _migrate_legacy_conversations()
+    
     logger.info("Local storage initialized successfully")
 
 
@@ -264,25 +457,470 @@ async def find_conversation(user_id: str, course_id: str = None, session_id: str
     return None
 
 
+# Server-side conversation memory keeps one file per session under
+# conversations/, replaced atomically on every turn, so a turn costs the
+# same however many sessions exist and concurrent turns on different
+# sessions never touch the same file.
+
+def _migrate_legacy_conversations():
+    """Move sessions from the old single conversations.json into per-session files"""
+    legacy = _load_json(CONVERSATIONS_FILE)
+    if not legacy:
+        return
+    migrated = 0
+    for session_id, conversation in legacy.items():
+        file_path = _session_file(CONVERSATIONS_DIR, session_id)
+        if file_path is None or file_path.exists():
+            continue
+        CONVERSATIONS_DIR.mkdir(parents=True, exist_ok=True)
+        _save_snapshot(file_path, conversation)
+        migrated += 1
+    # Emptied so sessions deleted later aren't migrated back on the next start
+    _save_json(CONVERSATIONS_FILE, {})
+    logger.info(f"Migrated {migrated} conversations to {CONVERSATIONS_DIR.name}/")
+
+
+def load_conversation_sync(session_id: str) -> Optional[Dict]:
+    """Load a conversation by session_id (sync helper for services)"""
+    file_path = _session_file(CONVERSATIONS_DIR, session_id)
+    if file_path is None or not file_path.exists():
+        return None
+    return _load_json(file_path) or None
+
+
+def save_conversation_sync(conversation_data: Dict):
+    """Upsert a conversation keyed by its session_id (written atomically)"""
+    file_path = _session_file(CONVERSATIONS_DIR, conversation_data["session_id"])
+    if file_path is None:
+        raise ValueError(f"Invalid conversation session id: {conversation_data['session_id']!r}")
+    conversation_data.setdefault("created_at", datetime.utcnow().isoformat())
+    conversation_data["updated_at"] = datetime.utcnow().isoformat()
+    CONVERSATIONS_DIR.mkdir(parents=True, exist_ok=True)
+    _save_snapshot(file_path, conversation_data)
+
+
+def delete_conversation_sync(session_id: str) -> bool:
+    """Delete a conversation by session_id"""
+    file_path = _session_file(CONVERSATIONS_DIR, session_id)
+    if file_path is None:
+        return False
+    try:
+        file_path.unlink()
+    except FileNotFoundError:
+        return False
+    return True
+
+
 # ==================== Quiz Results Operations ====================
+#
+# Every submission is appended as one JSON line to quiz_attempts.jsonl and
+# never rewritten. Each process keeps an index over the log,
+#   user_id -> course_id -> {"offsets": [byte offsets], "latest": record,
+#                            "ever_passed": bool},
+# and tails lines appended by other workers on the next read (one stat()
+# when nothing changed). "latest" and "ever_passed" only track full quiz
+# attempts; attempts saved with another "mode" (e.g. partial adaptive
+# quizzes) are history only.
+
+_attempt_index_lock = threading.Lock()
+_attempt_index: Dict[str, Any] = {"offset": 0, "users": {}}
+
+
+def _index_attempt(record: Dict, offset: int):
+    courses = _attempt_index["users"].setdefault(record["user_id"], {})
+    entry = courses.setdefault(record["course_id"], {"offsets": [], "latest": None, "ever_passed": False})
+    entry["offsets"].append(offset)
+    if record.get("mode", "standard") == "standard":
+        entry["latest"] = record
+        entry["ever_passed"] = entry["ever_passed"] or bool(record.get("passed"))
+
+
+def _migrate_legacy_quiz_results():
+    """Seed the attempt log from the old one-result-per-key quiz_results.json"""
+    legacy = _load_json(QUIZ_RESULTS_FILE)
+    if legacy and not QUIZ_ATTEMPTS_FILE.exists():
+        _append_attempt_lines(list(legacy.values()))
+        logger.info(f"Migrated {len(legacy)} quiz results to {QUIZ_ATTEMPTS_FILE.name}")
+
+
+def _refresh_attempt_index():
+    """Index attempts appended since the last read (caller holds the lock)"""
+    try:
+        size = QUIZ_ATTEMPTS_FILE.stat().st_size
+    except FileNotFoundError:
+        size = 0
+    if size < _attempt_index["offset"]:
+        # Log was replaced; rebuild from scratch
+        _attempt_index["offset"] = 0
+        _attempt_index["users"] = {}
+    if size == _attempt_index["offset"]:
+        return
+
+    with open(QUIZ_ATTEMPTS_FILE, "rb") as f:
+        f.seek(_attempt_index["offset"])
+        offset = _attempt_index["offset"]
+        for line in f:
+            if not line.endswith(b"\n"):
+                # Partially written by another worker; pick it up next time
+                break
+            try:
+                _index_attempt(json.loads(line), offset)
+            except (json.JSONDecodeError, KeyError):
+                logger.warning(f"Skipping corrupt quiz attempt at byte {offset}")
+            offset += len(line)
+        _attempt_index["offset"] = offset
+
+
+@contextmanager
+def _locked_log(file_path: Path) -> Iterator[int]:
+    """
+    Open a JSON-lines log for appending, holding an exclusive flock.
+
+    The lock serializes writers across worker processes. If the log was
+    replaced (compacted) while waiting for the lock, the new file is opened
+    instead, so nothing is appended to an unlinked file.
+    """
+    while True:
+        fd = os.open(file_path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        if fcntl is None:
+            break
+        fcntl.flock(fd, fcntl.LOCK_EX)
+        try:
+            if os.fstat(fd).st_ino == os.stat(file_path).st_ino:
+                break
+        except FileNotFoundError:
+            pass
+        os.close(fd)
+    try:
+        yield fd
+    finally:
+        os.close(fd)  # Also releases the lock
+
+
+def _append_jsonl(file_path: Path, records: List[Dict]):
+    """
+    Append records to a JSON-lines log.
+
+    The encoded batch goes through unbuffered os.write calls on an O_APPEND
+    descriptor under the log lock, so concurrent workers' batches never
+    interleave; readers only consume newline-terminated lines.
+    """
+    payload = memoryview("".join(
+        json.dumps(record, ensure_ascii=False) + "\n" for record in records
+    ).encode("utf-8"))
+    with _locked_log(file_path) as fd:
+        while payload:
+            payload = payload[os.write(fd, payload):]
+        os.fsync(fd)
+
+
+def _append_attempt_lines(records: List[Dict]):
+    """Append records to the attempt log in a single write"""
+    _append_jsonl(QUIZ_ATTEMPTS_FILE, records)
+
+
+def append_quiz_attempts_sync(attempts: List[Dict]) -> List[str]:
+    """
+    Append quiz attempts to the history log.
+
+    Args:
+        attempts: Result records with at least user_id and course_id
+
+    Returns:
+        The generated attempt ids
+    """
+    if not attempts:
+        return []
+    now = datetime.utcnow().isoformat()
+    for attempt in attempts:
+        attempt.setdefault("attempt_id", uuid.uuid4().hex)
+        attempt.setdefault("submitted_at", now)
+    with _attempt_index_lock:
+        _append_attempt_lines(attempts)
+    return [attempt["attempt_id"] for attempt in attempts]
+
+
+def get_latest_quiz_attempt_sync(user_id: str, course_id: str) -> Optional[Dict]:
+    """Latest attempt for a user and course (O(1) after the index is current)"""
+    with _attempt_index_lock:
+        _refresh_attempt_index()
+        entry = _attempt_index["users"].get(user_id, {}).get(course_id)
+        return entry["latest"] if entry else None
+
+
+def get_user_quiz_attempts_sync(user_id: str) -> List[Dict]:
+    """Latest attempt for every course a user has taken"""
+    with _attempt_index_lock:
+        _refresh_attempt_index()
+        courses = _attempt_index["users"].get(user_id, {})
+        return [entry["latest"] for entry in courses.values() if entry["latest"]]
+
+
+def get_passed_courses_sync(user_id: str) -> List[str]:
+    """Courses in which any of a user's full quiz attempts passed"""
+    with _attempt_index_lock:
+        _refresh_attempt_index()
+        courses = _attempt_index["users"].get(user_id, {})
+        return [course_id for course_id, entry in courses.items() if entry["ever_passed"]]
+
+
+def get_quiz_attempt_history_sync(user_id: str, course_id: str) -> List[Dict]:
+    """All attempts for a user and course, oldest first"""
+    with _attempt_index_lock:
+        _refresh_attempt_index()
+        entry = _attempt_index["users"].get(user_id, {}).get(course_id)
+        offsets = list(entry["offsets"]) if entry else []
+    if not offsets:
+        return []
+    history = []
+    with open(QUIZ_ATTEMPTS_FILE, "rb") as f:
+        for offset in offsets:
+            f.seek(offset)
+            history.append(json.loads(f.readline()))
+    return history
+
+
+def save_quiz_results_sync(results: List[Dict]) -> int:
+    """Append a batch of quiz results to the attempt history with a single write"""
+    return len(append_quiz_attempts_sync(results))
+
 
 async def save_quiz_result(result_data: Dict) -> str:
-    """Save a quiz result"""
-    results = _load_json(QUIZ_RESULTS_FILE)
-    
-    result_id = f"{result_data['user_id']}:{result_data['course_id']}"
-    result_data["submitted_at"] = datetime.utcnow().isoformat()
-    results[result_id] = result_data
-    
-    _save_json(QUIZ_RESULTS_FILE, results)
-    return result_id
+    """Save a quiz result as a new attempt"""
+    return append_quiz_attempts_sync([result_data])[0]
 
 
 async def find_quiz_result(user_id: str, course_id: str) -> Optional[Dict]:
-    """Find quiz result for a user and course"""
-    results = _load_json(QUIZ_RESULTS_FILE)
-    result_id = f"{user_id}:{course_id}"
-    return results.get(result_id)
+    """Find the latest quiz result for a user and course"""
+    return get_latest_quiz_attempt_sync(user_id, course_id)
+
+
+# ==================== Derived Log Snapshots ====================
+#
+# Quiz analytics are kept as an append-only log of per-submission deltas,
+# and leaderboards are folded straight from the attempt log. Every worker
+# folds the log in file order, so all workers converge on the same state,
+# and any worker may save a snapshot of the folded state together with the
+# log offset it covers, to shorten replay on startup.
+
+def _read_jsonl_since(file_path: Path, offset: int) -> Optional[Tuple[List[Dict], int]]:
+    """
+    Complete lines appended to a JSON-lines log since a byte offset.
+
+    Returns:
+        The records and the offset just past them, or None if the log is
+        shorter than offset (it was replaced, so the caller must start over)
+    """
+    try:
+        size = file_path.stat().st_size
+    except FileNotFoundError:
+        size = 0
+    if size < offset:
+        return None
+    if size == offset:
+        return [], offset
+
+    with open(file_path, "rb") as f:
+        return _read_lines_from(f, offset, file_path.name)
+
+
+def _read_lines_from(f, offset: int, name: str) -> Tuple[List[Dict], int]:
+    """Parse the complete lines of an open JSON-lines file from offset on"""
+    records = []
+    f.seek(offset)
+    for line in f:
+        if not line.endswith(b"\n"):
+            # Partially written by another worker; pick it up next time
+            break
+        try:
+            records.append(json.loads(line))
+        except json.JSONDecodeError:
+            logger.warning(f"Skipping corrupt line at byte {offset} of {name}")
+        offset += len(line)
+    return records, offset
+
+
+def _save_snapshot(file_path: Path, snapshot: Dict):
+    """Atomically replace a snapshot file (safe with several workers and threads saving)"""
+    temp_file = file_path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+    with open(temp_file, "w", encoding="utf-8") as f:
+        json.dump(snapshot, f, ensure_ascii=False)
+    os.replace(temp_file, file_path)
+
+
+def append_quiz_analytics_sync(records: List[Dict]):
+    """Append per-submission analytics deltas to the analytics log"""
+    if records:
+        _append_jsonl(QUIZ_ANALYTICS_LOG_FILE, records)
+
+
+def read_quiz_analytics_log_sync(offset: int) -> Optional[Tuple[List[Dict], int]]:
+    """Analytics deltas appended since offset (see _read_jsonl_since)"""
+    return _read_jsonl_since(QUIZ_ANALYTICS_LOG_FILE, offset)
+
+
+def load_quiz_analytics_sync() -> Dict:
+    """Load the analytics snapshot: {"offset": log bytes folded, "courses": aggregates}"""
+    snapshot = _load_json(QUIZ_ANALYTICS_FILE)
+    if snapshot and "offset" not in snapshot:
+        # Aggregates saved before the delta log existed
+        return {"offset": 0, "courses": snapshot}
+    return {"offset": snapshot.get("offset", 0), "courses": snapshot.get("courses", {})}
+
+
+def save_quiz_analytics_sync(snapshot: Dict):
+    """Save an analytics snapshot (written atomically)"""
+    _save_snapshot(QUIZ_ANALYTICS_FILE, snapshot)
+
+
+def read_quiz_attempts_log_sync(offset: int) -> Optional[Tuple[List[Dict], int]]:
+    """Quiz attempts appended since offset (see _read_jsonl_since)"""
+    return _read_jsonl_since(QUIZ_ATTEMPTS_FILE, offset)
+
+
+def load_quiz_leaderboards_sync() -> Dict:
+    """Load the leaderboard snapshot: {"offset": attempt log bytes folded, "courses": boards}"""
+    snapshot = _load_json(QUIZ_LEADERBOARDS_FILE)
+    if "offset" not in snapshot:
+        # Boards saved before they were folded from the attempt log cover an
+        # unknown part of it; rebuild from the start of the log instead
+        return {"offset": 0, "courses": {}}
+    return {"offset": snapshot["offset"], "courses": snapshot.get("courses", {})}
+
+
+def save_quiz_leaderboards_sync(snapshot: Dict):
+    """Save a leaderboard snapshot (written atomically)"""
+    _save_snapshot(QUIZ_LEADERBOARDS_FILE, snapshot)
+
+
+# ==================== Review Card Operations ====================
+#
+# Spaced-repetition card states are appended to review_cards.jsonl on every
+# change; the latest line per (user_id, course_id, question_id) wins. Every
+# worker tails the log from its last offset. Compaction replaces the file,
+# so readers also track its inode and start over when it changes.
+
+def append_review_cards_sync(cards: List[Dict]):
+    """Append changed review card states to the card log"""
+    if cards:
+        _append_jsonl(REVIEW_CARDS_FILE, cards)
+
+
+def read_review_cards_log_sync(offset: int, inode: Optional[int]) -> Tuple[List[Dict], int, Optional[int]]:
+    """
+    Card states appended since offset.
+
+    Args:
+        offset: Bytes of the log already read
+        inode: Inode of the log file those bytes were read from
+
+    Returns:
+        The card states, the new offset and the log's inode. If the inode
+        differs from the one passed in, the log was replaced (compacted) and
+        the states are read from its start.
+    """
+    try:
+        f = open(REVIEW_CARDS_FILE, "rb")
+    except FileNotFoundError:
+        return [], 0, None
+    with f:
+        stat = os.fstat(f.fileno())
+        if stat.st_ino != inode:
+            offset = 0
+        records, offset = _read_lines_from(f, offset, REVIEW_CARDS_FILE.name)
+        return records, offset, stat.st_ino
+
+
+def load_review_cards_sync() -> Tuple[List[Dict], int]:
+    """
+    Replay the card log.
+
+    Returns:
+        The latest state of every card, and the number of log lines read
+    """
+    cards: Dict[Tuple[str, str, str], Dict] = {}
+    lines = 0
+    if not REVIEW_CARDS_FILE.exists():
+        return [], 0
+    with open(REVIEW_CARDS_FILE, "rb") as f:
+        for line in f:
+            if not line.endswith(b"\n"):
+                break
+            lines += 1
+            try:
+                card = json.loads(line)
+                cards[(card["user_id"], card["course_id"], card["question_id"])] = card
+            except (json.JSONDecodeError, KeyError):
+                logger.warning(f"Skipping corrupt review card on line {lines}")
+    return list(cards.values()), lines
+
+
+def compact_review_cards_sync():
+    """
+    Rewrite the card log with one line per card.
+
+    The log is replayed and replaced under its lock, so cards appended by
+    other workers meanwhile are neither lost nor written to the old file.
+    """
+    temp_file = REVIEW_CARDS_FILE.with_suffix(".jsonl.tmp")
+    with _locked_log(REVIEW_CARDS_FILE):
+        cards, _ = load_review_cards_sync()
+        with open(temp_file, "w", encoding="utf-8") as f:
+            f.writelines(json.dumps(card, ensure_ascii=False) + "\n" for card in cards)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_file, REVIEW_CARDS_FILE)
+
+
+# ==================== Adaptive Quiz Session Operations ====================
+#
+# Each adaptive quiz in progress is one small JSON file, rewritten
+# atomically after every answer, so any worker can continue a session.
+
+
+def load_adaptive_session_sync(session_id: str) -> Optional[Dict]:
+    """Load an adaptive session state (None if unknown, finished or expired)"""
+    file_path = _session_file(ADAPTIVE_SESSIONS_DIR, session_id)
+    if file_path is None or not file_path.exists():
+        return None
+    return _load_json(file_path) or None
+
+
+def save_adaptive_session_sync(state: Dict):
+    """Save an adaptive session state (written atomically)"""
+    file_path = _session_file(ADAPTIVE_SESSIONS_DIR, state["session_id"])
+    if file_path is None:
+        raise ValueError(f"Invalid adaptive session id: {state['session_id']!r}")
+    ADAPTIVE_SESSIONS_DIR.mkdir(parents=True, exist_ok=True)
+    _save_snapshot(file_path, state)
+
+
+def delete_adaptive_session_sync(session_id: str):
+    """Delete an adaptive session state"""
+    file_path = _session_file(ADAPTIVE_SESSIONS_DIR, session_id)
+    if file_path is not None:
+        file_path.unlink(missing_ok=True)
+
+
+def expire_adaptive_sessions_sync(max_age_seconds: float) -> int:
+    """
+    Delete adaptive sessions that haven't been answered for max_age_seconds.
+
+    Returns:
+        Number of sessions deleted
+    """
+    if not ADAPTIVE_SESSIONS_DIR.exists():
+        return 0
+    cutoff = time.time() - max_age_seconds
+    expired = 0
+    for file_path in ADAPTIVE_SESSIONS_DIR.glob("*.json"):
+        try:
+            if file_path.stat().st_mtime < cutoff:
+                file_path.unlink()
+                expired += 1
+        except FileNotFoundError:
+            pass  # Finished or expired by another worker meanwhile
+    return expired
 
 
 # ==================== Notes Operations ====================
@@ -352,6 +990,25 @@ class FAISSVectorStore:
         self.documents.extend(documents)
         logger.info(f"Added {len(embeddings)} embeddings to index")
     
+    def remove_source(self, course_id: str, source_id: str) -> int:
+        """Remove the vectors of one ingested source (see replace_knowledge_source_sync)"""
+        if self.faiss is None or self.index is None:
+            return 0
+        
+        import numpy as np
+        positions = [
+            position for position, doc in enumerate(self.documents)
+            if _is_source_chunk(doc, course_id, source_id)
+        ]
+        if not positions:
+            return 0
+        # Flat indexes renumber the remaining vectors in order, matching the documents list
+        self.index.remove_ids(np.array(positions, dtype='int64'))
+        removed = set(positions)
+        self.documents = [doc for position, doc in enumerate(self.documents) if position not in removed]
+        logger.info(f"Removed {len(positions)} embeddings for {course_id}/{source_id}")
+        return len(positions)
+    
     def search(self, query_embedding: List[float], k: int = 5, course_id: str = None) -> List[Dict]:
         """Search for similar documents"""
         if self.faiss is None or self.index is None or self.index.ntotal == 0:
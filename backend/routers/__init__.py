@@ -1,9 +1,9 @@
 """
 CourseCompanion API Routers
 """
-from . import discovery, chat, notes, artifacts, quiz
+from . import discovery, chat, notes, artifacts, quiz, review
 
-__all__ = ["discovery", "chat", "notes", "artifacts", "quiz"]
+__all__ = ["discovery", "chat", "notes", "artifacts", "quiz", "review"]
 
 
 
@@ -1,11 +1,14 @@
 """
 Chat Router - RAG chatbot endpoints
 """
+import json
 from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
-from typing import List, Dict, Optional
+from typing import Any, List, Dict, Optional
 
 from services.rag_chatbot import RAGChatbot
+from services.conversation_memory import conversation_memory
 
 router = APIRouter()
 
@@ -14,7 +17,9 @@ class ChatRequest(BaseModel):
     """Request model for chat endpoint"""
     course_id: str
     message: str
-    history: List[Dict] = []
+    session_id: Optional[str] = None  # Server-side memory; omit to start a new session
+    user_id: Optional[str] = None
+    history: List[Dict] = []  # Deprecated: full client-side history, bypasses server memory
 
 
 class SourceDocument(BaseModel):
@@ -30,6 +35,9 @@ class ChatResponse(BaseModel):
     message: str
     sources: List[SourceDocument] = []
     course_id: str
+    cached: bool = False
+    session_id: Optional[str] = None
+    rerank_latency_ms: Optional[float] = None
 
 
 @router.post("/chat", response_model=ChatResponse)
@@ -42,16 +50,22 @@ async def chat(request: ChatRequest):
     2. Generate a contextual response
     3. Include source references
     """
+    session = None
     try:
         chatbot = RAGChatbot(course_id=request.course_id)
+        session, history = _load_session(request)
         response = await chatbot.get_response(
             message=request.message,
-            history=request.history
+            history=history
         )
+        _remember_turn(session, request.message, response["message"], response.get("sources", []))
         return ChatResponse(
             message=response["message"],
             sources=response.get("sources", []),
-            course_id=request.course_id
+            course_id=request.course_id,
+            cached=response.get("cached", False),
+            session_id=session["session_id"] if session else None,
+            rerank_latency_ms=response.get("rerank_ms")
         )
     except Exception as e:
         # Fallback response for demo
@@ -67,10 +81,88 @@ async def chat(request: ChatRequest):
                 "I'm here to help with your course questions. Could you please rephrase your question?"
             ),
             sources=[],
-            course_id=request.course_id
+            course_id=request.course_id,
+            session_id=session["session_id"] if session else None
         )
 
 
+def _load_session(request: ChatRequest):
+    """
+    Resolve the conversation history for a request.
+    
+    Clients that still send a full history get the legacy stateless behaviour;
+    everyone else gets server-side memory keyed by session_id.
+    """
+    if request.history and not request.session_id:
+        return None, request.history
+    session = conversation_memory.load(
+        request.session_id,
+        user_id=request.user_id,
+        course_id=request.course_id,
+        conversation_type="chat"
+    )
+    return session, conversation_memory.get_history(session)
+
+
+def _remember_turn(session: Optional[Dict], message: str, answer: str, sources: List[Dict]):
+    """Append the user message and assistant answer to server-side memory"""
+    if session is None:
+        return
+    conversation_memory.append(session, "user", message)
+    conversation_memory.append(session, "assistant", answer, sources=sources)
+    conversation_memory.save(session)
+
+
+def _format_sse(event: str, data: Any) -> str:
+    """Format a single Server-Sent Events frame"""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+@router.post("/chat/stream")
+async def chat_stream(request: ChatRequest):
+    """
+    Stream a response from the course-specific RAG chatbot as Server-Sent Events.
+    
+    Events, in order:
+    1. `sources` - source references, sent as soon as retrieval finishes
+    2. `token` - incremental pieces of the answer text
+    3. `done` - end of stream marker (includes the session_id)
+    
+    An `error` event replaces the remainder of the stream if generation fails.
+    """
+    async def event_stream():
+        sources: List[Dict] = []
+        tokens: List[str] = []
+        try:
+            chatbot = RAGChatbot(course_id=request.course_id)
+            session, history = _load_session(request)
+            async for event, data in chatbot.stream_response(
+                message=request.message,
+                history=history
+            ):
+                if event == "sources":
+                    sources = data
+                elif event == "token":
+                    tokens.append(data["text"])
+                elif event == "done":
+                    _remember_turn(session, request.message, "".join(tokens), sources)
+                    data = {**data, "session_id": session["session_id"] if session else None}
+                yield _format_sse(event, data)
+        except Exception:
+            yield _format_sse("error", {
+                "message": "I'm here to help with your course questions. Could you please rephrase your question?"
+            })
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no"
+        }
+    )
+
+
 @router.get("/chat/history/{user_id}/{course_id}")
 async def get_chat_history(user_id: str, course_id: str):
     """Get chat history for a user in a specific course"""
@@ -83,6 +175,22 @@ async def get_chat_history(user_id: str, course_id: str):
     }
 
 
+@router.delete("/chat/session/{session_id}")
+async def clear_chat_session(session_id: str, user_id: Optional[str] = None):
+    """
+    Delete the server-side memory for a chat session.
+    
+    user_id must be the session's owner (omit it only for anonymous
+    sessions); any other session is reported as not found.
+    """
+    if not conversation_memory.delete(session_id, user_id):
+        raise HTTPException(status_code=404, detail="Chat session not found")
+    return {
+        "status": "cleared",
+        "session_id": session_id
+    }
+
+
 @router.delete("/chat/history/{user_id}/{course_id}")
 async def clear_chat_history(user_id: str, course_id: str):
     """Clear chat history for a user in a specific course"""
@@ -5,7 +5,8 @@ from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
 from typing import List, Dict, Optional
 
-from services.discovery_agent import DiscoveryAgent
+from services.discovery_agent import DiscoveryAgent, get_discovery_agent
+from services.conversation_memory import conversation_memory
 
 router = APIRouter()
 
@@ -13,7 +14,9 @@ router = APIRouter()
 class DiscoveryRequest(BaseModel):
     """Request model for discovery endpoint"""
     message: str
-    history: List[Dict] = []
+    session_id: Optional[str] = None  # Server-side memory; omit to start a new session
+    user_id: Optional[str] = None
+    history: List[Dict] = []  # Deprecated: full client-side history, bypasses server memory
 
 
 class CourseRecommendation(BaseModel):
@@ -29,6 +32,7 @@ class DiscoveryResponse(BaseModel):
     has_recommendations: bool = False
     recommended_courses: List[CourseRecommendation] = []
     conversation_complete: bool = False
+    session_id: Optional[str] = None
 
 
 @router.post("/discover", response_model=DiscoveryResponse)
@@ -36,17 +40,40 @@ async def discover_courses(request: DiscoveryRequest):
     """
     Run the discovery agent to recommend courses based on user conversation.
     
+    Send a session_id (returned by the previous call) instead of the full
+    history; the agent keeps a per-session profile server-side.
+    
     The agent will:
     1. Gather information about the user's role and experience
     2. Understand their learning goals
     3. Recommend appropriate courses
     """
+    session = None
     try:
-        agent = DiscoveryAgent()
-        response = await agent.process_message(
-            message=request.message,
-            history=request.history
-        )
+        agent = get_discovery_agent()
+        if request.history and not request.session_id:
+            response = await agent.process_message(
+                message=request.message,
+                history=request.history
+            )
+        else:
+            # Fold only the new message into the stored session profile
+            session = conversation_memory.load(
+                request.session_id,
+                user_id=request.user_id,
+                conversation_type="discovery"
+            )
+            profile = session.setdefault("profile", DiscoveryAgent.new_profile())
+            response = await agent.process_message(
+                message=request.message,
+                profile=profile
+            )
+
+        if session is not None:
+            conversation_memory.append(session, "user", request.message)
+            conversation_memory.append(session, "assistant", response["message"])
+            conversation_memory.save(session)
+            response["session_id"] = session["session_id"]
         return response
     except Exception as e:
         # Fallback response for demo
@@ -54,42 +81,25 @@ async def discover_courses(request: DiscoveryRequest):
             message=f"I understand you're looking to learn more. Could you tell me about your current role and what specific skills you'd like to develop?",
             has_recommendations=False,
             recommended_courses=[],
-            conversation_complete=False
+            conversation_complete=False,
+            session_id=session["session_id"] if session else None
         )
 
 
 @router.post("/discover/reset")
-async def reset_discovery():
-    """Reset the discovery conversation"""
+async def reset_discovery(session_id: Optional[str] = None, user_id: Optional[str] = None):
+    """
+    Reset the discovery conversation.
+    
+    A session_id is only deleted for its owner (user_id, omitted for
+    anonymous sessions); any other session is reported as not found.
+    """
+    if session_id and not conversation_memory.delete(session_id, user_id):
+        raise HTTPException(status_code=404, detail="Discovery session not found")
     return {"status": "reset", "message": "Discovery conversation has been reset"}
 
 
 @router.get("/discover/courses")
 async def get_recommendable_courses():
     """Get list of courses available for recommendation"""
-    return [
-        {
-            "course_id": "xm-cloud-101",
-            "title": "XM Cloud Fundamentals",
-            "keywords": ["developer", "technical", "headless", "cms", "react", "nextjs"],
-            "difficulty": "beginner",
-            "roles": ["developer", "architect"]
-        },
-        {
-            "course_id": "search-fundamentals",
-            "title": "Sitecore Search Fundamentals",
-            "keywords": ["search", "indexing", "optimization", "technical"],
-            "difficulty": "intermediate",
-            "roles": ["developer", "architect", "admin"]
-        },
-        {
-            "course_id": "content-hub-101",
-            "title": "Content Hub Basics",
-            "keywords": ["content", "marketing", "dam", "assets", "workflow"],
-            "difficulty": "beginner",
-            "roles": ["marketer", "content author", "admin"]
-        }
-    ]
-
-
-
+    return get_discovery_agent().list_courses()
@@ -1,13 +1,33 @@
 """
 Quiz Router - Quiz and assessment endpoints
 """
-from fastapi import APIRouter, HTTPException
-from pydantic import BaseModel
-from typing import List, Dict, Optional
+from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi.responses import Response, StreamingResponse
+from fastapi.concurrency import run_in_threadpool
+from pydantic import BaseModel, ValidationError
+from starlette.background import BackgroundTask
+from typing import Any, AsyncIterator, BinaryIO, Iterator, List, Dict, Optional
 from datetime import datetime
+from itertools import islice
+import json
+import math
+import tempfile
 
-from services.quiz_service import QuizService
-from services.recommendation import RecommendationEngine
+from config import settings
+from models.local_storage import (
+    save_quiz_result,
+    save_quiz_results_sync,
+    get_latest_quiz_attempt_sync,
+    get_user_quiz_attempts_sync,
+    get_quiz_attempt_history_sync
+)
+from services.quiz_service import get_quiz_service
+from services.quiz_scoring import score_submissions
+from services.quiz_analytics import get_quiz_analytics
+from services.adaptive_quiz import get_adaptive_quiz_service
+from services.leaderboard import get_leaderboard
+from services.spaced_repetition import get_review_scheduler
+from services.recommendation import RecommendationEngine, get_recommendation_engine
 
 router = APIRouter()
 
@@ -33,6 +53,7 @@ class QuizSubmission(BaseModel):
     user_id: str
     course_id: str
     answers: Dict[str, int]  # question_id -> selected option index
+    answer_times: Optional[Dict[str, float]] = None  # question_id -> seconds spent (finite)
 
 
 class TopicScore(BaseModel):
@@ -64,43 +85,121 @@ class QuizResultResponse(BaseModel):
     topic_scores: List[TopicScore]
     recommendations: List[Recommendation]
     submitted_at: str
+    attempt_id: Optional[str] = None
+    mode: str = "standard"  # "adaptive" for partial adaptive quizzes, which never become the latest result
 
 
-# In-memory storage for results (replace with MongoDB in production)
-results_storage: dict = {}
+class PercentileResponse(BaseModel):
+    """Response model for a learner's percentile rank in a course"""
+    course_id: str
+    user_id: str
+    percentage: float  # Learner's best score
+    percentile: float
+    participants: int
+
+
+class LeaderboardEntry(BaseModel):
+    """Model for one leaderboard row"""
+    rank: int
+    user_id: str
+    percentage: float
+    achieved_at: str
+
+
+class LeaderboardResponse(BaseModel):
+    """Response model for a course leaderboard"""
+    course_id: str
+    participants: int
+    entries: List[LeaderboardEntry]
+
+
+class AdaptiveQuizStart(BaseModel):
+    """Request model for starting an adaptive quiz"""
+    user_id: str
+    course_id: str
+
+
+class AdaptiveQuizAnswer(BaseModel):
+    """Request model for answering the current adaptive question"""
+    session_id: str
+    question_id: str
+    answer: int
+
+
+class AdaptiveQuizStep(BaseModel):
+    """Response model for one adaptive quiz step"""
+    session_id: str
+    course_id: str
+    question: Optional[QuizQuestion] = None  # Next question; None once finished
+    answered: int
+    ability: float  # EAP ability estimate (standard normal scale)
+    standard_error: float
+    last_correct: Optional[bool] = None
+    done: bool = False
+    result: Optional[QuizResultResponse] = None
+
+
+# Bulk uploads larger than this are spooled to disk
+BULK_SPOOL_MEMORY_BYTES = 1024 * 1024
+
+
+def _finite_answer_times(submission: QuizSubmission) -> bool:
+    """
+    Whether every answer time is a finite number.
+    
+    Checked in the routes rather than on the model: a validation error
+    echoes its input, and FastAPI can't render inf/nan into the 422 body.
+    """
+    return all(math.isfinite(seconds) for seconds in (submission.answer_times or {}).values())
+
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Weak comparison of an If-None-Match header against an ETag"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return any(
+        candidate.strip().removeprefix("W/") == etag
+        for candidate in if_none_match.split(",")
+    )
 
 
 @router.get("/quiz/{course_id}", response_model=QuizResponse)
-async def get_quiz(course_id: str):
+async def get_quiz(course_id: str, request: Request):
     """
     Get quiz questions for a specific course.
+    
+    The payload is pre-rendered when the quiz is compiled and served with a
+    strong ETag; a matching If-None-Match gets 304 Not Modified.
     """
-    quiz_service = QuizService()
-    questions = quiz_service.get_questions(course_id)
+    quiz = get_quiz_service().get_quiz(course_id)
     
-    if not questions:
+    if not quiz or not quiz.questions:
         raise HTTPException(status_code=404, detail="Quiz not found for this course")
     
-    course_titles = {
-        "xm-cloud-101": "XM Cloud Fundamentals Quiz",
-        "search-fundamentals": "Sitecore Search Fundamentals Quiz",
-        "content-hub-101": "Content Hub Basics Quiz"
-    }
+    headers = {"ETag": quiz.etag, "Cache-Control": "no-cache"}
+    if _etag_matches(request.headers.get("if-none-match"), quiz.etag):
+        return Response(status_code=304, headers=headers)
     
-    return QuizResponse(
-        course_id=course_id,
-        title=course_titles.get(course_id, f"{course_id} Quiz"),
-        questions=[
-            QuizQuestion(
-                id=q["id"],
-                question=q["question"],
-                options=q["options"],
-                topic=q["topic"]
-            )
-            for q in questions
-        ],
-        time_limit_minutes=30
-    )
+    return Response(content=quiz.payload, media_type="application/json", headers=headers)
+
+
+@router.get("/quiz/{course_id}/analytics")
+async def get_quiz_analytics_report(course_id: str):
+    """
+    Get running item statistics for a course quiz.
+    
+    Per question: p-value (share answered correctly), point-biserial
+    discrimination against the rest-of-test score, option-choice
+    distribution and mean time-to-answer.
+    """
+    quiz = get_quiz_service().get_quiz(course_id)
+    
+    if not quiz or not quiz.questions:
+        raise HTTPException(status_code=404, detail="Quiz not found for this course")
+    
+    return get_quiz_analytics().report(quiz)
 
 
 @router.post("/quiz/submit", response_model=QuizResultResponse)
@@ -108,37 +207,75 @@ async def submit_quiz(submission: QuizSubmission):
     """
     Submit quiz answers and get results with recommendations.
     """
-    quiz_service = QuizService()
-    recommendation_engine = RecommendationEngine()
+    if not _finite_answer_times(submission):
+        raise HTTPException(status_code=422, detail="answer_times must be finite numbers")
     
-    # Get questions for scoring
-    questions = quiz_service.get_questions(submission.course_id)
+    recommendation_engine = get_recommendation_engine()
     
-    if not questions:
+    # Score against the compiled answer key
+    quiz_service = get_quiz_service()
+    quiz = quiz_service.get_quiz(submission.course_id)
+    
+    if not quiz or not len(quiz):
         raise HTTPException(status_code=404, detail="Quiz not found")
     
-    # Score the quiz
-    score = 0
-    topic_scores = {}
+    # Rejected before anything is scored or recorded, as bulk rows are
+    invalid = quiz.invalid_answers(submission.answers)
+    if invalid:
+        raise HTTPException(status_code=422, detail=f"Answer out of range for question {invalid[0]}")
     
-    for question in questions:
-        q_id = question["id"]
-        user_answer = submission.answers.get(q_id, -1)
-        is_correct = user_answer == question["correct"]
-        
-        if is_correct:
-            score += 1
-        
-        topic = question["topic"]
-        if topic not in topic_scores:
-            topic_scores[topic] = {"correct": 0, "total": 0}
-        topic_scores[topic]["total"] += 1
-        if is_correct:
-            topic_scores[topic]["correct"] += 1
-    
-    total = len(questions)
+    scored = quiz_service.score_compiled(quiz, submission.answers, include_questions=False)
+    
+    # Fold the per-question outcomes into the running item statistics
+    correct_mask = scored["correct_mask"]
+    await run_in_threadpool(
+        get_quiz_analytics().record,
+        quiz,
+        submission.answers,
+        correct_mask,
+        submission.answer_times
+    )
+    
+    # Missed questions become spaced-repetition review cards
+    missed = [
+        question_id
+        for question_id, is_correct in zip(quiz.answer_key["question_ids"], correct_mask)
+        if not is_correct
+    ]
+    await run_in_threadpool(get_review_scheduler().add_missed, submission.user_id, submission.course_id, missed)
+    
+    result = _build_result(
+        submission.user_id,
+        submission.course_id,
+        scored["score"],
+        scored["total"],
+        scored["passed"],
+        scored["topic_scores"],
+        recommendation_engine
+    )
+    
+    # Append to the durable attempt history
+    record = result.model_dump(exclude={"attempt_id"})
+    result.attempt_id = await save_quiz_result(record)
+    
+    return result
+
+
+def _build_result(
+    user_id: str,
+    course_id: str,
+    score: int,
+    total: int,
+    passed: bool,
+    topic_scores: Dict[str, Dict[str, Any]],
+    recommendation_engine: RecommendationEngine
+) -> QuizResultResponse:
+    """Build a quiz result with topic breakdown and recommendations"""
     percentage = (score / total * 100) if total > 0 else 0
-    passed = percentage >= 70
+    topic_scores = {
+        topic: {"correct": scores["correct"], "total": scores["total"]}
+        for topic, scores in topic_scores.items()
+    }
     
     # Convert topic scores to response format
     topic_score_list = [
@@ -153,7 +290,7 @@ async def submit_quiz(submission: QuizSubmission):
     
     # Generate recommendations
     recommendations = recommendation_engine.generate_recommendations(
-        course_id=submission.course_id,
+        course_id=course_id,
         topic_scores=topic_scores
     )
     
@@ -169,10 +306,9 @@ async def submit_quiz(submission: QuizSubmission):
         for rec in recommendations
     ]
     
-    # Store results
-    result = QuizResultResponse(
-        user_id=submission.user_id,
-        course_id=submission.course_id,
+    return QuizResultResponse(
+        user_id=user_id,
+        course_id=course_id,
         score=score,
         total=total,
         percentage=percentage,
@@ -181,44 +317,334 @@ async def submit_quiz(submission: QuizSubmission):
         recommendations=recommendation_list,
         submitted_at=datetime.utcnow().isoformat()
     )
+
+
+def _score_bulk_batch(
+    batch: List[Dict[str, Any]],
+    recommendation_engine: RecommendationEngine
+) -> List[Dict[str, Any]]:
+    """Score one batch of parsed bulk rows (vectorized per course) and build result rows"""
+    quiz_service = get_quiz_service()
+    by_course: Dict[str, List[Dict[str, Any]]] = {}
+    for row in batch:
+        by_course.setdefault(row["submission"].course_id, []).append(row)
     
-    # Save to storage
-    storage_key = f"{submission.user_id}:{submission.course_id}"
-    results_storage[storage_key] = result.model_dump()
+    results: List[Dict[str, Any]] = []
+    submitted_at = datetime.utcnow().isoformat()
+    for course_id, rows in by_course.items():
+        quiz = quiz_service.get_quiz(course_id)
+        if not quiz or not len(quiz):
+            results.extend({"line": row["line"], "error": "Quiz not found"} for row in rows)
+            continue
+        
+        # Out-of-range option indexes are rejected per row before scoring
+        valid_rows = []
+        for row in rows:
+            invalid = quiz.invalid_answers(row["submission"].answers)
+            if invalid:
+                results.append({"line": row["line"], "error": f"Answer out of range for question {invalid[0]}"})
+            else:
+                valid_rows.append(row)
+        rows = valid_rows
+        if not rows:
+            continue
+        
+        scored = score_submissions(quiz, [row["submission"].answers for row in rows])
+        get_quiz_analytics().record_many(quiz, [
+            (row["submission"].answers, result["correct_mask"], row["submission"].answer_times)
+            for row, result in zip(rows, scored)
+        ])
+        for row, result in zip(rows, scored):
+            topic_scores = {
+                topic: {
+                    "correct": result["topic_correct"][topic_id],
+                    "total": quiz.topic_totals[topic_id],
+                    "percentage": result["topic_correct"][topic_id] / quiz.topic_totals[topic_id] * 100
+                }
+                for topic_id, topic in enumerate(quiz.topics)
+            }
+            recommendations = recommendation_engine.generate_recommendations(
+                course_id=course_id,
+                topic_scores=topic_scores
+            )
+            record = QuizResultResponse(
+                user_id=row["submission"].user_id,
+                course_id=course_id,
+                score=result["score"],
+                total=result["total"],
+                percentage=result["percentage"],
+                passed=result["passed"],
+                topic_scores=[
+                    TopicScore(topic=topic, **scores) for topic, scores in topic_scores.items()
+                ],
+                recommendations=[Recommendation(**rec) for rec in recommendations],
+                submitted_at=submitted_at
+            ).model_dump()
+            results.append({"line": row["line"], **record})
     
-    return result
+    # Keep the stream in input order
+    results.sort(key=lambda r: r["line"])
+    return results
+
+
+def _bulk_lines(upload: BinaryIO, max_line_bytes: int) -> Iterator[bytes]:
+    """
+    Read lines from the spooled upload, at most max_line_bytes + 1 at a time.
+
+    An oversized line is yielded once, truncated (so the caller can report
+    it), and the rest of it is skipped.
+    """
+    while True:
+        line = upload.readline(max_line_bytes + 1)
+        if not line:
+            return
+        if len(line) > max_line_bytes and not line.endswith(b"\n"):
+            yield line
+            rest = line
+            while rest and not rest.endswith(b"\n"):
+                rest = upload.readline(max_line_bytes + 1)
+            continue
+        yield line.rstrip(b"\r\n")
+
+
+@router.post("/quiz/submit/bulk")
+async def submit_quiz_bulk(request: Request):
+    """
+    Score many quiz submissions from an NDJSON upload.
+    
+    Each input line is a QuizSubmission object. Results stream back as NDJSON
+    in input order, one line per input row ({"line": n, ...result} or
+    {"line": n, "error": ...}), followed by a {"summary": ...} line.
+    The upload is spooled to a temporary file (in memory only while small)
+    before scoring starts, and rows are scored and persisted in batches, so
+    memory stays bounded by the batch size regardless of upload size. A row
+    with an answer outside its question's options gets a per-row error.
+    Spool reads and writes run in the threadpool.
+    """
+    batch_size = settings.QUIZ_BULK_BATCH_SIZE
+    max_line_bytes = settings.QUIZ_BULK_MAX_LINE_BYTES
+    recommendation_engine = get_recommendation_engine()
+    
+    # Spool the body first: once the response starts streaming, Starlette
+    # reads the receive channel itself to watch for client disconnects.
+    upload = tempfile.SpooledTemporaryFile(max_size=BULK_SPOOL_MEMORY_BYTES)
+    async for chunk in request.stream():
+        await run_in_threadpool(upload.write, chunk)
+    upload.seek(0)
+    lines = _bulk_lines(upload, max_line_bytes)
+    
+    async def generate():
+        summary = {"received": 0, "scored": 0, "failed": 0}
+        batch: List[Dict[str, Any]] = []
+        errors: List[Dict[str, Any]] = []
+        
+        async def flush() -> AsyncIterator[str]:
+            results = await run_in_threadpool(_score_bulk_batch, batch, recommendation_engine) if batch else []
+            stored = [
+                {key: value for key, value in result.items() if key != "line"}
+                for result in results if "error" not in result
+            ]
+            await run_in_threadpool(save_quiz_results_sync, stored)
+            
+            summary["scored"] += len(stored)
+            summary["failed"] += len(results) - len(stored) + len(errors)
+            for result in sorted(results + errors, key=lambda r: r["line"]):
+                yield json.dumps(result) + "\n"
+            batch.clear()
+            errors.clear()
+        
+        line_number = 0
+        while True:
+            chunk = await run_in_threadpool(lambda: list(islice(lines, batch_size)))
+            if not chunk:
+                break
+            for raw in chunk:
+                line_number += 1
+                if not raw.strip():
+                    continue
+                summary["received"] += 1
+                if len(raw) > max_line_bytes:
+                    errors.append({"line": line_number, "error": f"Line exceeds {max_line_bytes} bytes"})
+                else:
+                    try:
+                        submission = QuizSubmission.model_validate_json(raw)
+                    except ValidationError as e:
+                        errors.append({"line": line_number, "error": e.errors(include_url=False)[0]["msg"]})
+                    else:
+                        if _finite_answer_times(submission):
+                            batch.append({"line": line_number, "submission": submission})
+                        else:
+                            errors.append({"line": line_number, "error": "answer_times must be finite numbers"})
+                if len(batch) + len(errors) >= batch_size:
+                    async for out in flush():
+                        yield out
+        
+        async for out in flush():
+            yield out
+        yield json.dumps({"summary": summary}) + "\n"
+    
+    return StreamingResponse(
+        generate(),
+        media_type="application/x-ndjson",
+        background=BackgroundTask(upload.close)
+    )
+
+
+def _adaptive_question(session) -> Optional[QuizQuestion]:
+    if session.current is None:
+        return None
+    question = session.bank.quiz.questions[session.current]
+    return QuizQuestion(
+        id=question["id"],
+        question=question["question"],
+        options=question["options"],
+        topic=question["topic"]
+    )
+
+
+def _adaptive_step(session, last_correct: Optional[bool] = None) -> AdaptiveQuizStep:
+    return AdaptiveQuizStep(
+        session_id=session.session_id,
+        course_id=session.course_id,
+        question=_adaptive_question(session),
+        answered=len(session.administered),
+        ability=round(session.theta, 3),
+        standard_error=round(session.se, 3),
+        last_correct=last_correct,
+        done=session.current is None
+    )
+
+
+@router.post("/quiz/adaptive/start", response_model=AdaptiveQuizStep)
+async def start_adaptive_quiz(request: AdaptiveQuizStart):
+    """
+    Start an adaptive quiz.
+    
+    Questions are served one at a time, each chosen to be the most
+    informative at the learner's current ability estimate; the quiz ends
+    once the estimate is precise enough.
+    """
+    quiz = get_quiz_service().get_quiz(request.course_id)
+    
+    if not quiz or not quiz.questions:
+        raise HTTPException(status_code=404, detail="Quiz not found for this course")
+    
+    session = await run_in_threadpool(get_adaptive_quiz_service().start, quiz, request.user_id)
+    return _adaptive_step(session)
+
+
+@router.post("/quiz/adaptive/answer", response_model=AdaptiveQuizStep)
+async def answer_adaptive_quiz(request: AdaptiveQuizAnswer):
+    """
+    Answer the current adaptive question and get the next one.
+    
+    Sessions are stored, so the request may be served by any worker.
+    When the quiz ends, the response carries the result (scored over the
+    questions that were asked), which is stored as an "adaptive" attempt:
+    it shows up in the attempt history but never replaces the latest full
+    quiz result.
+    """
+    adaptive_service = get_adaptive_quiz_service()
+    session = await run_in_threadpool(adaptive_service.get_session, request.session_id)
+    
+    if not session:
+        raise HTTPException(status_code=404, detail="Adaptive quiz session not found")
+    
+    if session.bank.quiz.invalid_answers({request.question_id: request.answer}):
+        raise HTTPException(status_code=422, detail=f"Answer out of range for question {request.question_id}")
+    
+    try:
+        outcome = await run_in_threadpool(adaptive_service.answer, session, request.question_id, request.answer)
+    except ValueError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    
+    step = _adaptive_step(session, last_correct=outcome["is_correct"])
+    if not outcome["done"]:
+        return step
+    
+    quiz = session.bank.quiz
+    topic_scores: Dict[str, Dict[str, Any]] = {}
+    for item, is_correct in zip(session.administered, session.correct_mask):
+        scores = topic_scores.setdefault(quiz.topics[quiz.topic_ids[item]], {"correct": 0, "total": 0})
+        scores["total"] += 1
+        scores["correct"] += int(is_correct)
+    
+    score = sum(session.correct_mask)
+    total = len(session.administered)
+    step.result = _build_result(
+        session.user_id,
+        session.course_id,
+        score,
+        total,
+        score / total * 100 >= quiz.passing_score,
+        topic_scores,
+        get_recommendation_engine()
+    )
+    step.result.mode = "adaptive"
+    step.result.attempt_id = await save_quiz_result({
+        **step.result.model_dump(exclude={"attempt_id"}),
+        "ability": step.ability,
+        "standard_error": step.standard_error
+    })
+    await run_in_threadpool(adaptive_service.finish, session)
+    return step
+
+
+@router.get("/leaderboard/{course_id}/percentile/{user_id}", response_model=PercentileResponse)
+async def get_percentile(course_id: str, user_id: str):
+    """
+    Get a learner's percentile rank among everyone who took a course quiz.
+    
+    Ranks each learner by their best score, from a per-course histogram.
+    """
+    percentile = await run_in_threadpool(lambda: get_leaderboard().percentile(course_id, user_id))
+    
+    if not percentile:
+        raise HTTPException(status_code=404, detail="Results not found")
+    
+    return PercentileResponse(**percentile)
+
+
+@router.get("/leaderboard/{course_id}", response_model=LeaderboardResponse)
+async def get_course_leaderboard(course_id: str, limit: int = Query(10, ge=1, le=100)):
+    """
+    Get the top learners for a course by best quiz score.
+    """
+    return LeaderboardResponse(**await run_in_threadpool(lambda: get_leaderboard().top(course_id, limit)))
+
+
+@router.get("/results/{user_id}/{course_id}/history", response_model=List[QuizResultResponse])
+async def get_result_history(user_id: str, course_id: str):
+    """
+    Get every quiz attempt for a user and course, oldest first.
+    """
+    history = get_quiz_attempt_history_sync(user_id, course_id)
+    
+    if not history:
+        raise HTTPException(status_code=404, detail="Results not found")
+    
+    return [QuizResultResponse(**attempt) for attempt in history]
 
 
 @router.get("/results/{user_id}/{course_id}", response_model=QuizResultResponse)
 async def get_results(user_id: str, course_id: str):
     """
-    Get quiz results for a specific user and course.
+    Get the latest full quiz result for a specific user and course.
     """
-    storage_key = f"{user_id}:{course_id}"
+    result = get_latest_quiz_attempt_sync(user_id, course_id)
     
-    if storage_key not in results_storage:
+    if not result:
         raise HTTPException(status_code=404, detail="Results not found")
     
-    return QuizResultResponse(**results_storage[storage_key])
+    return QuizResultResponse(**result)
 
 
 @router.get("/results/{user_id}")
 async def get_all_results(user_id: str):
     """
-    Get all quiz results for a specific user.
+    Get the latest full quiz result for each course a user has taken.
     """
-    user_results = []
-    
-    for key, result in results_storage.items():
-        if key.startswith(f"{user_id}:"):
-            user_results.append(result)
-    
     return {
         "user_id": user_id,
-        "results": user_results
+        "results": get_user_quiz_attempts_sync(user_id)
     }
-
-
-
-
-
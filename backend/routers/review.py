@@ -0,0 +1,97 @@
+"""
+Review Router - Spaced-repetition review endpoints
+"""
+from fastapi import APIRouter, HTTPException, Query
+from pydantic import BaseModel, Field
+from typing import Any, Dict, List, Optional
+from datetime import datetime
+
+from services.quiz_service import get_quiz_service
+from services.spaced_repetition import get_review_scheduler
+
+router = APIRouter()
+
+
+class ReviewCard(BaseModel):
+    """Model for a review card"""
+    course_id: str
+    question_id: str
+    question: Optional[str] = None
+    options: List[str] = []
+    topic: Optional[str] = None
+    due_at: str
+    interval_days: int
+    repetitions: int
+    easiness: float
+    lapses: int
+
+
+class DueReviewsResponse(BaseModel):
+    """Response model for due review cards"""
+    user_id: str
+    cards: List[ReviewCard]
+    next_due_at: Optional[str] = None  # Earliest due time when nothing is due yet
+
+
+class ReviewRequest(BaseModel):
+    """Request model for recording a review"""
+    course_id: str
+    question_id: str
+    quality: int = Field(ge=0, le=5)  # SM-2 recall grade: 0 blackout ... 5 perfect
+
+
+def _timestamp(epoch: float) -> str:
+    return datetime.utcfromtimestamp(epoch).isoformat()
+
+
+def _review_card(card: Dict[str, Any]) -> ReviewCard:
+    """Card state joined with its quiz question (answer withheld)"""
+    quiz = get_quiz_service().get_quiz(card["course_id"])
+    position = quiz.question_index.get(card["question_id"]) if quiz else None
+    question = quiz.questions[position] if position is not None else {}
+    return ReviewCard(
+        course_id=card["course_id"],
+        question_id=card["question_id"],
+        question=question.get("question"),
+        options=question.get("options", []),
+        topic=quiz.topics[quiz.topic_ids[position]] if position is not None else None,
+        due_at=_timestamp(card["due"]),
+        interval_days=card["interval_days"],
+        repetitions=card["repetitions"],
+        easiness=round(card["easiness"], 3),
+        lapses=card["lapses"]
+    )
+
+
+@router.get("/review/{user_id}/due", response_model=DueReviewsResponse)
+async def get_due_reviews(user_id: str, limit: int = Query(20, ge=1, le=100)):
+    """
+    Get the review cards due now for a user, earliest first.
+
+    Cards come from questions the user answered incorrectly in quizzes.
+    """
+    scheduler = get_review_scheduler()
+    cards = scheduler.due(user_id, limit)
+
+    next_due = None
+    if not cards:
+        next_due = scheduler.next_due(user_id)
+
+    return DueReviewsResponse(
+        user_id=user_id,
+        cards=[_review_card(card) for card in cards],
+        next_due_at=_timestamp(next_due) if next_due is not None else None
+    )
+
+
+@router.post("/review/{user_id}", response_model=ReviewCard)
+async def record_review(user_id: str, request: ReviewRequest):
+    """
+    Record a review grade and reschedule the card (SM-2).
+    """
+    card = get_review_scheduler().review(user_id, request.course_id, request.question_id, request.quality)
+
+    if not card:
+        raise HTTPException(status_code=404, detail="Review card not found")
+
+    return _review_card(card)
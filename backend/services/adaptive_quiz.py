@@ -0,0 +1,329 @@
+"""
+Adaptive Quiz - Computerized adaptive testing over course quizzes
+"""
+import logging
+import math
+import time
+import uuid
+from functools import lru_cache
+from pathlib import Path
+import sys
+from typing import Any, Dict, List, Optional, Tuple
+
+# Add backend to path for config import
+backend_path = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_path))
+
+try:
+    from config import settings
+except ImportError:
+    settings = None
+
+try:
+    from models.local_storage import (
+        delete_adaptive_session_sync,
+        expire_adaptive_sessions_sync,
+        load_adaptive_session_sync,
+        save_adaptive_session_sync
+    )
+except ImportError:
+    load_adaptive_session_sync = None
+
+from services.quiz_service import get_quiz_service
+
+logger = logging.getLogger(__name__)
+
+# Item difficulty label -> IRT difficulty (b) on the ability scale
+DIFFICULTY_B = {"easy": -1.0, "medium": 0.0, "hard": 1.0}
+DEFAULT_DISCRIMINATION = 1.0
+# Logistic scaling constant (approximates the normal ogive)
+SCALING = 1.7
+
+# Ability grid for EAP estimation and the precomputed tables
+THETA_GRID = [round(-4.0 + 0.1 * i, 1) for i in range(81)]
+GRID_STEP = 0.1
+
+# Standard normal prior over the grid (log density, up to a constant)
+LOG_PRIOR = [-0.5 * theta * theta for theta in THETA_GRID]
+
+# How often each worker deletes abandoned sessions
+EXPIRY_SWEEP_SECONDS = 3600
+
+
+def _item_parameters(question: Dict[str, Any]) -> Tuple[float, float, float]:
+    """
+    IRT (a, b, c) for a question.
+
+    An explicit "irt" object ({"a", "b", "c"}) wins; otherwise b comes from
+    the difficulty label, a is the default discrimination and c is 0.
+    """
+    irt = question.get("irt") or {}
+    a = float(irt.get("a", DEFAULT_DISCRIMINATION))
+    b = float(irt.get("b", DIFFICULTY_B.get(question.get("difficulty"), 0.0)))
+    c = float(irt.get("c", 0.0))
+    return a, b, c
+
+
+class ItemBank:
+    """
+    Precomputed IRT tables for one compiled quiz.
+
+    For every item and grid point: log P(correct), log P(incorrect) and
+    Fisher information. For every grid point the items are pre-sorted by
+    information, so next-item selection is a walk down one list until an
+    item that hasn't been administered yet.
+    """
+
+    def __init__(self, quiz: Any):
+        self.quiz = quiz
+        self.log_p: List[List[float]] = []
+        self.log_q: List[List[float]] = []
+        self.information: List[List[float]] = []
+
+        for question in quiz.questions:
+            a, b, c = _item_parameters(question)
+            log_p, log_q, information = [], [], []
+            for theta in THETA_GRID:
+                p = c + (1 - c) / (1 + math.exp(-SCALING * a * (theta - b)))
+                p = min(max(p, 1e-9), 1 - 1e-9)
+                log_p.append(math.log(p))
+                log_q.append(math.log(1 - p))
+                information.append((SCALING * a) ** 2 * ((p - c) / (1 - c)) ** 2 * (1 - p) / p)
+            self.log_p.append(log_p)
+            self.log_q.append(log_q)
+            self.information.append(information)
+
+        self.order: List[List[int]] = [
+            sorted(range(len(quiz.questions)), key=lambda item: -self.information[item][g])
+            for g in range(len(THETA_GRID))
+        ]
+
+    @staticmethod
+    def grid_index(theta: float) -> int:
+        """Nearest grid point to an ability estimate"""
+        index = round((theta - THETA_GRID[0]) / GRID_STEP)
+        return min(max(index, 0), len(THETA_GRID) - 1)
+
+    def next_item(self, theta: float, administered: set) -> Optional[int]:
+        """Most informative item at theta that hasn't been administered"""
+        for item in self.order[self.grid_index(theta)]:
+            if item not in administered:
+                return item
+        return None
+
+
+class AdaptiveSession:
+    """One learner's adaptive quiz in progress"""
+
+    def __init__(self, user_id: str, bank: ItemBank, session_id: Optional[str] = None):
+        self.session_id = session_id or uuid.uuid4().hex
+        self.user_id = user_id
+        self.bank = bank
+        self.log_posterior = list(LOG_PRIOR)
+        self.administered: List[int] = []
+        self.answers: Dict[str, int] = {}
+        self.correct_mask: List[bool] = []
+        self.current: Optional[int] = None
+        self.theta = 0.0
+        self.se = 1.0
+
+    @property
+    def course_id(self) -> str:
+        return self.bank.quiz.course_id
+
+    def record(self, item: int, answer: int) -> bool:
+        """Record the answer to an item and update the estimate; returns is_correct"""
+        quiz = self.bank.quiz
+        is_correct = answer == quiz.correct[item]
+        self.administered.append(item)
+        self.answers[quiz.questions[item]["id"]] = answer
+        self.correct_mask.append(is_correct)
+        self.update(item, is_correct)
+        return is_correct
+
+    def update(self, item: int, is_correct: bool):
+        """Fold one response into the posterior and refresh the EAP estimate"""
+        row = self.bank.log_p[item] if is_correct else self.bank.log_q[item]
+        self.log_posterior = [lp + lr for lp, lr in zip(self.log_posterior, row)]
+
+        peak = max(self.log_posterior)
+        weights = [math.exp(lp - peak) for lp in self.log_posterior]
+        total = sum(weights)
+        mean = sum(w * theta for w, theta in zip(weights, THETA_GRID)) / total
+        variance = sum(w * (theta - mean) ** 2 for w, theta in zip(weights, THETA_GRID)) / total
+        self.theta = mean
+        self.se = math.sqrt(variance)
+
+    def state(self) -> Dict[str, Any]:
+        """Persistable state; the estimate and next question are replayed from it"""
+        quiz = self.bank.quiz
+        return {
+            "session_id": self.session_id,
+            "user_id": self.user_id,
+            "course_id": self.course_id,
+            "quiz_etag": quiz.etag,
+            "responses": [
+                [quiz.questions[item]["id"], self.answers[quiz.questions[item]["id"]]]
+                for item in self.administered
+            ],
+            "updated_at": time.time()
+        }
+
+
+class AdaptiveQuizService:
+    """
+    Adaptive quiz sessions.
+
+    Features:
+    - Next question by maximum information at the current ability estimate,
+      looked up in per-course tables built once per compiled quiz
+    - EAP ability estimate on a fixed grid with a standard normal prior
+    - Stops when the standard error drops below the threshold, when the best
+      remaining question would lower it by less than min_se_reduction (so
+      small item banks that can never reach the threshold still end early),
+      at the item cap, or when the quiz runs out of questions
+    - Sessions are persisted after every answer (data/storage/adaptive_sessions),
+      so any worker can continue them; sessions not answered for
+      session_ttl_hours are deleted
+    """
+
+    def __init__(
+        self,
+        se_threshold: float = 0.5,
+        min_se_reduction: float = 0.03,
+        max_items: int = 20,
+        session_ttl_hours: float = 24
+    ):
+        self.se_threshold = se_threshold
+        self.min_se_reduction = min_se_reduction
+        self.max_items = max_items
+        self.session_ttl_hours = session_ttl_hours
+        self._banks: Dict[str, ItemBank] = {}
+        self._sessions: Dict[str, Dict[str, Any]] = {}  # Used when storage is unavailable
+        self._last_sweep = 0.0
+
+    def bank(self, quiz: Any) -> ItemBank:
+        """Item tables for a compiled quiz (rebuilt when the quiz is recompiled)"""
+        bank = self._banks.get(quiz.course_id)
+        if bank is None or bank.quiz is not quiz:
+            bank = self._banks[quiz.course_id] = ItemBank(quiz)
+        return bank
+
+    def _next_item(self, session: AdaptiveSession) -> Optional[int]:
+        """Next question for a session, or None if the stopping rule is met"""
+        if len(session.administered) >= self.max_items or session.se < self.se_threshold:
+            return None
+        item = session.bank.next_item(session.theta, set(session.administered))
+        if item is None or not session.administered:
+            return item
+        # Predicted standard error after one more answer to the best remaining item
+        information = session.bank.information[item][session.bank.grid_index(session.theta)]
+        predicted_se = 1 / math.sqrt(1 / session.se ** 2 + information)
+        return item if session.se - predicted_se >= self.min_se_reduction else None
+
+    def _save(self, session: AdaptiveSession):
+        state = session.state()
+        if load_adaptive_session_sync:
+            save_adaptive_session_sync(state)
+        else:
+            self._sessions[session.session_id] = state
+
+    def _expire_sessions(self):
+        now = time.time()
+        if not load_adaptive_session_sync or now - self._last_sweep < EXPIRY_SWEEP_SECONDS:
+            return
+        self._last_sweep = now
+        expired = expire_adaptive_sessions_sync(self.session_ttl_hours * 3600)
+        if expired:
+            logger.info(f"Expired {expired} abandoned adaptive quiz sessions")
+
+    def get_session(self, session_id: str) -> Optional[AdaptiveSession]:
+        """
+        Load a session saved by any worker.
+
+        Args:
+            session_id: Session identifier
+
+        Returns:
+            The session, replayed against the current quiz, or None if it is
+            unknown, finished, expired, or the quiz changed since it started
+        """
+        if load_adaptive_session_sync:
+            state = load_adaptive_session_sync(session_id)
+        else:
+            state = self._sessions.get(session_id)
+        if not state:
+            return None
+
+        quiz = get_quiz_service().get_quiz(state["course_id"])
+        if not quiz or quiz.etag != state["quiz_etag"]:
+            return None
+        session = AdaptiveSession(state["user_id"], self.bank(quiz), session_id=state["session_id"])
+        for question_id, answer in state["responses"]:
+            session.record(quiz.question_index[question_id], answer)
+        session.current = self._next_item(session)
+        return session
+
+    def start(self, quiz: Any, user_id: str) -> AdaptiveSession:
+        """
+        Start an adaptive session and pick its first question.
+
+        Args:
+            quiz: Compiled quiz
+            user_id: Learner identifier
+
+        Returns:
+            The new session, with `current` set to the first item
+        """
+        self._expire_sessions()
+        session = AdaptiveSession(user_id, self.bank(quiz))
+        session.current = self._next_item(session)
+        self._save(session)
+        return session
+
+    def answer(self, session: AdaptiveSession, question_id: str, answer: int) -> Dict[str, Any]:
+        """
+        Record the answer to the current question and pick the next one.
+
+        Args:
+            session: Active session
+            question_id: Must be the question currently asked
+            answer: Selected option index
+
+        Returns:
+            is_correct and done; `session.current` is the next item or None
+
+        Raises:
+            ValueError: If the session is finished or question_id isn't the current question
+        """
+        quiz = session.bank.quiz
+        if session.current is None:
+            raise ValueError("Adaptive quiz is already finished")
+        if quiz.questions[session.current]["id"] != question_id:
+            raise ValueError(f"Expected an answer to question {quiz.questions[session.current]['id']}")
+
+        is_correct = session.record(session.current, answer)
+        session.current = self._next_item(session)
+        if session.current is not None:
+            self._save(session)
+        return {"is_correct": is_correct, "done": session.current is None}
+
+    def finish(self, session: AdaptiveSession):
+        """Forget a finished session"""
+        if load_adaptive_session_sync:
+            delete_adaptive_session_sync(session.session_id)
+        else:
+            self._sessions.pop(session.session_id, None)
+
+
+@lru_cache()
+def get_adaptive_quiz_service() -> AdaptiveQuizService:
+    """Get the process-wide adaptive quiz service"""
+    if not settings:
+        return AdaptiveQuizService()
+    return AdaptiveQuizService(
+        se_threshold=settings.ADAPTIVE_QUIZ_SE_THRESHOLD,
+        min_se_reduction=settings.ADAPTIVE_QUIZ_MIN_SE_REDUCTION,
+        max_items=settings.ADAPTIVE_QUIZ_MAX_ITEMS,
+        session_ttl_hours=settings.ADAPTIVE_QUIZ_SESSION_TTL_HOURS
+    )
@@ -0,0 +1,254 @@
+"""
+Answer Cache - Per-course semantic cache for chatbot answers
+"""
+import math
+import re
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from pathlib import Path
+import sys
+from typing import Any, Dict, List, Optional
+
+# Add backend to path for config import
+backend_path = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_path))
+
+try:
+    from config import settings
+except ImportError:
+    settings = None
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+_NORMALIZE_PATTERN = re.compile(r"[^a-z0-9\s]+")
+_WHITESPACE_PATTERN = re.compile(r"\s+")
+
+# Words that carry no meaning for matching near-duplicate questions. Question
+# words stay: "how does X work" and "why does X work" ask different things
+_STOPWORDS = {
+    "a", "an", "the", "is", "are", "was", "were", "be", "do", "does", "did",
+    "can", "could", "would", "should", "you", "me", "i", "my", "please",
+    "tell", "explain", "about", "of", "in", "on", "to", "for", "and", "or",
+    "it", "this", "that", "s"
+}
+
+LOCAL_EMBEDDING_DIMENSIONS = 256
+
+
+def normalize_question(question: str) -> str:
+    """Lowercase, strip punctuation and collapse whitespace"""
+    text = _NORMALIZE_PATTERN.sub(" ", (question or "").lower())
+    return _WHITESPACE_PATTERN.sub(" ", text).strip()
+
+
+def local_embedding(question: str, dimensions: int = LOCAL_EMBEDDING_DIMENSIONS) -> List[float]:
+    """
+    Deterministic hashed bag-of-words embedding.
+
+    Used for similarity matching when no embedding model is configured
+    (mock mode, offline development).
+    """
+    vector = [0.0] * dimensions
+    for token in normalize_question(question).split():
+        if token in _STOPWORDS:
+            continue
+        vector[zlib.crc32(token.encode("utf-8")) % dimensions] += 1.0
+    norm = math.sqrt(sum(v * v for v in vector))
+    if norm == 0:
+        return vector
+    return [v / norm for v in vector]
+
+
+class _CourseBucket:
+    """Cached entries for a single course, tied to one knowledge base version"""
+
+    def __init__(self, kb_version: str):
+        self.kb_version = kb_version
+        # normalized question -> entry, least recently used first
+        self.entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+
+
+class AnswerCache:
+    """
+    Per-course cache of chatbot answers keyed by question.
+
+    Features:
+    - Exact match on normalized question text
+    - Embedding similarity match above a configurable threshold
+    - TTL expiry and LRU eviction with a per-course entry bound
+    - Automatic invalidation when the course knowledge base version changes
+    """
+
+    def __init__(
+        self,
+        ttl_seconds: float = 3600,
+        max_entries: int = 500,
+        similarity_threshold: float = 0.9
+    ):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.similarity_threshold = similarity_threshold
+        self._buckets: Dict[str, _CourseBucket] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _bucket(self, course_id: str, kb_version: str) -> _CourseBucket:
+        """Get the bucket for a course, resetting it if the knowledge base changed"""
+        bucket = self._buckets.get(course_id)
+        if bucket is None or bucket.kb_version != kb_version:
+            bucket = _CourseBucket(kb_version)
+            self._buckets[course_id] = bucket
+        return bucket
+
+    def _is_expired(self, entry: Dict[str, Any], now: float) -> bool:
+        return self.ttl_seconds > 0 and now - entry["created_at"] > self.ttl_seconds
+
+    def _hit(self, bucket: _CourseBucket, key: str) -> Dict[str, Any]:
+        bucket.entries.move_to_end(key)
+        self.hits += 1
+        entry = bucket.entries[key]
+        return {"message": entry["message"], "sources": entry["sources"]}
+
+    def get_exact(self, course_id: str, question: str, kb_version: str) -> Optional[Dict[str, Any]]:
+        """
+        Look up an answer by normalized question text.
+
+        Args:
+            course_id: Course identifier
+            question: Incoming user question
+            kb_version: Current knowledge base version for the course
+
+        Returns:
+            Cached answer with message and sources, or None
+        """
+        key = normalize_question(question)
+        now = time.time()
+        with self._lock:
+            bucket = self._bucket(course_id, kb_version)
+            entry = bucket.entries.get(key)
+            if entry is None:
+                return None
+            if self._is_expired(entry, now):
+                del bucket.entries[key]
+                return None
+            return self._hit(bucket, key)
+
+    def get_similar(
+        self,
+        course_id: str,
+        embedding: Optional[List[float]],
+        kb_version: str
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Look up an answer by embedding similarity.
+
+        Args:
+            course_id: Course identifier
+            embedding: Embedding of the incoming question
+            kb_version: Current knowledge base version for the course
+
+        Returns:
+            Cached answer of the most similar question above the threshold, or None
+        """
+        if not embedding:
+            with self._lock:
+                self.misses += 1
+            return None
+
+        now = time.time()
+        with self._lock:
+            bucket = self._bucket(course_id, kb_version)
+            expired = [key for key, entry in bucket.entries.items() if self._is_expired(entry, now)]
+            for key in expired:
+                del bucket.entries[key]
+
+            candidates = [
+                (key, entry) for key, entry in bucket.entries.items()
+                if entry["embedding"] and len(entry["embedding"]) == len(embedding)
+            ]
+            if not candidates:
+                self.misses += 1
+                return None
+
+            best_key, best_score = self._most_similar(embedding, candidates)
+            if best_score < self.similarity_threshold:
+                self.misses += 1
+                return None
+            return self._hit(bucket, best_key)
+
+    def _most_similar(self, embedding: List[float], candidates: List) -> tuple:
+        """Return (key, cosine similarity) of the closest candidate"""
+        if np is not None:
+            matrix = np.asarray([entry["embedding"] for _, entry in candidates], dtype="float32")
+            query = np.asarray(embedding, dtype="float32")
+            norms = np.linalg.norm(matrix, axis=1) * (np.linalg.norm(query) or 1.0)
+            scores = matrix @ query / np.where(norms == 0, 1.0, norms)
+            best = int(np.argmax(scores))
+            return candidates[best][0], float(scores[best])
+
+        query_norm = math.sqrt(sum(v * v for v in embedding)) or 1.0
+        best_key, best_score = None, -1.0
+        for key, entry in candidates:
+            vector = entry["embedding"]
+            norm = math.sqrt(sum(v * v for v in vector)) or 1.0
+            score = sum(a * b for a, b in zip(vector, embedding)) / (norm * query_norm)
+            if score > best_score:
+                best_key, best_score = key, score
+        return best_key, best_score
+
+    def store(
+        self,
+        course_id: str,
+        question: str,
+        kb_version: str,
+        message: str,
+        sources: List[Dict],
+        embedding: Optional[List[float]] = None
+    ):
+        """Store an answer, evicting the least recently used entry when full"""
+        key = normalize_question(question)
+        if not key:
+            return
+        with self._lock:
+            bucket = self._bucket(course_id, kb_version)
+            bucket.entries[key] = {
+                "message": message,
+                "sources": sources,
+                "embedding": embedding,
+                "created_at": time.time()
+            }
+            bucket.entries.move_to_end(key)
+            while len(bucket.entries) > self.max_entries:
+                bucket.entries.popitem(last=False)
+
+    def invalidate(self, course_id: Optional[str] = None):
+        """Drop cached answers for one course, or for all courses"""
+        with self._lock:
+            if course_id is None:
+                self._buckets.clear()
+            else:
+                self._buckets.pop(course_id, None)
+
+    def stats(self) -> Dict[str, Any]:
+        """Cache hit/miss counters and entry counts per course"""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "entries": {course_id: len(b.entries) for course_id, b in self._buckets.items()}
+            }
+
+
+# Global answer cache shared by all chatbot instances in this process
+answer_cache = AnswerCache(
+    ttl_seconds=settings.ANSWER_CACHE_TTL_SECONDS if settings else 3600,
+    max_entries=settings.ANSWER_CACHE_MAX_ENTRIES if settings else 500,
+    similarity_threshold=settings.ANSWER_CACHE_SIMILARITY_THRESHOLD if settings else 0.9
+)
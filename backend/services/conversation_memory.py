@@ -0,0 +1,218 @@
+"""
+Conversation Memory - Server-side session history with a token-budgeted window
+"""
+import re
+import uuid
+from datetime import datetime
+from pathlib import Path
+import sys
+from typing import Any, Dict, List, Optional
+
+# Add backend to path for config import
+backend_path = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_path))
+
+try:
+    from config import settings
+except ImportError:
+    settings = None
+
+try:
+    from models.local_storage import (
+        load_conversation_sync,
+        save_conversation_sync,
+        delete_conversation_sync
+    )
+except ImportError:
+    load_conversation_sync = None
+    save_conversation_sync = None
+    delete_conversation_sync = None
+
+
+_MARKDOWN_PATTERN = re.compile(r"[*_#`>]+")
+_BRACKET_PREFIX_PATTERN = re.compile(r"^\[[^\]]*\]\s*")
+_SENTENCE_END_PATTERN = re.compile(r"(?<=[.!?])\s")
+
+SUMMARY_LINE_WORDS = 25
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (~4 characters per token)"""
+    return (len(text or "") + 3) // 4
+
+
+class ConversationMemory:
+    """
+    Server-side conversation memory keyed by session_id.
+
+    Features:
+    - Sessions persisted through the storage layer
+    - Rolling window of recent messages
+    - Compact running summary of messages that fell out of the window
+    - Window plus summary trimmed to a configurable token budget
+    """
+
+    def __init__(
+        self,
+        token_budget: int = 2000,
+        summary_tokens: int = 300,
+        window_messages: int = 12
+    ):
+        self.token_budget = token_budget
+        self.summary_tokens = summary_tokens
+        self.window_messages = window_messages
+
+    def load(
+        self,
+        session_id: Optional[str] = None,
+        user_id: Optional[str] = None,
+        course_id: Optional[str] = None,
+        conversation_type: str = "chat"
+    ) -> Dict[str, Any]:
+        """
+        Load a session, creating a new one if it doesn't exist.
+
+        Session ids are always generated here. An unknown id, or a session
+        that belongs to another user, course or conversation type, starts a
+        new session rather than adopting or exposing the requested one.
+
+        Args:
+            session_id: Existing session identifier (a new one is generated if omitted)
+            user_id: Owner of the conversation
+            course_id: Course for chat sessions, None for discovery
+            conversation_type: chat or discovery
+
+        Returns:
+            Conversation document with messages and summary
+        """
+        session = None
+        if session_id and load_conversation_sync:
+            session = load_conversation_sync(session_id)
+            if session is not None and not self._owned_by(session, user_id, course_id, conversation_type):
+                session = None
+
+        if session is None:
+            session = {
+                "session_id": uuid.uuid4().hex,
+                "user_id": user_id,
+                "course_id": course_id,
+                "conversation_type": conversation_type,
+                "summary": "",
+                "messages": []
+            }
+        session.setdefault("summary", "")
+        session.setdefault("messages", [])
+        return session
+
+    def _owned_by(
+        self,
+        session: Dict[str, Any],
+        user_id: Optional[str],
+        course_id: Optional[str],
+        conversation_type: str
+    ) -> bool:
+        return (
+            session.get("user_id") == user_id
+            and session.get("course_id") == course_id
+            and session.get("conversation_type", conversation_type) == conversation_type
+        )
+
+    def save(self, session: Dict[str, Any]):
+        """Persist a session"""
+        if save_conversation_sync:
+            save_conversation_sync(session)
+
+    def delete(self, session_id: str, user_id: Optional[str] = None) -> bool:
+        """
+        Delete a session owned by user_id.
+
+        Args:
+            session_id: Session identifier
+            user_id: Must match the session's owner (None only deletes anonymous sessions)
+
+        Returns:
+            True if the session existed, belonged to user_id and was deleted
+        """
+        if not load_conversation_sync or not delete_conversation_sync:
+            return False
+        session = load_conversation_sync(session_id)
+        if session is None or session.get("user_id") != user_id:
+            return False
+        return delete_conversation_sync(session_id)
+
+    def append(self, session: Dict[str, Any], role: str, content: str, **extra):
+        """Append a message and trim the session to the budget"""
+        session["messages"].append({
+            "role": role,
+            "content": content,
+            "timestamp": datetime.utcnow().isoformat(),
+            **extra
+        })
+        self._trim(session)
+
+    def get_history(self, session: Dict[str, Any]) -> List[Dict]:
+        """
+        History to hand to the model: running summary followed by the recent window.
+
+        Args:
+            session: Conversation document
+
+        Returns:
+            List of {role, content} messages
+        """
+        history = []
+        if session.get("summary"):
+            history.append({
+                "role": "system",
+                "content": f"Summary of the earlier conversation:\n{session['summary']}"
+            })
+        history.extend(
+            {"role": m["role"], "content": m["content"]}
+            for m in session.get("messages", [])
+        )
+        return history
+
+    def _window_tokens(self, session: Dict[str, Any]) -> int:
+        return estimate_tokens(session["summary"]) + sum(
+            estimate_tokens(m["content"]) for m in session["messages"]
+        )
+
+    def _trim(self, session: Dict[str, Any]):
+        """Fold the oldest messages into the summary until the session fits"""
+        messages = session["messages"]
+        while len(messages) > 1 and (
+            len(messages) > self.window_messages
+            or self._window_tokens(session) > self.token_budget
+        ):
+            session["summary"] = self._fold(session["summary"], messages.pop(0))
+
+    def _fold(self, summary: str, message: Dict) -> str:
+        """Add a one-line digest of a message to the summary, dropping the oldest lines if needed"""
+        lines = [line for line in summary.split("\n") if line]
+        lines.append(f"{message['role'].capitalize()}: {self._digest(message['content'])}")
+        while len(lines) > 1 and estimate_tokens("\n".join(lines)) > self.summary_tokens:
+            lines.pop(0)
+        return "\n".join(lines)
+
+    def _digest(self, content: str) -> str:
+        """First sentence of a message, stripped of markdown and capped in length"""
+        lines = [
+            _BRACKET_PREFIX_PATTERN.sub("", _MARKDOWN_PATTERN.sub("", line)).strip()
+            for line in (content or "").split("\n")
+        ]
+        lines = [line for line in lines if line]
+        # Skip lead-in lines such as "Here's what I found:" in favour of the substance
+        text = next((line for line in lines if not line.endswith(":")), lines[0] if lines else "")
+        sentence = _SENTENCE_END_PATTERN.split(text, maxsplit=1)[0]
+        words = sentence.split()
+        if len(words) > SUMMARY_LINE_WORDS:
+            return " ".join(words[:SUMMARY_LINE_WORDS]) + "..."
+        return sentence
+
+
+# Global conversation memory shared by the chat and discovery routers
+conversation_memory = ConversationMemory(
+    token_budget=settings.CONVERSATION_TOKEN_BUDGET if settings else 2000,
+    summary_tokens=settings.CONVERSATION_SUMMARY_TOKENS if settings else 300,
+    window_messages=settings.CONVERSATION_WINDOW_MESSAGES if settings else 12
+)
@@ -0,0 +1,192 @@
+"""
+Course Index - Inverted index from roles and keywords to courses for discovery matching
+"""
+import heapq
+from typing import Dict, List, Optional
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+class CourseMatchIndex:
+    """
+    Inverted index over the course catalog, built once at catalog load time.
+
+    Scoring (same weights as the original linear scan):
+    - +3 if the user's role is one of the course roles
+    - +2 for each interest that is a course keyword
+    - +1 for each course keyword contained in the user's interests
+
+    Only courses reachable from the role/interest postings are scored, and
+    the top results are selected with a heap.
+    """
+
+    ROLE_WEIGHT = 3
+    INTEREST_WEIGHT = 2
+    KEYWORD_WEIGHT = 1
+
+    def __init__(self, courses: List[Dict]):
+        self.courses = courses
+        self.role_index: Dict[str, List[int]] = {}
+        self.keyword_index: Dict[str, List[int]] = {}
+
+        for position, course in enumerate(courses):
+            for role in dict.fromkeys(course.get("roles", [])):
+                self.role_index.setdefault(role, []).append(position)
+            for keyword in dict.fromkeys(course.get("keywords", [])):
+                self.keyword_index.setdefault(keyword, []).append(position)
+
+        self._max_keyword_length = max((len(k) for k in self.keyword_index), default=0)
+
+    def _keywords_in(self, text: str) -> List[str]:
+        """Indexed keywords that occur as substrings of text (O(len(text)^2), catalog-independent)"""
+        found = []
+        seen = set()
+        for start in range(len(text)):
+            for end in range(start + 1, min(len(text), start + self._max_keyword_length) + 1):
+                candidate = text[start:end]
+                if candidate in self.keyword_index and candidate not in seen:
+                    seen.add(candidate)
+                    found.append(candidate)
+        return found
+
+    def score(self, role: Optional[str], interests: List[str]) -> Dict[int, int]:
+        """
+        Accumulate scores for candidate courses.
+
+        Args:
+            role: Detected user role
+            interests: Detected user interests
+
+        Returns:
+            Map of course position to score (only courses with a positive score)
+        """
+        scores: Dict[int, int] = dict.fromkeys(self.role_index.get(role, ()), self.ROLE_WEIGHT) if role else {}
+        get = scores.get
+
+        for interest in interests:
+            for position in self.keyword_index.get(interest, ()):
+                scores[position] = get(position, 0) + self.INTEREST_WEIGHT
+
+        # Keywords mentioned anywhere in the interests, each counted once per course
+        matched_keywords = set()
+        for interest in interests:
+            matched_keywords.update(self._keywords_in(interest.lower()))
+        for keyword in matched_keywords:
+            for position in self.keyword_index[keyword]:
+                scores[position] = get(position, 0) + self.KEYWORD_WEIGHT
+
+        return scores
+
+    def _reason(self, course: Dict, role: Optional[str], interests: List[str]) -> str:
+        """Explain a match (only computed for the returned courses)"""
+        reason_parts = []
+        if role and role in course.get("roles", []):
+            reason_parts.append(f"great for {role}s")
+        keywords = course.get("keywords", [])
+        for interest in interests:
+            if interest in keywords:
+                reason_parts.append(f"covers {interest}")
+        reason = ", ".join(reason_parts[:2]) if reason_parts else "recommended based on your profile"
+        return reason.capitalize()
+
+    def top(self, role: Optional[str], interests: List[str], k: int = 3) -> List[Dict]:
+        """
+        Best matching courses for a profile.
+
+        Args:
+            role: Detected user role
+            interests: Detected user interests
+            k: Number of courses to return
+
+        Returns:
+            Up to k course matches, best first (ties keep catalog order)
+        """
+        return self.rank(self.score(role, interests), role, interests, k=k)
+
+    def rank(
+        self,
+        scores: Dict[int, float],
+        role: Optional[str],
+        interests: List[str],
+        k: int = 3
+    ) -> List[Dict]:
+        """Turn accumulated scores into the top-k course matches with reasons"""
+        best = heapq.nsmallest(k, scores.items(), key=lambda item: (-item[1], item[0]))
+
+        matches = []
+        for position, score in best:
+            course = self.courses[position]
+            matches.append({
+                "course_id": course["course_id"],
+                "title": course["title"],
+                "score": round(score, 3) if isinstance(score, float) else score,
+                "reason": self._reason(course, role, interests)
+            })
+        return matches
+
+
+class CourseEmbeddingIndex:
+    """
+    Normalized course-embedding matrix for semantic course matching.
+
+    Built once per catalog version from the `embedding` field written by
+    scripts/generate_embeddings.py; queries are a single matrix-vector
+    product followed by a partial sort.
+    """
+
+    def __init__(self, courses: List[Dict]):
+        self.positions: List[int] = []
+        self.matrix = None
+        self.dimensions = 0
+
+        if np is None:
+            return
+
+        vectors = []
+        for position, course in enumerate(courses):
+            embedding = course.get("embedding")
+            if embedding and (not vectors or len(embedding) == len(vectors[0])):
+                self.positions.append(position)
+                vectors.append(embedding)
+
+        if vectors:
+            matrix = np.asarray(vectors, dtype="float32")
+            norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+            self.matrix = matrix / np.where(norms == 0, 1.0, norms)
+            self.dimensions = self.matrix.shape[1]
+
+    @property
+    def available(self) -> bool:
+        return self.matrix is not None
+
+    def top(self, query_embedding: List[float], k: int = 10, min_similarity: float = 0.0) -> Dict[int, float]:
+        """
+        Most similar courses to a query embedding.
+
+        Args:
+            query_embedding: Embedding of the user profile text
+            k: Maximum number of courses to return
+            min_similarity: Cosine similarity cut-off
+
+        Returns:
+            Map of course position to cosine similarity
+        """
+        if not self.available or not query_embedding or len(query_embedding) != self.dimensions:
+            return {}
+
+        query = np.asarray(query_embedding, dtype="float32")
+        norm = np.linalg.norm(query)
+        if norm == 0:
+            return {}
+        similarities = self.matrix @ (query / norm)
+
+        k = min(k, len(similarities))
+        candidates = np.argpartition(-similarities, k - 1)[:k]
+        return {
+            self.positions[i]: float(similarities[i])
+            for i in candidates
+            if similarities[i] >= min_similarity
+        }
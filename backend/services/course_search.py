@@ -0,0 +1,238 @@
+"""
+Course Search - Faceted catalog search over precomputed course bitmaps
+"""
+import bisect
+import logging
+import re
+from pathlib import Path
+import sys
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# Add backend to path for storage import
+backend_path = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_path))
+
+try:
+    from models.local_storage import load_course_catalog_sync, get_course_catalog_version_sync
+except ImportError:
+    load_course_catalog_sync = None
+    get_course_catalog_version_sync = None
+
+logger = logging.getLogger(__name__)
+
+_TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+_HOURS_PATTERN = re.compile(r"(\d+(?:\.\d+)?)\s*(hour|hr|h|minute|min|m)", re.IGNORECASE)
+
+# Duration facet buckets: (value, lower bound in hours inclusive, upper bound exclusive)
+DURATION_BUCKETS = [
+    ("short", 0.0, 3.0),
+    ("medium", 3.0, 5.0),
+    ("long", 5.0, float("inf"))
+]
+
+FACETS = ("difficulty", "role", "topic", "duration")
+
+# Fields returned for each course in listings and search results
+SUMMARY_FIELDS = ("course_id", "title", "description", "difficulty", "duration", "topics", "roles")
+
+
+def _tokenize(text: str) -> List[str]:
+    return _TOKEN_PATTERN.findall((text or "").lower())
+
+
+def _popcount(bits: int) -> int:
+    return bin(bits).count("1")
+
+
+def _positions(bits: int) -> List[int]:
+    """Set bit positions in ascending order (cost proportional to matches)"""
+    positions = []
+    while bits:
+        low = bits & -bits
+        positions.append(low.bit_length() - 1)
+        bits ^= low
+    return positions
+
+
+def parse_duration_hours(duration: Optional[str]) -> Optional[float]:
+    """Parse a duration like "4 hours" or "90 min" into hours"""
+    if not duration:
+        return None
+    hours = 0.0
+    found = False
+    for amount, unit in _HOURS_PATTERN.findall(duration):
+        found = True
+        value = float(amount)
+        hours += value / 60 if unit.lower().startswith("m") else value
+    return hours if found else None
+
+
+def duration_bucket(duration: Optional[str]) -> Optional[str]:
+    """Duration facet value for a course duration string"""
+    hours = parse_duration_hours(duration)
+    if hours is None:
+        return None
+    for value, lower, upper in DURATION_BUCKETS:
+        if lower <= hours < upper:
+            return value
+    return None
+
+
+class CourseSearchIndex:
+    """
+    Faceted search index over the course catalog, built once per catalog version.
+
+    Each facet value and each text token maps to a bitmap (a Python int with
+    bit i set for course position i), so filtering is a bitwise AND and facet
+    counting is a popcount of an intersection; no request scans the catalog.
+
+    Facet counts are disjunctive: the counts for a dimension apply every
+    filter except that dimension's own, so they show what selecting another
+    value would return.
+    """
+
+    def __init__(self, courses: List[Dict], version: str = ""):
+        self.version = version
+        self.courses = courses
+        self.summaries = [self._summarize(course) for course in courses]
+        self.all_bits = (1 << len(courses)) - 1
+
+        self.facets: Dict[str, Dict[str, int]] = {facet: {} for facet in FACETS}
+        self.text_index: Dict[str, int] = {}
+        self.title_index: Dict[str, int] = {}
+
+        for position, course in enumerate(courses):
+            bit = 1 << position
+            self._add("difficulty", course.get("difficulty"), bit)
+            for role in course.get("roles", []):
+                self._add("role", role, bit)
+            for topic in course.get("topics", []):
+                self._add("topic", topic, bit)
+            self._add("duration", duration_bucket(course.get("duration")), bit)
+
+            for token in set(self._course_tokens(course)):
+                self.text_index[token] = self.text_index.get(token, 0) | bit
+            for token in set(_tokenize(course.get("title", ""))):
+                self.title_index[token] = self.title_index.get(token, 0) | bit
+
+        self.vocabulary = sorted(self.text_index)
+
+    def _add(self, facet: str, value: Optional[str], bit: int):
+        if not value:
+            return
+        key = value.lower()
+        self.facets[facet][key] = self.facets[facet].get(key, 0) | bit
+
+    @staticmethod
+    def _course_tokens(course: Dict) -> Iterable[str]:
+        yield from _tokenize(course.get("title", ""))
+        yield from _tokenize(course.get("description", ""))
+        for field in ("topics", "keywords", "roles"):
+            for value in course.get(field, []):
+                yield from _tokenize(value)
+        for module in course.get("modules", []) if isinstance(course.get("modules"), list) else []:
+            yield from _tokenize(module.get("title", ""))
+
+    @staticmethod
+    def _summarize(course: Dict) -> Dict:
+        summary = {field: course[field] for field in SUMMARY_FIELDS if field in course}
+        modules = course.get("modules", [])
+        summary["modules"] = len(modules) if isinstance(modules, list) else modules
+        return summary
+
+    def _text_bits(self, query: str) -> Tuple[int, List[str]]:
+        """Courses matching every query token (the last token also matches as a prefix)"""
+        tokens = _tokenize(query)
+        bits = self.all_bits
+        for i, token in enumerate(tokens):
+            token_bits = self.text_index.get(token, 0)
+            if i == len(tokens) - 1:
+                start = bisect.bisect_left(self.vocabulary, token)
+                for word in self.vocabulary[start:]:
+                    if not word.startswith(token):
+                        break
+                    token_bits |= self.text_index[word]
+            bits &= token_bits
+            if not bits:
+                break
+        return bits, tokens
+
+    def _facet_bits(self, facet: str, values: Optional[List[str]]) -> int:
+        """Union of the bitmaps for the selected values of one facet"""
+        if not values:
+            return self.all_bits
+        bits = 0
+        for value in values:
+            bits |= self.facets[facet].get(value.lower(), 0)
+        return bits
+
+    def search(
+        self,
+        query: Optional[str] = None,
+        filters: Optional[Dict[str, List[str]]] = None,
+        limit: int = 20,
+        offset: int = 0
+    ) -> Dict:
+        """
+        Search the catalog.
+
+        Args:
+            query: Free-text query (title, description, topics, keywords, modules)
+            filters: Selected values per facet (values within a facet are OR-ed)
+            limit: Page size
+            offset: Page offset
+
+        Returns:
+            Dict with total, courses (best first) and facet counts per dimension
+        """
+        filters = filters or {}
+        text_bits, tokens = self._text_bits(query) if query else (self.all_bits, [])
+        facet_bits = {facet: self._facet_bits(facet, filters.get(facet)) for facet in FACETS}
+
+        matched = text_bits
+        for bits in facet_bits.values():
+            matched &= bits
+
+        facet_counts: Dict[str, Dict[str, int]] = {}
+        for facet in FACETS:
+            # Every filter except this facet's own
+            base = text_bits
+            for other, bits in facet_bits.items():
+                if other != facet:
+                    base &= bits
+            facet_counts[facet] = {
+                value: _popcount(bits & base)
+                for value, bits in self.facets[facet].items()
+            }
+
+        positions = _positions(matched)
+        if tokens:
+            # Title hits rank first; ties keep catalog order
+            positions.sort(key=lambda i: -sum(self.title_index.get(t, 0) >> i & 1 for t in tokens))
+
+        return {
+            "total": len(positions),
+            "courses": [self.summaries[i] for i in positions[offset:offset + limit]],
+            "facets": facet_counts
+        }
+
+
+_search_index: Optional[CourseSearchIndex] = None
+
+
+def get_course_search_index() -> CourseSearchIndex:
+    """
+    Get the course search index, rebuilding it when the catalog changes.
+
+    The rebuilt index replaces the old one in a single assignment, so
+    concurrent requests always see a complete index.
+    """
+    global _search_index
+    index = _search_index
+    version = get_course_catalog_version_sync() if get_course_catalog_version_sync else "static"
+    if index is not None and index.version == version:
+        return index
+
+    index = CourseSearchIndex(load_course_catalog_sync() if load_course_catalog_sync else [], version=version)
+    _search_index = index
+    return index
@@ -1,8 +1,9 @@
 """
 Discovery Agent - LangGraph-based course recommendation agent
 """
-from typing import List, Dict, Any, Optional, TypedDict
+from typing import List, Dict, Any, Optional, Tuple, TypedDict
 from enum import Enum
+from functools import lru_cache
 import os
 from pathlib import Path
 import sys
@@ -17,9 +18,20 @@ except ImportError:
     settings = None
 
 try:
-    from models.local_storage import load_courses_sync
+    from models.local_storage import load_courses_sync, get_courses_version_sync
 except ImportError:
     load_courses_sync = None
+    get_courses_version_sync = None
+
+from services.keyword_matcher import get_keyword_matcher
+from services.course_index import CourseMatchIndex, CourseEmbeddingIndex
+from services.embeddings import create_embedding_client, embed_text
+
+# Accumulated user text kept in the profile for semantic matching
+MAX_PROFILE_TEXT_CHARS = 2000
+
+# Fields exposed by /discover/courses
+CATALOG_FIELDS = ("course_id", "title", "keywords", "difficulty", "roles")
 
 # LangGraph imports - these will be used when LangGraph is installed
 # from langgraph.graph import StateGraph, END
@@ -49,6 +61,26 @@ class DiscoveryState(TypedDict):
     turn_count: int
 
 
+class CourseCatalog:
+    """
+    Immutable snapshot of the course catalog and its precomputed match structures.
+
+    Snapshots are never mutated after construction; a catalog change builds a
+    new snapshot and swaps the agent's reference to it in a single assignment.
+    """
+
+    def __init__(self, version: str, courses: List[Dict], semantic: bool = False):
+        self.version = version
+        self.courses = courses
+        self.course_index = CourseMatchIndex(courses)
+        embedding_index = CourseEmbeddingIndex(courses) if semantic else None
+        self.embedding_index = embedding_index if embedding_index and embedding_index.available else None
+        self.summaries = [
+            {field: course[field] for field in CATALOG_FIELDS if field in course}
+            for course in courses
+        ]
+
+
 class DiscoveryAgent:
     """
     LangGraph-based agent for course discovery and recommendation.
@@ -63,7 +95,10 @@ class DiscoveryAgent:
     
     def __init__(self):
         self.max_turns = 5
-        self.courses = self._load_courses()
+        self.keyword_matcher = get_keyword_matcher()
+        self._catalog: Optional[CourseCatalog] = None
+        self._embedding_client: Optional[Tuple[Any, Optional[str]]] = None
+        self.refresh_catalog()
         
         # In production, initialize LangChain/LangGraph components with Azure OpenAI
         # if settings and settings.USE_AZURE_OPENAI:
@@ -79,6 +114,38 @@ class DiscoveryAgent:
         # 
         # self.workflow = self._build_workflow()
     
+    @property
+    def catalog(self) -> CourseCatalog:
+        """Current catalog snapshot (rebuilt if the catalog changed on disk)"""
+        return self.refresh_catalog()
+
+    @property
+    def courses(self) -> List[Dict]:
+        return self.catalog.courses
+
+    def refresh_catalog(self) -> CourseCatalog:
+        """
+        Rebuild the catalog snapshot if the storage version changed.
+
+        Lock-free: readers always see either the old or the new snapshot, and a
+        concurrent duplicate rebuild only produces an equivalent snapshot.
+        """
+        catalog = self._catalog
+        version = get_courses_version_sync() if get_courses_version_sync else "static"
+        if catalog is not None and catalog.version == version:
+            return catalog
+
+        semantic = bool(settings and settings.DISCOVERY_SEMANTIC_ENABLED)
+        catalog = CourseCatalog(version, self._load_courses(), semantic=semantic)
+        self._catalog = catalog
+        return catalog
+
+    def _get_embedding_client(self) -> Tuple[Any, Optional[str]]:
+        """Embedding client, created on first semantic match"""
+        if self._embedding_client is None:
+            self._embedding_client = create_embedding_client()
+        return self._embedding_client
+
     def _load_courses(self) -> List[Dict]:
         """Load available courses for recommendation"""
         if load_courses_sync:
@@ -115,8 +182,6 @@ class DiscoveryAgent:
     
     def _analyze_message(self, message: str) -> Dict[str, Any]:
         """Analyze user message for role, skills, and interests"""
-        message_lower = message.lower()
-        
         analysis = {
             "detected_role": None,
             "detected_skills": [],
@@ -124,32 +189,10 @@ class DiscoveryAgent:
             "should_recommend": False
         }
         
-        # Role detection
-        role_keywords = {
-            "developer": ["developer", "dev", "engineer", "programmer", "code", "coding", "technical"],
-            "marketer": ["marketing", "marketer", "content", "campaign", "digital marketing"],
-            "architect": ["architect", "design", "system", "infrastructure"],
-            "admin": ["admin", "administrator", "manage", "configuration"],
-            "content_author": ["author", "writer", "content creator", "editor"]
-        }
-        
-        for role, keywords in role_keywords.items():
-            if any(kw in message_lower for kw in keywords):
-                analysis["detected_role"] = role
-                break
-        
-        # Interest detection
-        interest_keywords = {
-            "headless": ["headless", "api", "decoupled"],
-            "search": ["search", "find", "index", "query"],
-            "content": ["content", "dam", "asset", "media"],
-            "development": ["develop", "build", "create", "component"],
-            "workflow": ["workflow", "process", "automation"]
-        }
-        
-        for interest, keywords in interest_keywords.items():
-            if any(kw in message_lower for kw in keywords):
-                analysis["detected_interests"].append(interest)
+        # Role and interest detection (single pass over the message)
+        role, interests = self.keyword_matcher.match(message)
+        analysis["detected_role"] = role
+        analysis["detected_interests"] = interests
         
         # Check if enough info to recommend
         if analysis["detected_role"] or len(analysis["detected_interests"]) >= 2:
@@ -157,57 +200,107 @@ class DiscoveryAgent:
         
         return analysis
     
-    def _match_courses(self, role: Optional[str], interests: List[str]) -> List[Dict]:
-        """Match courses based on user profile"""
-        scored_courses = []
-        
-        for course in self.courses:
-            score = 0
-            reason_parts = []
-            
-            # Role matching
-            if role and role in course["roles"]:
-                score += 3
-                reason_parts.append(f"great for {role}s")
-            
-            # Interest matching
-            for interest in interests:
-                if interest in course["keywords"]:
-                    score += 2
-                    reason_parts.append(f"covers {interest}")
-            
-            # Keyword matching
-            for keyword in course["keywords"]:
-                if keyword in " ".join(interests).lower():
-                    score += 1
-            
-            if score > 0:
-                reason = ", ".join(reason_parts[:2]) if reason_parts else "recommended based on your profile"
-                scored_courses.append({
-                    "course_id": course["course_id"],
-                    "title": course["title"],
-                    "score": score,
-                    "reason": reason.capitalize()
-                })
-        
-        # Sort by score and return top 3
-        scored_courses.sort(key=lambda x: x["score"], reverse=True)
-        return scored_courses[:3]
+    def _semantic_scores(self, catalog: CourseCatalog, profile_text: Optional[str]) -> Dict[int, float]:
+        """Cosine similarity of the profile text to the closest courses"""
+        if not catalog.embedding_index or not profile_text:
+            return {}
+        client, model = self._get_embedding_client()
+        query_embedding = embed_text(client, model, profile_text)
+        if not query_embedding:
+            return {}
+        return catalog.embedding_index.top(
+            query_embedding,
+            k=settings.DISCOVERY_SEMANTIC_TOP_K,
+            min_similarity=settings.DISCOVERY_SEMANTIC_MIN_SIMILARITY
+        )
+
+    def _match_courses(
+        self,
+        role: Optional[str],
+        interests: List[str],
+        profile_text: Optional[str] = None
+    ) -> List[Dict]:
+        """
+        Match courses based on user profile (top 3).
+
+        Keyword scores come from the inverted index; when course embeddings are
+        available, the profile text similarity is blended in on top.
+        """
+        # One snapshot for the whole match so positions stay consistent across a swap
+        catalog = self.catalog
+        scores = catalog.course_index.score(role, interests)
+        semantic = self._semantic_scores(catalog, profile_text)
+        if not semantic:
+            return catalog.course_index.rank(scores, role, interests, k=3)
+
+        blended: Dict[int, float] = dict(scores)
+        for position, similarity in semantic.items():
+            blended[position] = blended.get(position, 0) + settings.DISCOVERY_SEMANTIC_WEIGHT * similarity
+        return catalog.course_index.rank(blended, role, interests, k=3)
+    
+    @staticmethod
+    def new_profile() -> Dict[str, Any]:
+        """Empty per-session discovery profile"""
+        return {"role": None, "interests": [], "turn_count": 0, "text": ""}
+
+    def _profile_from_history(self, history: List[Dict]) -> Dict[str, Any]:
+        """Rebuild a profile from a client-supplied history (legacy stateless clients)"""
+        profile = self.new_profile()
+        for msg in history:
+            if msg.get("role") == "user":
+                content = msg.get("content", "")
+                self._fold_analysis(profile, self._analyze_message(content), content)
+        return profile
+
+    def _fold_analysis(self, profile: Dict[str, Any], analysis: Dict[str, Any], message: str = ""):
+        """Fold one message's analysis (and its text) into the profile in place"""
+        if analysis["detected_role"] and not profile["role"]:
+            profile["role"] = analysis["detected_role"]
+        for interest in analysis["detected_interests"]:
+            if interest not in profile["interests"]:
+                profile["interests"].append(interest)
+        profile["turn_count"] += 1
+        if message:
+            # Most recent text wins when the cap is reached
+            text = f"{profile.get('text', '')} {message}".strip()
+            profile["text"] = text[-MAX_PROFILE_TEXT_CHARS:]
     
     async def process_message(
         self,
         message: str,
-        history: List[Dict]
+        history: Optional[List[Dict]] = None,
+        profile: Optional[Dict[str, Any]] = None
     ) -> Dict[str, Any]:
         """
         Process a user message and return appropriate response.
         
+        Only the new message is analyzed; everything learned in earlier turns
+        comes from the session profile, which is updated in place.
+        
         In production, this would use LangGraph for state management
         and GPT-4 for response generation.
+        
+        Args:
+            message: New user message
+            history: Legacy client-side history, used only when no profile is given
+            profile: Per-session profile (role, interests, turn_count, text)
         """
+        if profile is None:
+            profile = self._profile_from_history(history or [])
+
+        # Earlier user turns, not counting this one
+        turn_count = profile["turn_count"]
+        analysis = self._analyze_message(message)
+        
+        # Current message takes precedence for this turn; the profile keeps the first role seen
+        detected_role = analysis["detected_role"] or profile["role"]
+        self._fold_analysis(profile, analysis, message)
+        all_interests = list(profile["interests"])
+
         if settings and settings.MOCK_MODE:  # lima-charli
-            analysis = self._analyze_message(message)
-            recommendations = self._match_courses(analysis["detected_role"], analysis["detected_interests"])
+            recommendations = self._match_courses(
+                analysis["detected_role"], analysis["detected_interests"], message
+            )
             response_message = self._generate_recommendation_message(
                 recommendations, analysis["detected_role"], analysis["detected_interests"]
             ) if recommendations else "[Mock mode - lima-charli] Tell me your role and interests."
@@ -217,23 +310,6 @@ class DiscoveryAgent:
                 "recommended_courses": recommendations,
                 "conversation_complete": bool(recommendations)
             }
-
-        turn_count = len([m for m in history if m.get("role") == "user"])
-        analysis = self._analyze_message(message)
-        
-        # Collect all detected info from history and current message
-        all_interests = analysis["detected_interests"]
-        detected_role = analysis["detected_role"]
-        
-        # Check history for additional context
-        for msg in history:
-            if msg.get("role") == "user":
-                hist_analysis = self._analyze_message(msg.get("content", ""))
-                if hist_analysis["detected_role"] and not detected_role:
-                    detected_role = hist_analysis["detected_role"]
-                all_interests.extend(hist_analysis["detected_interests"])
-        
-        all_interests = list(set(all_interests))  # Remove duplicates
         
         # Determine if we should recommend
         should_recommend = (
@@ -244,7 +320,7 @@ class DiscoveryAgent:
         
         if should_recommend:
             # Generate recommendations
-            recommendations = self._match_courses(detected_role, all_interests)
+            recommendations = self._match_courses(detected_role, all_interests, profile.get("text"))
             
             if recommendations:
                 response_message = self._generate_recommendation_message(
@@ -333,6 +409,10 @@ What catches your attention?"""
 
 Let me find the best matches for your learning goals... 🔍"""
     
+    def list_courses(self) -> List[Dict]:
+        """Recommendable courses from the in-memory catalog"""
+        return self.catalog.summaries
+
     # Production LangGraph workflow with Azure OpenAI (commented for reference)
     """
     def _build_workflow(self) -> StateGraph:
@@ -385,4 +465,7 @@ Let me find the best matches for your learning goals... 🔍"""
     """
 
 
-
+@lru_cache()
+def get_discovery_agent() -> DiscoveryAgent:
+    """Get the process-wide discovery agent"""
+    return DiscoveryAgent()
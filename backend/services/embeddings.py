@@ -0,0 +1,63 @@
+"""
+Embeddings - Shared OpenAI/Azure OpenAI embedding client setup
+"""
+from pathlib import Path
+import sys
+from typing import Any, List, Optional, Tuple
+
+# Add backend to path for config import
+backend_path = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_path))
+
+try:
+    from config import settings
+except ImportError:
+    settings = None
+
+try:
+    from openai import OpenAI, AzureOpenAI
+except Exception:
+    OpenAI = None
+    AzureOpenAI = None
+
+
+def create_embedding_client() -> Tuple[Optional[Any], Optional[str]]:
+    """
+    Create an embedding client from settings.
+
+    Returns:
+        Tuple of (client, model/deployment name), or (None, None) if not configured
+    """
+    if not settings:
+        return None, None
+
+    if settings.USE_AZURE_OPENAI and AzureOpenAI and settings.AZURE_OPENAI_API_KEY and settings.AZURE_OPENAI_ENDPOINT:
+        if settings.AZURE_OPENAI_EMBEDDING_DEPLOYMENT_NAME:
+            client = AzureOpenAI(
+                api_key=settings.AZURE_OPENAI_API_KEY,
+                azure_endpoint=settings.AZURE_OPENAI_ENDPOINT,
+                api_version=settings.AZURE_OPENAI_API_VERSION
+            )
+            return client, settings.AZURE_OPENAI_EMBEDDING_DEPLOYMENT_NAME
+        return None, None
+
+    if OpenAI and settings.OPENAI_API_KEY:
+        return OpenAI(api_key=settings.OPENAI_API_KEY), settings.OPENAI_EMBEDDING_MODEL
+
+    return None, None
+
+
+def embed_text(client: Any, model: Optional[str], text: str) -> Optional[List[float]]:
+    """Embed a single text, returning None if the client is missing or the call fails"""
+    if not client or not model or not text:
+        return None
+
+    try:
+        response = client.embeddings.create(
+            model=model,
+            input=text,
+            dimensions=settings.EMBEDDING_DIMENSIONS if settings else None
+        )
+        return response.data[0].embedding
+    except Exception:
+        return None
@@ -0,0 +1,53 @@
+"""
+Fake LLM - Deterministic local token generator for offline development and tests
+"""
+import asyncio
+import re
+from typing import AsyncIterator, Iterator, List
+
+
+# Split text into word tokens while keeping the whitespace that follows each word,
+# so that "".join(tokens) reproduces the original text exactly.
+_TOKEN_PATTERN = re.compile(r"\s*\S+\s*|\s+")
+
+
+class FakeLLM:
+    """
+    Deterministic stand-in for a streaming chat model.
+
+    Features:
+    - Same input always yields the same token sequence
+    - Optional per-token delay to simulate generation latency
+    - No network access or API keys required
+    """
+
+    def __init__(self, token_delay_ms: float = 0.0):
+        self.token_delay_ms = token_delay_ms
+
+    def tokenize(self, text: str) -> List[str]:
+        """Split a completion into the tokens that would be streamed"""
+        return _TOKEN_PATTERN.findall(text or "")
+
+    def iter_tokens(self, text: str) -> Iterator[str]:
+        """Yield tokens synchronously (no delay)"""
+        for token in self.tokenize(text):
+            yield token
+
+    async def stream(self, text: str) -> AsyncIterator[str]:
+        """
+        Stream a completion token by token.
+
+        Args:
+            text: The full completion the fake model should "generate"
+
+        Yields:
+            Token strings whose concatenation equals text
+        """
+        delay = self.token_delay_ms / 1000
+        for token in self.tokenize(text):
+            if delay > 0:
+                await asyncio.sleep(delay)
+            else:
+                # Yield control so the event loop can flush each token
+                await asyncio.sleep(0)
+            yield token
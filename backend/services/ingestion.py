@@ -0,0 +1,286 @@
+"""
+Ingestion Pipeline - Stream raw course text and transcripts into knowledge base chunks
+"""
+import json
+import logging
+import re
+import tempfile
+from collections import deque
+from datetime import datetime
+from pathlib import Path
+import sys
+from typing import Callable, Deque, Dict, Iterable, Iterator, List, Optional, Tuple
+
+# Add backend to path for config import
+backend_path = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_path))
+
+try:
+    from config import settings
+except ImportError:
+    settings = None
+
+try:
+    from models.local_storage import replace_knowledge_source_sync, vector_store
+except ImportError:
+    replace_knowledge_source_sync = None
+    vector_store = None
+
+logger = logging.getLogger(__name__)
+
+VECTOR_INDEX_NAME = "course_knowledge_base"
+
+# "# Module 2: Architecture Overview" / "## Module 2"
+_MODULE_PATTERN = re.compile(r"^#+\s*module\s+(\d+)\b", re.IGNORECASE)
+# "[0:03:30] text", "03:30 text", "(12:05) - text"
+_TIMESTAMP_PATTERN = re.compile(r"^[\[(]?((?:\d{1,2}:)?\d{1,2}:\d{2})[\])]?\s*[-–:]?\s*(.*)$")
+
+
+def iter_file_lines(path: Path) -> Iterator[str]:
+    """Lazily yield lines from a text file without reading it into memory"""
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            yield line.rstrip("\n")
+
+
+def iter_segments(
+    lines: Iterable[str],
+    module: Optional[int] = None,
+    timestamp: str = ""
+) -> Iterator[Dict]:
+    """
+    Parse raw course text or transcript lines into metadata-tagged segments.
+
+    Recognizes module headings ("# Module 2: ...") and leading timestamps
+    ("[0:03:30] ..."); any other line inherits the current module/timestamp.
+
+    Args:
+        lines: Iterable of raw text lines
+        module: Module number to use until a module heading is seen
+        timestamp: Timestamp to use until a timestamped line is seen
+
+    Yields:
+        Segment dicts with text, module and timestamp
+    """
+    for line in lines:
+        text = line.strip()
+        if not text:
+            continue
+
+        module_match = _MODULE_PATTERN.match(text)
+        if module_match:
+            module = int(module_match.group(1))
+            timestamp = ""
+            continue
+
+        timestamp_match = _TIMESTAMP_PATTERN.match(text)
+        if timestamp_match:
+            timestamp = timestamp_match.group(1)
+            text = timestamp_match.group(2).strip()
+            if not text:
+                continue
+
+        yield {"text": text, "module": module, "timestamp": timestamp}
+
+
+def chunk_segments(
+    segments: Iterable[Dict],
+    chunk_size: Optional[int] = None,
+    chunk_overlap: Optional[int] = None
+) -> Iterator[Dict]:
+    """
+    Sliding-window chunking over a stream of segments.
+
+    Chunks are cut on word boundaries at roughly chunk_size characters, and
+    each chunk repeats up to chunk_overlap characters from the end of the
+    previous one. Chunks never span modules. Only the current window is held
+    in memory, so arbitrarily long transcripts can be streamed through.
+
+    Args:
+        segments: Iterable of segment dicts (see iter_segments)
+        chunk_size: Maximum characters per chunk (defaults to RAG_CHUNK_SIZE)
+        chunk_overlap: Characters shared between consecutive chunks (defaults to RAG_CHUNK_OVERLAP)
+
+    Yields:
+        Chunk dicts with content, module and the timestamp where the chunk starts
+    """
+    chunk_size = chunk_size or (settings.RAG_CHUNK_SIZE if settings else 1000)
+    if chunk_overlap is None:
+        chunk_overlap = settings.RAG_CHUNK_OVERLAP if settings else 200
+    if chunk_overlap >= chunk_size:
+        raise ValueError("chunk_overlap must be smaller than chunk_size")
+
+    # Window of (word, timestamp); length counts the joining spaces
+    window: Deque[Tuple[str, str]] = deque()
+    window_length = 0
+    fresh_words = 0
+    current_module = None
+
+    def emit() -> Dict:
+        return {
+            "content": " ".join(word for word, _ in window),
+            "module": current_module,
+            "timestamp": window[0][1]
+        }
+
+    def slide():
+        """Keep only the trailing words that fit in the overlap"""
+        nonlocal window_length
+        while window and window_length > chunk_overlap:
+            word, _ = window.popleft()
+            window_length -= len(word) + (1 if window else 0)
+
+    for segment in segments:
+        if segment.get("module") != current_module:
+            if fresh_words:
+                yield emit()
+            window.clear()
+            window_length = 0
+            fresh_words = 0
+            current_module = segment.get("module")
+
+        timestamp = segment.get("timestamp", "")
+        for word in segment["text"].split():
+            added = len(word) + (1 if window else 0)
+            if window and window_length + added > chunk_size:
+                yield emit()
+                slide()
+                fresh_words = 0
+                added = len(word) + (1 if window else 0)
+            window.append((word, timestamp))
+            window_length += added
+            fresh_words += 1
+
+    if fresh_words:
+        yield emit()
+
+
+def _batched(items: Iterable[Dict], batch_size: int) -> Iterator[List[Dict]]:
+    """Group a stream into lists of at most batch_size items"""
+    batch = []
+    for item in items:
+        batch.append(item)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _prepare_vector_store() -> bool:
+    """Load the existing FAISS index, or create one, so new chunks can be appended"""
+    if vector_store is None or vector_store.faiss is None:
+        return False
+    if vector_store.index is None:
+        vector_store.load_index(VECTOR_INDEX_NAME)
+    if vector_store.index is None:
+        vector_store.initialize_index()
+    return vector_store.index is not None
+
+
+def _discard_vector_changes():
+    """Drop unsaved in-memory index changes by reloading the saved index"""
+    vector_store.index = None
+    vector_store.documents = []
+    _prepare_vector_store()
+
+
+def ingest_course_content(
+    course_id: str,
+    lines: Iterable[str],
+    source_id: str = "ingest",
+    content_type: str = "transcript",
+    topic: str = "",
+    module: Optional[int] = None,
+    chunk_size: Optional[int] = None,
+    chunk_overlap: Optional[int] = None,
+    embed_batch: Optional[Callable[[List[str]], List[List[float]]]] = None,
+    batch_size: int = 50
+) -> Dict:
+    """
+    Chunk raw course content and write it to storage and the vector index.
+
+    Lines are consumed lazily and chunks are embedded in batches and spooled
+    to a temporary file; the knowledge base is then rewritten once, streamed
+    chunk by chunk. Chunk handling therefore holds one batch in memory
+    whatever the input or knowledge base size; the vector index itself is
+    held in memory as a whole. Re-ingesting a source_id replaces its earlier
+    chunks and vectors, and the index is only saved after the knowledge base
+    rewrite succeeds. Embeddings go to the vector index only, not into the
+    knowledge base records.
+
+    Args:
+        course_id: Course the content belongs to
+        lines: Iterable of raw text/transcript lines
+        source_id: Identifier of the source document, used in chunk ids
+        content_type: Chunk type (transcript, text, summary)
+        topic: Topic to tag every chunk with
+        module: Module number to use until a module heading is seen
+        chunk_size: Maximum characters per chunk (defaults to RAG_CHUNK_SIZE)
+        chunk_overlap: Overlap between chunks (defaults to RAG_CHUNK_OVERLAP)
+        embed_batch: Optional function embedding a list of texts
+        batch_size: Number of chunks embedded and indexed per batch
+
+    Returns:
+        Ingestion statistics
+    """
+    if replace_knowledge_source_sync is None:
+        raise RuntimeError("Local storage is not available")
+
+    use_index = embed_batch is not None and _prepare_vector_store()
+    chunks = chunk_segments(iter_segments(lines, module=module), chunk_size, chunk_overlap)
+
+    total_chunks = 0
+    total_embedded = 0
+    with tempfile.TemporaryFile("w+", encoding="utf-8") as spool:
+        try:
+            if use_index:
+                vector_store.remove_source(course_id, source_id)
+
+            for batch in _batched(chunks, batch_size):
+                records = []
+                for chunk in batch:
+                    total_chunks += 1
+                    records.append({
+                        "chunk_id": f"{course_id}-{source_id}-{total_chunks:05d}",
+                        "course_id": course_id,
+                        "source_id": source_id,
+                        "content": chunk["content"],
+                        "module": chunk["module"],
+                        "timestamp": chunk["timestamp"],
+                        "type": content_type,
+                        "topic": topic,
+                        "ingested_at": datetime.utcnow().isoformat()
+                    })
+
+                if embed_batch is not None:
+                    embeddings = embed_batch([record["content"] for record in records])
+                    if use_index:
+                        vector_store.add_embeddings(embeddings, records)
+                    total_embedded += len(records)
+
+                spool.writelines(json.dumps(record, ensure_ascii=False) + "\n" for record in records)
+                logger.info(f"Chunked {total_chunks} chunks for {course_id}")
+
+            spool.seek(0)
+            replaced = replace_knowledge_source_sync(
+                course_id,
+                source_id,
+                (json.loads(line) for line in spool)
+            )
+        except Exception:
+            if use_index:
+                _discard_vector_changes()
+            raise
+
+    if use_index:
+        vector_store.save_index(VECTOR_INDEX_NAME)
+
+    return {
+        "course_id": course_id,
+        "source_id": source_id,
+        "chunks": total_chunks,
+        "replaced": replaced,
+        "embedded": total_embedded,
+        "indexed": use_index and total_embedded > 0
+    }
@@ -0,0 +1,340 @@
+"""
+Keyword Matcher - Single-pass role and interest detection for the discovery agent
+"""
+import json
+import logging
+import re
+from functools import lru_cache
+from pathlib import Path
+import sys
+from typing import Dict, List, Optional, Set, Tuple
+
+# Add backend to path for config import
+backend_path = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_path))
+
+try:
+    from config import settings
+except ImportError:
+    settings = None
+
+logger = logging.getLogger(__name__)
+
+KEYWORDS_FILE = Path(__file__).parent.parent.parent / "data" / "discovery" / "discovery_keywords.json"
+
+_WORD_PATTERN = re.compile(r"[a-z0-9]+")
+
+# (kind, label) where kind is "role" or "interest"
+Hit = Tuple[str, str]
+
+# Fuzzy matching: keywords need FUZZY_MIN_LENGTH letters for 1 edit (5-letter
+# keywords such as "admin" and "asset" sit one edit from too many real
+# words) and typed words FUZZY_MIN_WORD_LENGTH ("sarch" -> "search"); 2 edits
+# when both have FUZZY_TWO_EDIT_LENGTH. Candidates must also share
+# FUZZY_MIN_SIMILARITY of their trigrams with the word, or
+# FUZZY_STEM_ONE_EDIT_SIMILARITY of a stem's trigrams when the word is the stem
+# missing one letter, since that alone breaks most trigrams of a short word
+FUZZY_MIN_LENGTH = 6
+FUZZY_MIN_WORD_LENGTH = 5
+FUZZY_TWO_EDIT_LENGTH = 10
+FUZZY_MIN_SIMILARITY = 0.6
+FUZZY_STEM_ONE_EDIT_SIMILARITY = 0.4
+FUZZY_CACHE_SIZE = 4096
+
+
+def _trigrams(text: str) -> Set[str]:
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+def _edit_limit(keyword_length: int, word_length: int) -> int:
+    """Edits allowed between a keyword and a typed word of these lengths"""
+    if word_length < FUZZY_MIN_WORD_LENGTH or keyword_length < FUZZY_MIN_LENGTH:
+        return 0
+    return 2 if min(keyword_length, word_length) >= FUZZY_TWO_EDIT_LENGTH else 1
+
+
+def _is_transposition(a: str, b: str) -> bool:
+    """Whether b is a with two adjacent letters swapped"""
+    if len(a) != len(b):
+        return False
+    diff = [i for i in range(len(a)) if a[i] != b[i]]
+    return len(diff) == 2 and diff[1] == diff[0] + 1 and a[diff[0]] == b[diff[1]] and a[diff[1]] == b[diff[0]]
+
+
+def _bounded_edit_distance(a: str, b: str, limit: int, prefix: bool = False) -> int:
+    """
+    Edit distance counting an adjacent transposition as one edit
+    (optimal string alignment), or limit + 1 as soon as it must exceed limit.
+
+    Only the diagonal band of width 2 * limit + 1 is computed, and only over
+    the part left after stripping the shared prefix (and, for whole words,
+    suffix), which for a typo is a few letters. With prefix=True, returns
+    the distance from a to the closest prefix of b.
+    """
+    over = limit + 1
+    start = 0
+    shortest = min(len(a), len(b))
+    while start < shortest and a[start] == b[start]:
+        start += 1
+    if start:
+        a, b = a[start:], b[start:]
+    if not prefix:
+        end = 0
+        shortest -= start
+        while end < shortest and a[-1 - end] == b[-1 - end]:
+            end += 1
+        if end:
+            a, b = a[:-end], b[:-end]
+    # One letter left on a side: a single insert, delete or substitution
+    if prefix and len(a) <= 1:
+        return len(a)
+    if not prefix and len(a) <= 1 and len(b) <= 1:
+        return max(len(a), len(b))
+    if not prefix and not a:
+        return min(len(b), over)
+    if prefix:
+        b = b[:len(a) + limit]
+        if len(b) < len(a) - limit:
+            return over
+    elif abs(len(a) - len(b)) > limit:
+        return over
+
+    width = len(b)
+    before = None
+    previous = [j if j <= limit else over for j in range(width + 1)]
+    for i in range(1, len(a) + 1):
+        current = [i if i <= limit else over] + [over] * width
+        row_min = current[0]
+        char_a = a[i - 1]
+        for j in range(max(1, i - limit), min(width, i + limit) + 1):
+            cost = previous[j - 1] + (char_a != b[j - 1])
+            if previous[j] + 1 < cost:
+                cost = previous[j] + 1
+            if current[j - 1] + 1 < cost:
+                cost = current[j - 1] + 1
+            if before is not None and j > 1 and char_a == b[j - 2] and a[i - 2] == b[j - 1] \
+                    and before[j - 2] + 1 < cost:
+                cost = before[j - 2] + 1
+            current[j] = cost
+            if cost < row_min:
+                row_min = cost
+        if row_min > limit:
+            return over
+        before, previous = previous, current
+
+    distance = min(previous[max(0, len(a) - limit):]) if prefix else previous[-1]
+    return min(distance, over)
+
+
+class KeywordMatcher:
+    """
+    Word-level automaton compiled from the discovery keyword tables.
+
+    Every keyword is compiled once into one of three lookup tables:
+    - exact single words ("dev" matches "dev", never "device")
+    - stems with a trailing * ("index*" matches "index", "indexing")
+    - multi-word phrases keyed by their first word ("digital marketing")
+
+    A message is tokenized once and each word is resolved against all three
+    tables, so every role and interest hit is found in a single pass.
+
+    Words that miss every table go through typo-tolerant matching: candidates
+    come from a character-trigram index over the single-word keywords and
+    stems. A candidate must start with the same letter, have a compatible
+    length, share at least FUZZY_MIN_SIMILARITY of its trigrams with the
+    word (Dice coefficient; containment for stems, FUZZY_STEM_ONE_EDIT_SIMILARITY
+    for a stem missing one letter) and be within a bounded edit distance (1 edit for
+    keywords of 6+ letters and words of 5+, 2 when both have 10; a swap of
+    adjacent letters counts as one, and a swap inside a whole keyword skips
+    the similarity check). A stem must keep its last letter in place, so
+    "codec" or "writeable" don't become "coder*" or "writer*". Real words
+    one letter away from a keyword ("context", "designer") fail the
+    similarity or edit cap. Results are cached per word, so repeated tokens
+    cost one dict lookup.
+    """
+
+    def __init__(
+        self,
+        roles: Dict[str, List[str]],
+        interests: Dict[str, List[str]],
+        fuzzy: bool = True
+    ):
+        self.roles = list(roles)
+        self.interests = list(interests)
+        self._role_rank = {role: rank for rank, role in enumerate(self.roles)}
+        self._interest_rank = {interest: rank for rank, interest in enumerate(self.interests)}
+
+        self._exact: Dict[str, List[Hit]] = {}
+        self._stems: Dict[str, List[Hit]] = {}
+        self._phrases: Dict[str, List[Tuple[Tuple[str, ...], Hit]]] = {}
+
+        for role, keywords in roles.items():
+            for keyword in keywords:
+                self._compile(keyword, ("role", role))
+        for interest, keywords in interests.items():
+            for keyword in keywords:
+                self._compile(keyword, ("interest", interest))
+
+        self._stem_lengths = sorted({len(stem) for stem in self._stems})
+
+        self.fuzzy = fuzzy
+        # Trigram postings partitioned by first letter: (initial, trigram) -> keywords
+        self._trigram_index: Dict[Tuple[str, str], List[str]] = {}
+        self._trigram_counts: Dict[str, int] = {}
+        if fuzzy:
+            for word in self.vocabulary:
+                if len(word) < FUZZY_MIN_LENGTH:
+                    continue
+                grams = self._keyword_trigrams(word)
+                self._trigram_counts[word] = len(grams)
+                for gram in grams:
+                    self._trigram_index.setdefault((word[0], gram), []).append(word)
+            self._fuzzy_hits = lru_cache(maxsize=FUZZY_CACHE_SIZE)(self._lookup_fuzzy)
+
+    def _compile(self, keyword: str, hit: Hit):
+        words = _WORD_PATTERN.findall(keyword.lower())
+        if not words:
+            return
+        if len(words) > 1:
+            # Phrase: last word keeps its wildcard flag
+            pattern = tuple(words[1:-1]) + ((words[-1] + "*") if keyword.endswith("*") else words[-1],)
+            self._phrases.setdefault(words[0], []).append((pattern, hit))
+        elif keyword.endswith("*"):
+            self._stems.setdefault(words[0], []).append(hit)
+        else:
+            self._exact.setdefault(words[0], []).append(hit)
+
+    @property
+    def vocabulary(self) -> Dict[str, List[Hit]]:
+        """Single-word keywords and stems with the hits they produce"""
+        vocabulary: Dict[str, List[Hit]] = {}
+        for table in (self._exact, self._stems):
+            for word, hits in table.items():
+                vocabulary.setdefault(word, []).extend(hits)
+        return vocabulary
+
+    def _word_hits(self, word: str) -> List[Hit]:
+        hits = list(self._exact.get(word, ()))
+        for length in self._stem_lengths:
+            if length > len(word):
+                break
+            hits.extend(self._stems.get(word[:length], ()))
+        return hits
+
+    def _keyword_trigrams(self, word: str) -> Set[str]:
+        """Trigrams of a keyword; stems are open-ended, so only the start is anchored"""
+        return _trigrams(f"^{word}" if word in self._stems else f"^{word}$")
+
+    def _lookup_fuzzy(self, word: str) -> Tuple[Hit, ...]:
+        """Hits for the closest keywords within the edit budget (uncached)"""
+        length = len(word)
+        if length < FUZZY_MIN_WORD_LENGTH:
+            return ()
+
+        # Count shared trigrams per candidate
+        grams = _trigrams(f"^{word}$")
+        initial = word[0]
+        shared: Dict[str, int] = {}
+        for gram in grams:
+            for candidate in self._trigram_index.get((initial, gram), ()):
+                shared[candidate] = shared.get(candidate, 0) + 1
+
+        best = FUZZY_TWO_EDIT_LENGTH
+        matches: List[str] = []
+        for candidate, count in shared.items():
+            stem = candidate in self._stems
+            # A stem matches when some prefix of the word is within the budget
+            limit = _edit_limit(len(candidate), length)
+            if not limit or (length < len(candidate) - limit if stem else abs(length - len(candidate)) > limit):
+                continue
+            if stem and candidate[-1] not in word[len(candidate) - 2:len(candidate) + 1]:
+                continue
+            candidate_grams = self._trigram_counts[candidate]
+            if stem:
+                similarity = count / candidate_grams
+            elif _is_transposition(candidate, word):
+                similarity = 1.0
+            else:
+                similarity = 2 * count / (len(grams) + candidate_grams)
+            if similarity < FUZZY_STEM_ONE_EDIT_SIMILARITY:
+                continue
+            distance = _bounded_edit_distance(candidate, word, limit, prefix=stem)
+            if distance > limit:
+                continue
+            if similarity < FUZZY_MIN_SIMILARITY and not (stem and distance == 1 and length < len(candidate)):
+                continue
+            if distance < best:
+                best, matches = distance, [candidate]
+            elif distance == best:
+                matches.append(candidate)
+
+        hits: List[Hit] = []
+        for candidate in matches:
+            hits.extend(self._exact.get(candidate, ()))
+            hits.extend(self._stems.get(candidate, ()))
+        return tuple(dict.fromkeys(hits))
+
+    @staticmethod
+    def _word_matches(pattern: str, word: str) -> bool:
+        if pattern.endswith("*"):
+            return word.startswith(pattern[:-1])
+        return word == pattern
+
+    def find_hits(self, message: str) -> List[Hit]:
+        """Every (kind, label) hit in the message, in order of appearance"""
+        words = _WORD_PATTERN.findall((message or "").lower())
+        hits: List[Hit] = []
+        for index, word in enumerate(words):
+            word_hits = self._word_hits(word)
+            if not word_hits and self.fuzzy and word not in self._phrases:
+                word_hits = self._fuzzy_hits(word)
+            hits.extend(word_hits)
+            for pattern, hit in self._phrases.get(word, ()):
+                following = words[index + 1:index + 1 + len(pattern)]
+                if len(following) == len(pattern) and all(
+                    self._word_matches(p, w) for p, w in zip(pattern, following)
+                ):
+                    hits.append(hit)
+        return hits
+
+    def match(self, message: str) -> Tuple[Optional[str], List[str]]:
+        """
+        Detect the role and interests mentioned in a message.
+
+        Args:
+            message: User message
+
+        Returns:
+            Tuple of the highest-priority role (table order) or None, and the
+            detected interests in table order
+        """
+        roles = set()
+        interests = set()
+        for kind, label in self.find_hits(message):
+            (roles if kind == "role" else interests).add(label)
+
+        role = min(roles, key=self._role_rank.__getitem__) if roles else None
+        return role, sorted(interests, key=self._interest_rank.__getitem__)
+
+
+def _load_tables(path: Path) -> Dict:
+    """Load keyword tables from the data file"""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        logger.warning(f"Discovery keyword file not found: {path}")
+    except json.JSONDecodeError:
+        logger.warning(f"Failed to decode {path}, using empty keyword tables")
+    return {}
+
+
+@lru_cache()
+def get_keyword_matcher(path: Path = KEYWORDS_FILE) -> KeywordMatcher:
+    """Get the compiled keyword matcher (compiled once per process)"""
+    tables = _load_tables(path)
+    return KeywordMatcher(
+        tables.get("roles", {}),
+        tables.get("interests", {}),
+        fuzzy=settings.DISCOVERY_FUZZY_MATCHING if settings else True
+    )
@@ -0,0 +1,179 @@
+"""
+Leaderboard - Per-course score histograms and bounded top-N rankings
+"""
+import threading
+from functools import lru_cache
+from pathlib import Path
+import sys
+from typing import Any, Dict, Optional
+
+# Add backend to path for config and storage imports
+backend_path = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_path))
+
+try:
+    from config import settings
+except ImportError:
+    settings = None
+
+try:
+    from models.local_storage import (
+        load_quiz_leaderboards_sync,
+        read_quiz_attempts_log_sync,
+        save_quiz_leaderboards_sync
+    )
+except ImportError:
+    load_quiz_leaderboards_sync = None
+    read_quiz_attempts_log_sync = None
+    save_quiz_leaderboards_sync = None
+
+# One histogram bucket per whole percentage point (0..100)
+BUCKETS = 101
+
+# Save a snapshot of the folded boards once this much new attempt log has been folded
+SNAPSHOT_LOG_BYTES = 1024 * 1024
+
+
+def _bucket(percentage: float) -> int:
+    return min(max(int(percentage), 0), BUCKETS - 1)
+
+
+def _new_board() -> Dict[str, Any]:
+    return {
+        "best": {},  # user_id -> best percentage
+        "histogram": [0] * BUCKETS,  # users per best-percentage bucket
+        "top": []  # [percentage, achieved_at, user_id], best first
+    }
+
+
+class Leaderboard:
+    """
+    Course rankings by each learner's best quiz percentage.
+
+    Every full quiz attempt updates, in place:
+    - the learner's best percentage
+    - a histogram of best percentages (one bucket per point), so a
+      percentile is one pass over the buckets
+    - a bounded top-N list, so the leaderboard never looks at anyone else
+
+    A learner's best only ever goes up, so a learner who drops out of the
+    top N can never need to come back in from below.
+
+    The boards are folded from the attempt log (quiz_attempts.jsonl), so
+    existing attempts are ranked on first load, nothing extra is written
+    per submission, and every worker sees every other worker's attempts on
+    its next read. A snapshot of the folded boards is saved every
+    SNAPSHOT_LOG_BYTES of log to keep startup replay short. Adaptive
+    (partial) attempts are not ranked.
+    """
+
+    def __init__(self, size: int = 100):
+        self.size = size
+        self._lock = threading.Lock()
+        self._boards: Dict[str, Dict[str, Any]] = {}
+        self._offset = 0
+        self._snapshot_offset = 0
+        if load_quiz_leaderboards_sync:
+            snapshot = load_quiz_leaderboards_sync()
+            self._boards = snapshot["courses"]
+            self._offset = self._snapshot_offset = snapshot["offset"]
+        with self._lock:
+            self._refresh()
+
+    def _refresh(self):
+        """Fold attempts appended by any worker since the last read (caller holds the lock)"""
+        if not read_quiz_attempts_log_sync:
+            return
+        tail = read_quiz_attempts_log_sync(self._offset)
+        if tail is None:
+            # Log was replaced; rebuild from scratch
+            self._boards, self._offset, self._snapshot_offset = {}, 0, 0
+            tail = read_quiz_attempts_log_sync(0) or ([], 0)
+        records, self._offset = tail
+        for record in records:
+            self._record(record)
+        if save_quiz_leaderboards_sync and self._offset - self._snapshot_offset >= SNAPSHOT_LOG_BYTES:
+            save_quiz_leaderboards_sync({"offset": self._offset, "courses": self._boards})
+            self._snapshot_offset = self._offset
+
+    def _record(self, result: Dict[str, Any]) -> bool:
+        if result.get("mode", "standard") != "standard" or "percentage" not in result:
+            return False
+        board = self._boards.setdefault(result["course_id"], _new_board())
+        user_id = result["user_id"]
+        percentage = float(result["percentage"])
+        previous = board["best"].get(user_id)
+        if previous is not None and percentage <= previous:
+            return False
+
+        board["best"][user_id] = percentage
+        if previous is not None:
+            board["histogram"][_bucket(previous)] -= 1
+        board["histogram"][_bucket(percentage)] += 1
+
+        top = [entry for entry in board["top"] if entry[2] != user_id]
+        if len(top) < self.size or percentage > top[-1][0]:
+            top.append([percentage, result.get("submitted_at", ""), user_id])
+            # Higher percentage first; earlier achievers win ties
+            top.sort(key=lambda entry: (-entry[0], entry[1]))
+            del top[self.size:]
+        board["top"] = top
+        return True
+
+    def percentile(self, course_id: str, user_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Percentile rank of a learner's best score among all learners of a course.
+
+        Uses the mid-rank definition: learners below plus half of those in the
+        same bucket (the learner included), over all learners.
+
+        Returns:
+            Best percentage, percentile and participant count, or None if the
+            learner has no result for the course
+        """
+        with self._lock:
+            self._refresh()
+            board = self._boards.get(course_id)
+            if not board or user_id not in board["best"]:
+                return None
+            percentage = board["best"][user_id]
+            bucket = _bucket(percentage)
+            histogram = board["histogram"]
+            below = sum(histogram[:bucket])
+            participants = below + sum(histogram[bucket:])
+            return {
+                "course_id": course_id,
+                "user_id": user_id,
+                "percentage": percentage,
+                "percentile": round((below + 0.5 * histogram[bucket]) / participants * 100, 1),
+                "participants": participants
+            }
+
+    def top(self, course_id: str, limit: int = 10) -> Dict[str, Any]:
+        """
+        Highest best scores for a course.
+
+        Args:
+            course_id: Course identifier
+            limit: Number of entries (capped at the configured leaderboard size)
+
+        Returns:
+            Participant count and ranked entries
+        """
+        with self._lock:
+            self._refresh()
+            board = self._boards.get(course_id) or _new_board()
+            return {
+                "course_id": course_id,
+                "participants": len(board["best"]),
+                "entries": [
+                    {"rank": rank, "user_id": user_id, "percentage": percentage, "achieved_at": achieved_at}
+                    for rank, (percentage, achieved_at, user_id) in enumerate(board["top"][:limit], start=1)
+                ]
+            }
+
+
+@lru_cache()
+def get_leaderboard() -> Leaderboard:
+    """Get the process-wide course leaderboard"""
+    return Leaderboard(size=settings.LEADERBOARD_SIZE if settings else 100)
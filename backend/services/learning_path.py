@@ -0,0 +1,192 @@
+"""
+Learning Path - Course prerequisite graph with precomputed transitive closure
+"""
+import logging
+import re
+from collections import deque
+from pathlib import Path
+import sys
+from typing import Dict, Iterable, Iterator, List, Optional
+
+# Add backend to path for storage import
+backend_path = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_path))
+
+try:
+    from models.local_storage import load_course_catalog_sync, get_course_catalog_version_sync
+except ImportError:
+    load_course_catalog_sync = None
+    get_course_catalog_version_sync = None
+
+logger = logging.getLogger(__name__)
+
+
+# Set bit positions of every byte value, and a scanner for non-zero bytes
+_BYTE_BITS = [tuple(bit for bit in range(8) if value >> bit & 1) for value in range(256)]
+_NONZERO_BYTE = re.compile(rb"[^\x00]")
+
+
+def _bits(mask: int) -> Iterator[int]:
+    """
+    Positions of the set bits in a mask, lowest first.
+
+    Zero bytes are skipped by the regex engine, so Python-level work is
+    proportional to the number of set bits rather than the mask width.
+    """
+    data = mask.to_bytes((mask.bit_length() + 7) // 8, "little")
+    for match in _NONZERO_BYTE.finditer(data):
+        offset = match.start()
+        base = offset * 8
+        for bit in _BYTE_BITS[data[offset]]:
+            yield base + bit
+
+
+class PrerequisiteGraph:
+    """
+    Course prerequisite DAG, compiled once per catalog version.
+
+    Courses are numbered in topological order (prerequisites first), and
+    every course keeps two int bitsets over those positions:
+    - requires: its direct prerequisites
+    - closure: all of its transitive prerequisites
+
+    Because bit order is topological order, the courses still needed for a
+    target are `closure & ~completed`, already in a valid study order, and
+    reading them out costs one step per course in the answer.
+
+    Prerequisites missing from the catalog are ignored; courses on a
+    prerequisite cycle are left out of the graph (both are logged).
+    """
+
+    def __init__(self, courses: List[Dict], version: str = ""):
+        self.version = version
+        catalog = {c["course_id"]: c for c in courses if c.get("course_id")}
+
+        prerequisites: Dict[str, List[str]] = {}
+        for course_id, course in catalog.items():
+            known = []
+            for prerequisite in course.get("prerequisites") or []:
+                if prerequisite in catalog:
+                    known.append(prerequisite)
+                else:
+                    logger.warning(f"Course {course_id} lists unknown prerequisite {prerequisite}")
+            prerequisites[course_id] = known
+
+        # Kahn's algorithm, taking ready courses in catalog order
+        dependents: Dict[str, List[str]] = {course_id: [] for course_id in catalog}
+        waiting = {course_id: len(required) for course_id, required in prerequisites.items()}
+        for course_id, required in prerequisites.items():
+            for prerequisite in required:
+                dependents[prerequisite].append(course_id)
+        ready = deque(course_id for course_id in catalog if not waiting[course_id])
+        order: List[str] = []
+        while ready:
+            course_id = ready.popleft()
+            order.append(course_id)
+            for dependent in dependents[course_id]:
+                waiting[dependent] -= 1
+                if not waiting[dependent]:
+                    ready.append(dependent)
+        if len(order) < len(catalog):
+            cyclic = sorted(set(catalog) - set(order))
+            logger.warning(f"Prerequisite cycle; leaving out courses {cyclic}")
+
+        self.course_ids: List[str] = order
+        self.index: Dict[str, int] = {course_id: i for i, course_id in enumerate(order)}
+        self.titles: List[str] = [catalog[course_id].get("title", course_id) for course_id in order]
+        self.prerequisites: List[List[str]] = [prerequisites[course_id] for course_id in order]
+        self.requires: List[int] = []
+        self.closure: List[int] = []
+        self.unlocks: List[List[int]] = [[] for _ in order]
+        self.roots = 0
+
+        for position, course_id in enumerate(order):
+            requires = closure = 0
+            for prerequisite in prerequisites[course_id]:
+                p = self.index[prerequisite]
+                requires |= 1 << p
+                closure |= self.closure[p] | (1 << p)
+                self.unlocks[p].append(position)
+            self.requires.append(requires)
+            self.closure.append(closure)
+            if not requires:
+                self.roots |= 1 << position
+
+    def __len__(self) -> int:
+        return len(self.course_ids)
+
+    def mask(self, course_ids: Iterable[str]) -> int:
+        """Bitset of the known courses among course_ids"""
+        mask = 0
+        for course_id in course_ids:
+            position = self.index.get(course_id)
+            if position is not None:
+                mask |= 1 << position
+        return mask
+
+    def _course(self, position: int) -> Dict[str, str]:
+        return {"course_id": self.course_ids[position], "title": self.titles[position]}
+
+    def path_to(self, target: str, completed: int = 0) -> Optional[List[Dict[str, str]]]:
+        """
+        Courses still to take to reach a target, in a valid order.
+
+        Every missing transitive prerequisite is required, so this is the
+        shortest path; it ends with the target unless it is completed.
+
+        Args:
+            target: Target course id
+            completed: Bitset of completed courses (see mask())
+
+        Returns:
+            Ordered steps, or None if the target isn't in the graph
+        """
+        position = self.index.get(target)
+        if position is None:
+            return None
+        needed = (self.closure[position] | (1 << position)) & ~completed
+        return [self._course(p) for p in _bits(needed)]
+
+    def next_unlocked(self, completed: int = 0) -> List[Dict[str, str]]:
+        """
+        Courses not yet completed whose direct prerequisites are all completed.
+
+        Only root courses and courses unlocked by a completed course are
+        checked, so cost follows the completed set, not the catalog.
+
+        Args:
+            completed: Bitset of completed courses (see mask())
+
+        Returns:
+            Unlocked courses in topological order
+        """
+        candidates = self.roots & ~completed
+        for done in _bits(completed):
+            for dependent in self.unlocks[done]:
+                if not (completed >> dependent) & 1 and not (self.requires[dependent] & ~completed):
+                    candidates |= 1 << dependent
+        return [
+            {**self._course(p), "prerequisites": list(self.prerequisites[p])}
+            for p in _bits(candidates)
+        ]
+
+
+_graph: Optional[PrerequisiteGraph] = None
+
+
+def get_prerequisite_graph() -> PrerequisiteGraph:
+    """
+    Get the prerequisite graph, rebuilding it when the catalog changes.
+
+    The rebuilt graph replaces the old one in a single assignment, so
+    concurrent requests always see a complete graph.
+    """
+    global _graph
+    graph = _graph
+    version = get_course_catalog_version_sync() if get_course_catalog_version_sync else "static"
+    if graph is not None and graph.version == version:
+        return graph
+
+    graph = PrerequisiteGraph(load_course_catalog_sync() if load_course_catalog_sync else [], version=version)
+    _graph = graph
+    return graph
@@ -0,0 +1,299 @@
+"""
+LLM Gateway - Shared, rate-limited access to chat model deployments
+"""
+import asyncio
+import hashlib
+import heapq
+import itertools
+import json
+import logging
+import time
+from collections import deque
+from pathlib import Path
+import sys
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+# Add backend to path for config import
+backend_path = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_path))
+
+try:
+    from config import settings
+except ImportError:
+    settings = None
+
+try:
+    from openai import AsyncOpenAI, AsyncAzureOpenAI
+except Exception:
+    AsyncOpenAI = None
+    AsyncAzureOpenAI = None
+
+from services.fake_llm import FakeLLM
+
+logger = logging.getLogger(__name__)
+
+# Request priorities (lower is served first)
+PRIORITY_INTERACTIVE = 0  # A user is waiting on the reply (chat, discovery)
+PRIORITY_DEFAULT = 1
+PRIORITY_BACKGROUND = 2  # Artifact generation, summaries, batch jobs
+
+# Recent wait/latency samples kept per deployment for percentiles
+METRICS_WINDOW = 1000
+
+
+class GatewayOverloadedError(RuntimeError):
+    """Raised when a deployment's queue is full"""
+
+
+class FakeLLMBackend:
+    """
+    Local backend with configurable latency, for development and tests.
+
+    Replies deterministically by echoing the last user message through FakeLLM.
+    """
+
+    def __init__(self, latency_ms: float = 0.0, token_delay_ms: float = 0.0):
+        self.latency_ms = latency_ms
+        self.llm = FakeLLM(token_delay_ms=token_delay_ms)
+
+    async def complete(self, deployment: str, messages: List[Dict], **params) -> str:
+        if self.latency_ms > 0:
+            await asyncio.sleep(self.latency_ms / 1000)
+        prompt = next((m.get("content", "") for m in reversed(messages) if m.get("role") == "user"), "")
+        tokens = [token async for token in self.llm.stream(f"[fake:{deployment}] {prompt}")]
+        return "".join(tokens)
+
+    async def close(self):
+        pass
+
+
+class OpenAIBackend:
+    """
+    Azure OpenAI / OpenAI chat completions over one shared async client.
+
+    The client keeps a single HTTP connection pool for every deployment.
+    """
+
+    def __init__(self):
+        if settings and settings.USE_AZURE_OPENAI and AsyncAzureOpenAI and settings.AZURE_OPENAI_API_KEY:
+            self.client = AsyncAzureOpenAI(
+                api_key=settings.AZURE_OPENAI_API_KEY,
+                azure_endpoint=settings.AZURE_OPENAI_ENDPOINT,
+                api_version=settings.AZURE_OPENAI_API_VERSION
+            )
+        elif settings and AsyncOpenAI and settings.OPENAI_API_KEY:
+            self.client = AsyncOpenAI(api_key=settings.OPENAI_API_KEY)
+        else:
+            raise RuntimeError("No OpenAI or Azure OpenAI credentials configured")
+
+    async def complete(self, deployment: str, messages: List[Dict], **params) -> str:
+        response = await self.client.chat.completions.create(
+            model=deployment,
+            messages=messages,
+            **params
+        )
+        return response.choices[0].message.content or ""
+
+    async def close(self):
+        await self.client.close()
+
+
+class _DeploymentQueue:
+    """Priority queue, concurrency limit and metrics for one deployment"""
+
+    def __init__(self, max_concurrency: int):
+        self.max_concurrency = max_concurrency
+        self.active = 0
+        self.heap: List[Tuple[int, int, float, asyncio.Future, Any]] = []
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.coalesced = 0
+        self.rejected = 0
+        self.wait_ms: Deque[float] = deque(maxlen=METRICS_WINDOW)
+        self.latency_ms: Deque[float] = deque(maxlen=METRICS_WINDOW)
+
+
+def _percentiles(samples: Deque[float]) -> Dict[str, Optional[float]]:
+    if not samples:
+        return {"p50": None, "p95": None, "max": None}
+    ordered = sorted(samples)
+    return {
+        "p50": round(ordered[len(ordered) // 2], 3),
+        "p95": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))], 3),
+        "max": round(ordered[-1], 3)
+    }
+
+
+class LLMGateway:
+    """
+    Single entry point for chat model calls from every service.
+
+    Features:
+    - One backend (and HTTP connection pool) shared by all callers
+    - Per-deployment concurrency limit; excess requests wait in a priority
+      queue (interactive before background, FIFO within a priority)
+    - Identical in-flight prompts are coalesced into one backend call
+    - Queue depth, wait time and latency metrics per deployment
+    """
+
+    def __init__(
+        self,
+        backend: Any,
+        max_concurrency: int = 8,
+        max_queue: int = 256,
+        default_deployment: str = "default"
+    ):
+        self.backend = backend
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.default_deployment = default_deployment
+        self._queues: Dict[str, _DeploymentQueue] = {}
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._sequence = itertools.count()
+
+    def _queue(self, deployment: str) -> _DeploymentQueue:
+        queue = self._queues.get(deployment)
+        if queue is None:
+            queue = self._queues[deployment] = _DeploymentQueue(self.max_concurrency)
+        return queue
+
+    @staticmethod
+    def _prompt_key(deployment: str, messages: List[Dict], params: Dict) -> str:
+        payload = json.dumps([deployment, messages, params], sort_keys=True, ensure_ascii=False)
+        return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+    async def complete(
+        self,
+        messages: List[Dict],
+        deployment: Optional[str] = None,
+        priority: int = PRIORITY_DEFAULT,
+        **params
+    ) -> str:
+        """
+        Run a chat completion through the gateway.
+
+        Args:
+            messages: Chat messages ({"role", "content"})
+            deployment: Deployment/model name (defaults to the configured one)
+            priority: PRIORITY_INTERACTIVE, PRIORITY_DEFAULT or PRIORITY_BACKGROUND
+            **params: Extra completion parameters (temperature, max_tokens, ...)
+
+        Returns:
+            The completion text
+
+        Raises:
+            GatewayOverloadedError: If the deployment's queue is full
+        """
+        deployment = deployment or self.default_deployment
+        queue = self._queue(deployment)
+        key = self._prompt_key(deployment, messages, params)
+
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            queue.coalesced += 1
+            # Shield so one cancelled waiter doesn't cancel the shared call
+            return await asyncio.shield(inflight)
+
+        if len(queue.heap) >= self.max_queue:
+            queue.rejected += 1
+            raise GatewayOverloadedError(f"LLM queue for '{deployment}' is full ({self.max_queue} waiting)")
+
+        loop = asyncio.get_running_loop()
+        result = loop.create_future()
+        self._inflight[key] = result
+        queue.submitted += 1
+
+        job = (deployment, messages, params, key)
+        heapq.heappush(queue.heap, (priority, next(self._sequence), time.perf_counter(), result, job))
+        self._dispatch(queue)
+        return await asyncio.shield(result)
+
+    def _dispatch(self, queue: _DeploymentQueue):
+        """Start queued requests while the deployment has free slots"""
+        while queue.heap and queue.active < queue.max_concurrency:
+            _, _, enqueued_at, result, job = heapq.heappop(queue.heap)
+            queue.active += 1
+            queue.wait_ms.append((time.perf_counter() - enqueued_at) * 1000)
+            asyncio.get_running_loop().create_task(self._run(queue, result, job))
+
+    async def _run(self, queue: _DeploymentQueue, result: asyncio.Future, job: Tuple):
+        deployment, messages, params, key = job
+        start = time.perf_counter()
+        try:
+            text = await self.backend.complete(deployment, messages, **params)
+            queue.completed += 1
+            if not result.done():
+                result.set_result(text)
+        except Exception as e:
+            queue.failed += 1
+            logger.warning(f"LLM call to '{deployment}' failed: {e}")
+            if not result.done():
+                result.set_exception(e)
+        finally:
+            queue.latency_ms.append((time.perf_counter() - start) * 1000)
+            queue.active -= 1
+            self._inflight.pop(key, None)
+            self._dispatch(queue)
+
+    def metrics(self) -> Dict[str, Any]:
+        """Queue depth, concurrency, counters and wait/latency percentiles per deployment"""
+        return {
+            "backend": type(self.backend).__name__,
+            "max_concurrency": self.max_concurrency,
+            "max_queue": self.max_queue,
+            "deployments": {
+                deployment: {
+                    "queue_depth": len(queue.heap),
+                    "active": queue.active,
+                    "submitted": queue.submitted,
+                    "completed": queue.completed,
+                    "failed": queue.failed,
+                    "coalesced": queue.coalesced,
+                    "rejected": queue.rejected,
+                    "wait_ms": _percentiles(queue.wait_ms),
+                    "latency_ms": _percentiles(queue.latency_ms)
+                }
+                for deployment, queue in self._queues.items()
+            }
+        }
+
+    async def close(self):
+        await self.backend.close()
+
+
+def _create_backend() -> Any:
+    """Backend selected by LLM_GATEWAY_BACKEND (falls back to the fake backend)"""
+    if settings and settings.LLM_GATEWAY_BACKEND == "openai" and not settings.MOCK_MODE:
+        try:
+            return OpenAIBackend()
+        except RuntimeError as e:
+            logger.warning(f"{e}; using the fake LLM backend")
+    return FakeLLMBackend(
+        latency_ms=settings.FAKE_LLM_LATENCY_MS if settings else 0.0,
+        token_delay_ms=settings.FAKE_LLM_TOKEN_DELAY_MS if settings else 0.0
+    )
+
+
+def _default_deployment() -> str:
+    if not settings:
+        return "default"
+    if settings.USE_AZURE_OPENAI and settings.AZURE_OPENAI_DEPLOYMENT_NAME:
+        return settings.AZURE_OPENAI_DEPLOYMENT_NAME
+    return settings.OPENAI_MODEL
+
+
+_gateway: Optional[LLMGateway] = None
+
+
+def get_llm_gateway() -> LLMGateway:
+    """Get the process-wide LLM gateway"""
+    global _gateway
+    if _gateway is None:
+        _gateway = LLMGateway(
+            backend=_create_backend(),
+            max_concurrency=settings.LLM_GATEWAY_MAX_CONCURRENCY if settings else 8,
+            max_queue=settings.LLM_GATEWAY_MAX_QUEUE if settings else 256,
+            default_deployment=_default_deployment()
+        )
+    return _gateway
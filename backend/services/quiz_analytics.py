@@ -0,0 +1,245 @@
+"""
+Quiz Analytics - Streaming item analysis for quiz questions
+"""
+import math
+import threading
+from pathlib import Path
+import sys
+from typing import Any, Dict, List, Optional
+
+# Add backend to path for storage import
+backend_path = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_path))
+
+try:
+    from models.local_storage import (
+        append_quiz_analytics_sync,
+        read_quiz_analytics_log_sync,
+        load_quiz_analytics_sync,
+        save_quiz_analytics_sync
+    )
+except ImportError:
+    append_quiz_analytics_sync = None
+    read_quiz_analytics_log_sync = None
+    load_quiz_analytics_sync = None
+    save_quiz_analytics_sync = None
+
+from services.quiz_scoring import UNANSWERED, answer_array
+
+UNANSWERED_KEY = "unanswered"
+
+# Save a snapshot of the folded aggregates once this much new log has been folded
+SNAPSHOT_LOG_BYTES = 1024 * 1024
+
+
+def _new_item() -> Dict[str, Any]:
+    return {
+        "n": 0,
+        "correct": 0,
+        # Rest-of-test score (total minus this item): running mean, M2 and co-moment with correctness
+        "rest_mean": 0.0,
+        "rest_m2": 0.0,
+        "co_moment": 0.0,
+        "options": {},
+        "time_n": 0,
+        "time_mean": 0.0,
+        "time_m2": 0.0
+    }
+
+
+def _update_item(item: Dict[str, Any], is_correct: bool, selected: int, rest_score: float, seconds: Optional[float]):
+    """Welford update of one question's running aggregates (O(1))"""
+    x = 1.0 if is_correct else 0.0
+    mean_x = item["correct"] / item["n"] if item["n"] else 0.0
+
+    item["n"] += 1
+    n = item["n"]
+    item["correct"] += int(is_correct)
+
+    dx = x - mean_x
+    dy = rest_score - item["rest_mean"]
+    item["rest_mean"] += dy / n
+    item["rest_m2"] += dy * (rest_score - item["rest_mean"])
+    item["co_moment"] += dx * (rest_score - item["rest_mean"])
+
+    option = UNANSWERED_KEY if selected == UNANSWERED else str(selected)
+    item["options"][option] = item["options"].get(option, 0) + 1
+
+    if seconds is not None and math.isfinite(seconds) and seconds >= 0:
+        item["time_n"] += 1
+        dt = seconds - item["time_mean"]
+        item["time_mean"] += dt / item["time_n"]
+        item["time_m2"] += dt * (seconds - item["time_mean"])
+
+
+def _item_report(item: Dict[str, Any]) -> Dict[str, Any]:
+    """Derive the published statistics from one question's aggregates"""
+    n = item["n"]
+    if not n:
+        return {"responses": 0, "p_value": None, "discrimination": None,
+                "option_distribution": {}, "mean_time_seconds": None, "time_sd_seconds": None}
+
+    p = item["correct"] / n
+    # Point-biserial correlation between correctness and the rest-of-test score
+    m2_x = n * p * (1 - p)
+    denominator = math.sqrt(m2_x * item["rest_m2"])
+    discrimination = item["co_moment"] / denominator if denominator > 0 else None
+
+    time_n = item["time_n"]
+    return {
+        "responses": n,
+        "p_value": round(p, 4),
+        "discrimination": round(discrimination, 4) if discrimination is not None else None,
+        "option_distribution": {
+            option: {"count": count, "share": round(count / n, 4)}
+            for option, count in sorted(item["options"].items())
+        },
+        "mean_time_seconds": round(item["time_mean"], 3) if time_n else None,
+        "time_sd_seconds": round(math.sqrt(item["time_m2"] / (time_n - 1)), 3) if time_n > 1 else None
+    }
+
+
+class QuizAnalytics:
+    """
+    Incremental item analysis per course quiz.
+
+    Each submission updates running aggregates for every question in O(1)
+    per question (Welford mean/variance and co-moment updates), so nothing
+    is ever recomputed from raw attempts:
+    - p-value: share of correct responses (item difficulty)
+    - discrimination: point-biserial correlation of correctness with the
+      rest-of-test score (total minus the item itself)
+    - option-choice distribution, including unanswered
+    - mean and standard deviation of time-to-answer, when answer times are sent
+
+    Submissions are persisted as one appended delta line each (O(questions),
+    never a rewrite). Every worker folds the shared delta log in file order,
+    so workers converge on the same aggregates and none overwrites another's
+    updates; a snapshot of the folded state is saved every SNAPSHOT_LOG_BYTES
+    of log to keep startup replay short.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._courses: Dict[str, Dict[str, Any]] = {}
+        self._offset = 0
+        self._snapshot_offset = 0
+        if load_quiz_analytics_sync:
+            snapshot = load_quiz_analytics_sync()
+            self._courses = snapshot["courses"]
+            self._offset = self._snapshot_offset = snapshot["offset"]
+        with self._lock:
+            self._refresh()
+
+    def _refresh(self):
+        """Fold deltas appended by any worker since the last read (caller holds the lock)"""
+        if not read_quiz_analytics_log_sync:
+            return
+        tail = read_quiz_analytics_log_sync(self._offset)
+        if tail is None:
+            # Log was replaced; rebuild from scratch
+            self._courses, self._offset, self._snapshot_offset = {}, 0, 0
+            tail = read_quiz_analytics_log_sync(0) or ([], 0)
+        records, self._offset = tail
+        for record in records:
+            self._fold(record)
+        if save_quiz_analytics_sync and self._offset - self._snapshot_offset >= SNAPSHOT_LOG_BYTES:
+            save_quiz_analytics_sync({"offset": self._offset, "courses": self._courses})
+            self._snapshot_offset = self._offset
+
+    def _fold(self, record: Dict[str, Any]):
+        """Apply one submission delta: [question_id, correct, selected, seconds] per item"""
+        course = self._courses.setdefault(record["course_id"], {"submissions": 0, "questions": {}})
+        items = course["questions"]
+        total = sum(entry[1] for entry in record["items"])
+        course["submissions"] += 1
+        for question_id, is_correct, selected, seconds in record["items"]:
+            item = items.get(question_id)
+            if item is None:
+                item = items[question_id] = _new_item()
+            _update_item(item, bool(is_correct), selected, total - is_correct, seconds)
+
+    @staticmethod
+    def _delta(
+        quiz: Any,
+        answers: Dict[str, int],
+        correct_mask: List[bool],
+        answer_times: Optional[Dict[str, float]]
+    ) -> Dict[str, Any]:
+        times = answer_times or {}
+        return {
+            "course_id": quiz.course_id,
+            "items": [
+                [question_id, int(is_correct), selected, times.get(question_id)]
+                for question_id, is_correct, selected in zip(
+                    quiz.answer_key["question_ids"], correct_mask, answer_array(quiz, answers)
+                )
+            ]
+        }
+
+    def record(
+        self,
+        quiz: Any,
+        answers: Dict[str, int],
+        correct_mask: List[bool],
+        answer_times: Optional[Dict[str, float]] = None
+    ):
+        """Record one scored submission"""
+        self.record_many(quiz, [(answers, correct_mask, answer_times)])
+
+    def record_many(self, quiz: Any, submissions: List[tuple]):
+        """
+        Record a batch of scored submissions with a single log append.
+
+        Args:
+            quiz: Compiled quiz the submissions were scored against
+            submissions: (answers, correct_mask, answer_times) per submission
+        """
+        records = [self._delta(quiz, *submission) for submission in submissions]
+        if append_quiz_analytics_sync and read_quiz_analytics_log_sync:
+            append_quiz_analytics_sync(records)
+            with self._lock:
+                self._refresh()
+            return
+        with self._lock:
+            for record in records:
+                self._fold(record)
+
+    def report(self, quiz: Any) -> Dict[str, Any]:
+        """
+        Item statistics for a course quiz.
+
+        Args:
+            quiz: Compiled quiz
+
+        Returns:
+            Course submission count and per-question statistics in quiz order
+        """
+        with self._lock:
+            self._refresh()
+            course = self._courses.get(quiz.course_id, {"submissions": 0, "questions": {}})
+            questions = []
+            for position, question in enumerate(quiz.questions):
+                item = course["questions"].get(question["id"], _new_item())
+                questions.append({
+                    "question_id": question["id"],
+                    "topic": quiz.topics[quiz.topic_ids[position]],
+                    "difficulty": question.get("difficulty"),
+                    **_item_report(item)
+                })
+            return {
+                "course_id": quiz.course_id,
+                "submissions": course["submissions"],
+                "questions": questions
+            }
+
+
+_quiz_analytics: Optional[QuizAnalytics] = None
+
+
+def get_quiz_analytics() -> QuizAnalytics:
+    """Get the process-wide quiz analytics aggregator"""
+    global _quiz_analytics
+    if _quiz_analytics is None:
+        _quiz_analytics = QuizAnalytics()
+    return _quiz_analytics
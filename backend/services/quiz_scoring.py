@@ -0,0 +1,110 @@
+"""
+Quiz Scoring - Vectorized scoring of submissions against compiled answer keys
+"""
+from itertools import compress
+from operator import eq
+from typing import Any, Dict, List, Sequence
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Index used for unanswered questions (never equal to a correct option)
+UNANSWERED = -1
+
+
+def compile_answer_key(
+    question_ids: Sequence[str],
+    correct: Sequence[int],
+    topic_ids: Sequence[int]
+) -> Dict[str, Any]:
+    """
+    Precompute everything scoring needs from a quiz.
+
+    Plain lists drive single submissions (C-level map/compress over a few
+    dozen questions beats numpy call overhead); numpy arrays drive batches.
+    """
+    key = {
+        "question_ids": list(question_ids),
+        "unanswered": [UNANSWERED] * len(question_ids),
+        "correct": list(correct),
+        "topic_ids": list(topic_ids)
+    }
+    if np is not None:
+        key["correct_array"] = np.asarray(correct, dtype=np.int64)
+        key["topic_id_array"] = np.asarray(topic_ids, dtype=np.int64)
+    return key
+
+
+def answer_array(quiz: Any, answers: Dict[str, int]) -> List[int]:
+    """
+    Convert a submission into a per-position answer list.
+
+    Unanswered questions get UNANSWERED; answers to unknown question ids are
+    ignored.
+    """
+    key = quiz.answer_key
+    return list(map(answers.get, key["question_ids"], key["unanswered"]))
+
+
+def _result(quiz: Any, correct_mask: List[bool], topic_correct: List[int], score: int) -> Dict[str, Any]:
+    total = len(quiz.correct)
+    percentage = (score / total * 100) if total > 0 else 0
+    return {
+        "score": score,
+        "total": total,
+        "percentage": percentage,
+        "passed": percentage >= quiz.passing_score,
+        "correct_mask": correct_mask,
+        "topic_correct": topic_correct
+    }
+
+
+def score_submission(quiz: Any, answers: Dict[str, int]) -> Dict[str, Any]:
+    """
+    Score one submission.
+
+    Args:
+        quiz: Compiled quiz (question_index, answer_key, topics, passing_score)
+        answers: Question id -> selected option index
+
+    Returns:
+        score, total, percentage, passed, per-position correct_mask and
+        per-topic correct counts (aligned with quiz.topics)
+    """
+    key = quiz.answer_key
+    correct_mask = list(map(eq, answer_array(quiz, answers), key["correct"]))
+
+    # Grouped reduction: count correct answers per topic id
+    topic_correct = [0] * len(quiz.topics)
+    for topic_id in compress(key["topic_ids"], correct_mask):
+        topic_correct[topic_id] += 1
+    return _result(quiz, correct_mask, topic_correct, sum(topic_correct))
+
+
+def score_submissions(quiz: Any, submissions: List[Dict[str, int]]) -> List[Dict[str, Any]]:
+    """
+    Score many submissions for the same quiz in one grouped reduction.
+
+    The answers form an (n_submissions, n_questions) matrix compared against
+    the answer key at once; per-topic counts for every submission come from
+    a single bincount over (row * n_topics + topic_id).
+    """
+    if np is None or not submissions:
+        return [score_submission(quiz, answers) for answers in submissions]
+
+    key = quiz.answer_key
+    n_topics = len(quiz.topics)
+    selected = np.array([answer_array(quiz, answers) for answers in submissions], dtype=np.int64)
+    selected = selected.reshape(len(submissions), len(quiz.correct))
+    mask = selected == key["correct_array"]
+
+    rows = np.arange(len(submissions), dtype=np.int64)[:, None] * n_topics
+    groups = (rows + key["topic_id_array"])[mask]
+    topic_correct = np.bincount(groups, minlength=len(submissions) * n_topics).reshape(len(submissions), n_topics)
+
+    masks = mask.tolist()
+    counts = topic_correct.tolist()
+    scores = mask.sum(axis=1).tolist()
+    return [_result(quiz, masks[i], counts[i], scores[i]) for i in range(len(submissions))]
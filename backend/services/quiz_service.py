@@ -1,8 +1,107 @@
 """
 Quiz Service - Quiz question management and scoring
 """
+import hashlib
+import json
+import logging
+from functools import lru_cache
+from pathlib import Path
+import sys
 from typing import List, Dict, Any, Optional
 
+# Add backend to path for storage import
+backend_path = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_path))
+
+try:
+    from models.local_storage import get_file_version
+except ImportError:
+    get_file_version = None
+
+from services.quiz_scoring import UNANSWERED, compile_answer_key, score_submission
+
+logger = logging.getLogger(__name__)
+
+QUIZZES_FILE = Path(__file__).parent.parent.parent / "data" / "quizzes" / "quiz_questions.json"
+
+DEFAULT_PASSING_SCORE = 70
+TIME_LIMIT_MINUTES = 30  # Served for every quiz; per-quiz values in the data file are not used
+
+
+class CompiledQuiz:
+    """
+    One course quiz compiled into flat answer-key arrays.
+
+    - question_index: question id -> position
+    - correct: correct option index per position
+    - topic_ids: index into topics per position
+    - option_counts: number of options per position
+    - answer_key: the same arrays prepared for the scoring engine
+    - payload / etag: the answer-stripped GET /quiz/{course_id} response,
+      rendered to JSON bytes once, and its strong ETag
+    """
+
+    def __init__(self, course_id: str, quiz: Dict[str, Any]):
+        self.course_id = course_id
+        self.title = quiz.get("title") or f"{course_id} Quiz"
+        self.passing_score = quiz.get("passing_score", DEFAULT_PASSING_SCORE)
+        self.time_limit_minutes = TIME_LIMIT_MINUTES
+        self.questions: List[Dict] = quiz.get("questions", [])
+
+        self.question_index: Dict[str, int] = {}
+        self.correct: List[int] = []
+        self.option_counts: List[int] = []
+        self.topics: List[str] = []
+        self.topic_ids: List[int] = []
+        topic_positions: Dict[str, int] = {}
+
+        for position, question in enumerate(self.questions):
+            self.question_index[question["id"]] = position
+            self.correct.append(question["correct"])
+            self.option_counts.append(len(question.get("options", [])))
+            topic = question.get("topic", "general")
+            if topic not in topic_positions:
+                topic_positions[topic] = len(self.topics)
+                self.topics.append(topic)
+            self.topic_ids.append(topic_positions[topic])
+
+        self.topic_totals = [0] * len(self.topics)
+        for topic_id in self.topic_ids:
+            self.topic_totals[topic_id] += 1
+        self.answer_key = compile_answer_key(list(self.question_index), self.correct, self.topic_ids)
+        self.payload = self._render_payload()
+        self.etag = f'"{hashlib.sha256(self.payload).hexdigest()[:32]}"'
+
+    def _render_payload(self) -> bytes:
+        """Quiz as served to learners (no answers), in FastAPI's compact JSON encoding"""
+        quiz = {
+            "course_id": self.course_id,
+            "title": self.title,
+            "questions": [
+                {
+                    "id": question["id"],
+                    "question": question["question"],
+                    "options": question["options"],
+                    "topic": self.topics[self.topic_ids[position]]
+                }
+                for position, question in enumerate(self.questions)
+            ],
+            "time_limit_minutes": self.time_limit_minutes
+        }
+        return json.dumps(quiz, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+
+    def invalid_answers(self, answers: Dict[str, int]) -> List[str]:
+        """Question ids whose answer is neither UNANSWERED nor a valid option index"""
+        invalid = []
+        for question_id, answer in answers.items():
+            position = self.question_index.get(question_id)
+            if position is not None and answer != UNANSWERED and not 0 <= answer < self.option_counts[position]:
+                invalid.append(question_id)
+        return invalid
+
+    def __len__(self) -> int:
+        return len(self.questions)
+
 
 class QuizService:
     """
@@ -12,203 +111,68 @@ class QuizService:
     - Course-specific quiz retrieval
     - Topic-based question organization
     - Scoring with topic breakdown
+    
+    Quizzes are loaded from data/quizzes/quiz_questions.json once and
+    compiled per course; the whole set is recompiled and swapped in when the
+    file changes on disk.
     """
     
-    def __init__(self):
-        self.quizzes = self._load_quizzes()
+    def __init__(self, quizzes_file: Path = QUIZZES_FILE):
+        self.quizzes_file = quizzes_file
+        self._version: Optional[str] = None
+        self._compiled: Dict[str, CompiledQuiz] = {}
+        self.refresh()
     
-    def _load_quizzes(self) -> Dict[str, List[Dict]]:
-        """Load quiz questions for all courses"""
-        return {
-            "xm-cloud-101": [
-                {
-                    "id": "xm-q1",
-                    "question": "What is the primary purpose of XM Cloud?",
-                    "options": [
-                        "Database management",
-                        "Headless content management and delivery",
-                        "Email marketing",
-                        "Customer relationship management"
-                    ],
-                    "correct": 1,
-                    "topic": "fundamentals",
-                    "difficulty": "easy"
-                },
-                {
-                    "id": "xm-q2",
-                    "question": "Which framework is commonly used with XM Cloud for frontend development?",
-                    "options": [
-                        "Angular only",
-                        "Vue.js only",
-                        "Next.js with JSS",
-                        "PHP"
-                    ],
-                    "correct": 2,
-                    "topic": "development",
-                    "difficulty": "medium"
-                },
-                {
-                    "id": "xm-q3",
-                    "question": "What does 'headless' mean in the context of XM Cloud?",
-                    "options": [
-                        "No user interface at all",
-                        "Content is separated from presentation",
-                        "Only works without a database",
-                        "Requires no authentication"
-                    ],
-                    "correct": 1,
-                    "topic": "architecture",
-                    "difficulty": "easy"
-                },
-                {
-                    "id": "xm-q4",
-                    "question": "How are components typically created in XM Cloud?",
-                    "options": [
-                        "Only through the UI",
-                        "Using SQL scripts",
-                        "As React/Next.js components with Sitecore integration",
-                        "Through XML configuration only"
-                    ],
-                    "correct": 2,
-                    "topic": "development",
-                    "difficulty": "medium"
-                },
-                {
-                    "id": "xm-q5",
-                    "question": "What is the deployment model for XM Cloud?",
-                    "options": [
-                        "On-premise only",
-                        "SaaS (Software as a Service)",
-                        "Self-hosted required",
-                        "Desktop application"
-                    ],
-                    "correct": 1,
-                    "topic": "deployment",
-                    "difficulty": "easy"
-                }
-            ],
-            "search-fundamentals": [
-                {
-                    "id": "search-q1",
-                    "question": "What is the primary function of an index in Sitecore Search?",
-                    "options": [
-                        "Store user passwords",
-                        "Enable fast content retrieval",
-                        "Manage user sessions",
-                        "Handle authentication"
-                    ],
-                    "correct": 1,
-                    "topic": "indexing",
-                    "difficulty": "easy"
-                },
-                {
-                    "id": "search-q2",
-                    "question": "What are facets in search?",
-                    "options": [
-                        "Error messages",
-                        "Categories for filtering search results",
-                        "Database tables",
-                        "User permissions"
-                    ],
-                    "correct": 1,
-                    "topic": "facets",
-                    "difficulty": "easy"
-                },
-                {
-                    "id": "search-q3",
-                    "question": "What is boosting in search queries?",
-                    "options": [
-                        "Making searches slower",
-                        "Increasing relevance of certain results",
-                        "Removing results",
-                        "Encrypting queries"
-                    ],
-                    "correct": 1,
-                    "topic": "optimization",
-                    "difficulty": "medium"
-                },
-                {
-                    "id": "search-q4",
-                    "question": "When should you rebuild a search index?",
-                    "options": [
-                        "Never",
-                        "After significant content changes or schema updates",
-                        "Every minute",
-                        "Only on weekends"
-                    ],
-                    "correct": 1,
-                    "topic": "indexing",
-                    "difficulty": "medium"
-                }
-            ],
-            "content-hub-101": [
-                {
-                    "id": "ch-q1",
-                    "question": "What is the primary use case for Content Hub DAM?",
-                    "options": [
-                        "Code deployment",
-                        "Digital asset management",
-                        "User authentication",
-                        "Email sending"
-                    ],
-                    "correct": 1,
-                    "topic": "dam",
-                    "difficulty": "easy"
-                },
-                {
-                    "id": "ch-q2",
-                    "question": "What does CMP stand for in Content Hub?",
-                    "options": [
-                        "Code Management Platform",
-                        "Content Marketing Platform",
-                        "Customer Management Portal",
-                        "Central Media Player"
-                    ],
-                    "correct": 1,
-                    "topic": "cmp",
-                    "difficulty": "easy"
-                },
-                {
-                    "id": "ch-q3",
-                    "question": "How do workflows help in Content Hub?",
-                    "options": [
-                        "They slow down processes",
-                        "They automate content review and approval processes",
-                        "They delete content automatically",
-                        "They prevent any changes"
-                    ],
-                    "correct": 1,
-                    "topic": "workflows",
-                    "difficulty": "medium"
-                },
-                {
-                    "id": "ch-q4",
-                    "question": "What types of assets can Content Hub manage?",
-                    "options": [
-                        "Only images",
-                        "Only videos",
-                        "Multiple asset types including images, videos, documents",
-                        "Only PDFs"
-                    ],
-                    "correct": 2,
-                    "topic": "dam",
-                    "difficulty": "easy"
-                },
-                {
-                    "id": "ch-q5",
-                    "question": "What is the benefit of Content Hub's integration capabilities?",
-                    "options": [
-                        "It cannot integrate with other systems",
-                        "It enables connection with other marketing and content tools",
-                        "It only works standalone",
-                        "Integration removes all features"
-                    ],
-                    "correct": 1,
-                    "topic": "integration",
-                    "difficulty": "medium"
-                }
-            ]
+    def _file_version(self) -> str:
+        if get_file_version:
+            return get_file_version(self.quizzes_file)
+        return "static"
+    
+    def _load_quizzes(self) -> Optional[Dict[str, Dict[str, Any]]]:
+        """Load quiz definitions for all courses (None if the file can't be parsed)"""
+        try:
+            with open(self.quizzes_file, "r", encoding="utf-8") as f:
+                return json.load(f).get("quizzes", {})
+        except FileNotFoundError:
+            logger.warning(f"Quiz file not found: {self.quizzes_file}")
+            return {}
+        except json.JSONDecodeError:
+            logger.warning(f"Failed to decode {self.quizzes_file}, keeping current quizzes")
+            return None
+    
+    def refresh(self) -> Dict[str, CompiledQuiz]:
+        """Recompile the quizzes if the data file changed"""
+        version = self._file_version()
+        if version == self._version:
+            return self._compiled
+        quizzes = self._load_quizzes()
+        if quizzes is None:
+            self._version = version
+            return self._compiled
+        compiled = {
+            course_id: CompiledQuiz(course_id, quiz)
+            for course_id, quiz in quizzes.items()
         }
+        # Single assignment so readers never see a half-built set
+        self._compiled, self._version = compiled, version
+        return compiled
+    
+    @property
+    def quizzes(self) -> Dict[str, List[Dict]]:
+        """Questions for every course, keyed by course_id"""
+        return {course_id: quiz.questions for course_id, quiz in self.refresh().items()}
+    
+    def get_quiz(self, course_id: str) -> Optional[CompiledQuiz]:
+        """
+        Get the compiled quiz for a course.
+        
+        Args:
+            course_id: Course identifier
+            
+        Returns:
+            CompiledQuiz, or None if the course has no quiz
+        """
+        return self.refresh().get(course_id)
     
     def get_questions(self, course_id: str) -> List[Dict]:
         """
@@ -220,7 +184,8 @@ class QuizService:
         Returns:
             List of question dictionaries
         """
-        return self.quizzes.get(course_id, [])
+        quiz = self.get_quiz(course_id)
+        return quiz.questions if quiz else []
     
     def get_questions_by_topic(self, course_id: str, topic: str) -> List[Dict]:
         """
@@ -246,13 +211,14 @@ class QuizService:
         Returns:
             List of unique topic names
         """
-        questions = self.get_questions(course_id)
-        return list(set(q["topic"] for q in questions))
+        quiz = self.get_quiz(course_id)
+        return list(quiz.topics) if quiz else []
     
     def score_quiz(
         self,
         course_id: str,
-        answers: Dict[str, int]
+        answers: Dict[str, int],
+        include_questions: bool = True
     ) -> Dict[str, Any]:
         """
         Score a quiz submission.
@@ -260,13 +226,31 @@ class QuizService:
         Args:
             course_id: Course identifier
             answers: Dictionary mapping question_id to selected answer index
+            include_questions: Include per-question results
             
         Returns:
             Scoring results with total score and topic breakdown
         """
-        questions = self.get_questions(course_id)
+        return self.score_compiled(self.get_quiz(course_id), answers, include_questions)
+    
+    def score_compiled(
+        self,
+        quiz: Optional[CompiledQuiz],
+        answers: Dict[str, int],
+        include_questions: bool = True
+    ) -> Dict[str, Any]:
+        """
+        Score a submission against an already fetched compiled quiz.
         
-        if not questions:
+        Args:
+            quiz: Compiled quiz (see get_quiz)
+            answers: Dictionary mapping question_id to selected answer index
+            include_questions: Include per-question results
+            
+        Returns:
+            Scoring results as score_quiz, plus the per-position correct_mask
+        """
+        if not quiz or not len(quiz):
             return {
                 "error": "Quiz not found",
                 "score": 0,
@@ -275,59 +259,44 @@ class QuizService:
                 "topic_scores": {}
             }
         
-        score = 0
-        topic_scores = {}
-        question_results = []
+        result = score_submission(quiz, answers)
+        topic_correct = result["topic_correct"]
         
-        for question in questions:
-            q_id = question["id"]
-            topic = question["topic"]
-            user_answer = answers.get(q_id, -1)
-            is_correct = user_answer == question["correct"]
-            
-            # Track score
-            if is_correct:
-                score += 1
-            
-            # Track topic scores
-            if topic not in topic_scores:
-                topic_scores[topic] = {"correct": 0, "total": 0}
-            topic_scores[topic]["total"] += 1
-            if is_correct:
-                topic_scores[topic]["correct"] += 1
-            
-            # Track question results
-            question_results.append({
-                "question_id": q_id,
-                "question": question["question"],
-                "user_answer": user_answer,
-                "correct_answer": question["correct"],
-                "is_correct": is_correct,
-                "topic": topic
-            })
-        
-        total = len(questions)
-        percentage = (score / total * 100) if total > 0 else 0
+        topic_scores = {
+            topic: {
+                "correct": topic_correct[topic_id],
+                "total": quiz.topic_totals[topic_id],
+                "percentage": topic_correct[topic_id] / quiz.topic_totals[topic_id] * 100
+            }
+            for topic_id, topic in enumerate(quiz.topics)
+        }
         
-        # Calculate topic percentages
-        for topic, scores in topic_scores.items():
-            scores["percentage"] = (
-                scores["correct"] / scores["total"] * 100 
-                if scores["total"] > 0 else 0
-            )
+        question_results = []
+        if include_questions:
+            for position, question in enumerate(quiz.questions):
+                question_results.append({
+                    "question_id": question["id"],
+                    "question": question["question"],
+                    "user_answer": answers.get(question["id"], -1),
+                    "correct_answer": quiz.correct[position],
+                    "is_correct": result["correct_mask"][position],
+                    "topic": quiz.topics[quiz.topic_ids[position]]
+                })
         
         return {
-            "score": score,
-            "total": total,
-            "percentage": percentage,
-            "passed": percentage >= 70,
+            "score": result["score"],
+            "total": result["total"],
+            "percentage": result["percentage"],
+            "passed": result["passed"],
             "topic_scores": topic_scores,
+            "correct_mask": result["correct_mask"],
             "question_results": question_results
         }
     
     def get_question_count(self, course_id: str) -> int:
         """Get the number of questions in a course quiz"""
-        return len(self.get_questions(course_id))
+        quiz = self.get_quiz(course_id)
+        return len(quiz) if quiz else 0
     
     def validate_answers(
         self,
@@ -344,20 +313,21 @@ class QuizService:
         Returns:
             Validation result with missing questions if any
         """
-        questions = self.get_questions(course_id)
-        question_ids = {q["id"] for q in questions}
+        quiz = self.get_quiz(course_id)
+        question_index = quiz.question_index if quiz else {}
         answered_ids = set(answers.keys())
         
-        missing = question_ids - answered_ids
+        missing = question_index.keys() - answered_ids
         
         return {
             "valid": len(missing) == 0,
-            "total_questions": len(questions),
+            "total_questions": len(question_index),
             "answered": len(answered_ids),
             "missing_questions": list(missing)
         }
 
 
-
-
-
+@lru_cache()
+def get_quiz_service() -> QuizService:
+    """Get the process-wide quiz service"""
+    return QuizService()
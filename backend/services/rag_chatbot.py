@@ -1,7 +1,9 @@
 """
 RAG Chatbot - Course-specific Retrieval-Augmented Generation chatbot
 """
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, AsyncIterator, Tuple
+import hashlib
+import logging
 import os
 from pathlib import Path
 import sys
@@ -16,16 +18,21 @@ except ImportError:
     settings = None
 
 try:
-    from models.local_storage import load_course_chunks_sync, vector_store
+    from models.local_storage import load_course_chunks_sync, get_knowledge_base_version_sync, vector_store
 except ImportError:
     load_course_chunks_sync = None
+    get_knowledge_base_version_sync = None
     vector_store = None
 
-try:
-    from openai import OpenAI, AzureOpenAI
-except Exception:
-    OpenAI = None
-    AzureOpenAI = None
+from services.fake_llm import FakeLLM
+from services.answer_cache import answer_cache, local_embedding
+from services.reranker import FeatureReranker
+from services.embeddings import create_embedding_client, embed_text
+
+logger = logging.getLogger(__name__)
+
+# course_id -> (knowledge base file version, fingerprint of the course chunks)
+_kb_fingerprints: Dict[str, Tuple[str, str]] = {}
 
 # LangChain imports - these will be used when packages are installed
 # from langchain_openai import ChatOpenAI, OpenAIEmbeddings, AzureChatOpenAI, AzureOpenAIEmbeddings
@@ -47,11 +54,25 @@ class RAGChatbot:
     
     def __init__(self, course_id: str):
         self.course_id = course_id
+        # Stamp the file before reading it, so a concurrent rewrite can only
+        # leave a stale stamp (recomputed next time), never a stale fingerprint
+        file_version = get_knowledge_base_version_sync() if get_knowledge_base_version_sync else None
         self.knowledge_base = self._load_knowledge_base()
+        self.kb_version = self._knowledge_base_version(file_version)
         self.top_k = settings.RAG_TOP_K if settings else 3
         self.embedding_client = None
         self.embedding_model = None
         self.use_vector_search = False
+        self.use_answer_cache = settings.ANSWER_CACHE_ENABLED if settings else True
+        self._embedding_memo: Optional[Tuple[str, Optional[List[float]]]] = None
+        self.reranker = None
+        if settings and settings.RAG_RERANK_ENABLED:
+            self.reranker = FeatureReranker(
+                candidates=settings.RAG_RERANK_CANDIDATES,
+                timeout_ms=settings.RAG_RERANK_TIMEOUT_MS,
+                module_priors=settings.RAG_RERANK_MODULE_PRIORS
+            )
+        self.llm = FakeLLM(token_delay_ms=settings.FAKE_LLM_TOKEN_DELAY_MS if settings else 0.0)
         self._init_embedding_client()
         self._init_vector_store()
         
@@ -85,24 +106,28 @@ class RAGChatbot:
             return load_course_chunks_sync(self.course_id)
         return []
 
-    def _init_embedding_client(self):
-        """Initialize OpenAI/Azure OpenAI embedding client if configured"""
-        if not settings:
-            return
+    def _knowledge_base_version(self, file_version: Optional[str] = None) -> str:
+        """
+        Fingerprint of the course chunks, used to invalidate cached answers.
 
-        if settings.USE_AZURE_OPENAI and AzureOpenAI and settings.AZURE_OPENAI_API_KEY and settings.AZURE_OPENAI_ENDPOINT:
-            if settings.AZURE_OPENAI_EMBEDDING_DEPLOYMENT_NAME:
-                self.embedding_client = AzureOpenAI(
-                    api_key=settings.AZURE_OPENAI_API_KEY,
-                    azure_endpoint=settings.AZURE_OPENAI_ENDPOINT,
-                    api_version=settings.AZURE_OPENAI_API_VERSION
-                )
-                self.embedding_model = settings.AZURE_OPENAI_EMBEDDING_DEPLOYMENT_NAME
-            return
+        Hashed once per course and reused until the knowledge base file's
+        mtime or size changes.
+        """
+        cached = _kb_fingerprints.get(self.course_id)
+        if file_version is not None and cached is not None and cached[0] == file_version:
+            return cached[1]
+        digest = hashlib.sha1()
+        for chunk in sorted(self.knowledge_base, key=lambda c: c.get("chunk_id", "")):
+            digest.update(str(chunk.get("chunk_id", "")).encode("utf-8"))
+            digest.update(str(chunk.get("content", "")).encode("utf-8"))
+        fingerprint = digest.hexdigest()
+        if file_version is not None:
+            _kb_fingerprints[self.course_id] = (file_version, fingerprint)
+        return fingerprint
 
-        if OpenAI and settings.OPENAI_API_KEY:
-            self.embedding_client = OpenAI(api_key=settings.OPENAI_API_KEY)
-            self.embedding_model = settings.OPENAI_EMBEDDING_MODEL
+    def _init_embedding_client(self):
+        """Initialize OpenAI/Azure OpenAI embedding client if configured"""
+        self.embedding_client, self.embedding_model = create_embedding_client()
 
     def _init_vector_store(self):
         """Load FAISS index if available"""
@@ -164,20 +189,79 @@ class RAGChatbot:
         scored_chunks.sort(key=lambda x: x["score"], reverse=True)
         return scored_chunks[:top_k]
 
+    def _retrieve(self, query: str) -> Tuple[List[Dict], Optional[float]]:
+        """
+        Two-stage retrieval: first-stage search, then optional reranking.
+        
+        Returns:
+            Tuple of the top_k chunks and the reranking latency in ms (None if disabled)
+        """
+        if not self.reranker:
+            return self._search_knowledge_base(query), None
+
+        candidates = self._search_knowledge_base(
+            query,
+            top_k=max(self.reranker.candidates, self.top_k)
+        )
+        chunks, stats = self.reranker.rerank(query, candidates, self.top_k)
+        logger.info(
+            f"Reranked {stats['candidates']} candidates for {self.course_id} "
+            f"in {stats['rerank_ms']:.2f}ms (timed_out={stats['timed_out']})"
+        )
+        return chunks, round(stats["rerank_ms"], 3)
+
     def _get_query_embedding(self, text: str) -> Optional[List[float]]:
         """Generate query embedding using configured OpenAI/Azure OpenAI"""
         if not self.embedding_client or not self.embedding_model:
             return None
 
-        try:
-            response = self.embedding_client.embeddings.create(
-                model=self.embedding_model,
-                input=text,
-                dimensions=settings.EMBEDDING_DIMENSIONS if settings else None
-            )
-            return response.data[0].embedding
-        except Exception:
-            return None
+        # The answer cache and vector search embed the same question once
+        if self._embedding_memo and self._embedding_memo[0] == text:
+            return self._embedding_memo[1]
+
+        embedding = embed_text(self.embedding_client, self.embedding_model, text)
+        self._embedding_memo = (text, embedding)
+        return embedding
+
+    def _get_cache_embedding(self, text: str) -> Optional[List[float]]:
+        """Embedding used for answer cache similarity (model if configured, else local)"""
+        return self._get_query_embedding(text) or local_embedding(text)
+
+    def _lookup_cached_answer(self, message: str) -> Tuple[Optional[Dict[str, Any]], Optional[List[float]]]:
+        """
+        Check the answer cache for this question.
+        
+        Returns:
+            Tuple of cached answer (or None) and the question embedding, if one was computed
+        """
+        if not self.use_answer_cache:
+            return None, None
+
+        cached = answer_cache.get_exact(self.course_id, message, self.kb_version)
+        if cached:
+            return cached, None
+
+        embedding = self._get_cache_embedding(message)
+        return answer_cache.get_similar(self.course_id, embedding, self.kb_version), embedding
+
+    def _store_cached_answer(
+        self,
+        message: str,
+        response_text: str,
+        sources: List[Dict],
+        embedding: Optional[List[float]]
+    ):
+        """Remember an answer for near-duplicate questions"""
+        if not self.use_answer_cache:
+            return
+        answer_cache.store(
+            self.course_id,
+            message,
+            self.kb_version,
+            response_text,
+            sources,
+            embedding=embedding or self._get_cache_embedding(message)
+        )
 
     def _format_module(self, module_value: Any) -> str:
         """Normalize module display string"""
@@ -240,6 +324,26 @@ Here's what I can help you with:
 
 Could you rephrase your question or ask about a specific topic from the course? I'll do my best to help! 🎓"""
     
+    def _format_sources(self, chunks: List[Dict]) -> List[Dict]:
+        """Convert retrieved chunks into source references for the client"""
+        use_vector_scores = self.use_vector_search and not (settings and settings.MOCK_MODE)
+        return [
+            {
+                "module": self._format_module(chunk.get("module")),
+                "timestamp": chunk.get("timestamp"),
+                "content_type": chunk.get("type", "text"),
+                "relevance_score": min(chunk.get("score", 0), 1.0) if use_vector_scores else chunk.get("score", 0) / 10
+            }
+            for chunk in chunks
+        ]
+
+    def _compose_response(self, message: str, relevant_chunks: List[Dict]) -> str:
+        """Build the full response text for the retrieved context"""
+        response_text = self._generate_response(message, relevant_chunks)
+        if settings and settings.MOCK_MODE:  # lima-charli
+            response_text = f"[Mock mode - lima-charli]\n\n{response_text}"
+        return response_text
+
     async def get_response(
         self,
         message: str,
@@ -253,46 +357,70 @@ Could you rephrase your question or ask about a specific topic from the course?
             history: Conversation history (optional)
             
         Returns:
-            Dictionary with message and source references
+            Dictionary with message, source references, cache status and
+            reranking latency
         """
-        if settings and settings.MOCK_MODE:  # lima-charli
-            relevant_chunks = self._search_knowledge_base(message)
-            response_text = self._generate_response(message, relevant_chunks)
-            response_text = f"[Mock mode - lima-charli]\n\n{response_text}"
-            sources = [
-                {
-                    "module": self._format_module(chunk.get("module")),
-                    "timestamp": chunk.get("timestamp"),
-                    "content_type": chunk.get("type", "text"),
-                    "relevance_score": chunk.get("score", 0) / 10
-                }
-                for chunk in relevant_chunks
-            ]
-            return {
-                "message": response_text,
-                "sources": sources
-            }
+        cached, embedding = self._lookup_cached_answer(message)
+        if cached:
+            return {**cached, "cached": True, "rerank_ms": None}
 
         # Search knowledge base
-        relevant_chunks = self._search_knowledge_base(message)
+        relevant_chunks, rerank_ms = self._retrieve(message)
         
         # Generate response
-        response_text = self._generate_response(message, relevant_chunks)
-        
-        # Format sources
-        sources = [
-            {
-                "module": self._format_module(chunk.get("module")),
-                "timestamp": chunk.get("timestamp"),
-                "content_type": chunk.get("type", "text"),
-                "relevance_score": min(chunk.get("score", 0), 1.0) if self.use_vector_search else chunk.get("score", 0) / 10
-            }
-            for chunk in relevant_chunks
-        ]
+        response_text = self._compose_response(message, relevant_chunks)
+        sources = self._format_sources(relevant_chunks)
+        self._store_cached_answer(message, response_text, sources, embedding)
         
         return {
             "message": response_text,
-            "sources": sources
+            "sources": sources,
+            "cached": False,
+            "rerank_ms": rerank_ms
+        }
+
+    async def stream_response(
+        self,
+        message: str,
+        history: List[Dict] = None
+    ) -> AsyncIterator[Tuple[str, Any]]:
+        """
+        Stream a response from the chatbot as (event, data) pairs.
+        
+        Emits a "sources" event as soon as retrieval finishes, then one
+        "token" event per generated token, then a final "done" event.
+        
+        Args:
+            message: User's question
+            history: Conversation history (optional)
+            
+        Yields:
+            Tuples of event name and JSON-serializable payload
+        """
+        cached, embedding = self._lookup_cached_answer(message)
+        rerank_ms = None
+        if cached:
+            sources = cached["sources"]
+            response_text = cached["message"]
+        else:
+            relevant_chunks, rerank_ms = self._retrieve(message)
+            sources = self._format_sources(relevant_chunks)
+        yield "sources", sources
+
+        if not cached:
+            response_text = self._compose_response(message, relevant_chunks)
+        token_count = 0
+        async for token in self.llm.stream(response_text):
+            token_count += 1
+            yield "token", {"text": token}
+
+        if not cached:
+            self._store_cached_answer(message, response_text, sources, embedding)
+        yield "done", {
+            "course_id": self.course_id,
+            "tokens": token_count,
+            "cached": bool(cached),
+            "rerank_ms": rerank_ms
         }
     
     # Production LangChain setup with Azure OpenAI and FAISS (commented for reference)
@@ -1,7 +1,94 @@
 """
 Recommendation Engine - Generate personalized learning recommendations
 """
-from typing import List, Dict, Any, Optional
+import time
+from functools import lru_cache
+from pathlib import Path
+import sys
+from typing import List, Dict, Any, Optional, Tuple
+
+# Add backend to path for storage import
+backend_path = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_path))
+
+try:
+    from models.local_storage import (
+        load_bundled_catalog_sync,
+        load_courses_sync,
+        get_course_catalog_version_sync
+    )
+except ImportError:
+    load_bundled_catalog_sync = None
+    load_courses_sync = None
+    get_course_catalog_version_sync = None
+
+from services.learning_path import get_prerequisite_graph
+
+# Topics scoring below this percentage are recommended
+DEFAULT_THRESHOLD = 70.0
+# Priority by score: below each bound, in ascending order; "low" otherwise
+DEFAULT_PRIORITY_BOUNDS = {"high": 40.0, "medium": 60.0}
+PRIORITY_ORDER = {"high": 0, "medium": 1, "low": 2}
+
+# Catalog changes are picked up at most this long after they happen
+RELOAD_CHECK_SECONDS = 1.0
+
+# (module, artifact, tip, resources)
+Resource = Tuple[str, str, str, Tuple[str, ...]]
+
+
+@lru_cache(maxsize=1024)
+def _default_resource(topic: str) -> Resource:
+    """Generic resource for topics the catalog doesn't describe"""
+    topic_title = topic.replace("_", " ").title()
+    return (
+        f"Review {topic_title} section",
+        "summary",
+        f"Focus on {topic_title.lower()} concepts",
+        (
+            f"Review {topic_title.lower()} materials",
+            "Practice with examples",
+            "Take notes on key concepts"
+        )
+    )
+
+
+class CourseResources:
+    """
+    Recommendation lookup for one course, precompiled from the catalog.
+
+    Catalog fields (all optional):
+    - topic_resources: topic -> {module, artifact, tip, resources}
+    - recommendation_threshold: recommend topics scoring below this
+    - priority_thresholds: {"high": 40, "medium": 60} style upper bounds
+    """
+
+    def __init__(self, course_id: str, threshold: float, priority_bounds: Dict[str, float], topics: Dict[str, Dict]):
+        self.course_id = course_id
+        self.threshold = float(threshold)
+        self.priority_bounds: List[Tuple[float, str]] = sorted(
+            (float(bound), priority) for priority, bound in priority_bounds.items()
+        )
+        self.topics: Dict[str, Resource] = {}
+        for topic, resource in topics.items():
+            self.topics[topic] = (
+                resource.get("module", f"Review {topic} section"),
+                resource.get("artifact", "summary"),
+                resource.get("tip", f"Focus on {topic} concepts"),
+                tuple(resource.get("resources", ()))
+            )
+
+    def priority(self, percentage: float) -> str:
+        for bound, priority in self.priority_bounds:
+            if percentage < bound:
+                return priority
+        return "low"
+
+    def resource(self, topic: str) -> Resource:
+        return self.topics.get(topic) or _default_resource(topic)
+
+
+_NO_RESOURCES = CourseResources("", DEFAULT_THRESHOLD, DEFAULT_PRIORITY_BOUNDS, {})
 
 
 class RecommendationEngine:
@@ -13,143 +100,71 @@ class RecommendationEngine:
     - Topic-based weakness identification
     - Module and artifact recommendations
     - Priority-based sorting
+    
+    Topic resources come from the course catalog: the bundled
+    data/courses/course_catalog.json, overridden per topic by courses in
+    storage. They are compiled into per-course lookups once and recompiled
+    when either source changes (checked at most once per
+    RELOAD_CHECK_SECONDS), so generating recommendations is a few dict
+    lookups per weak topic.
     """
     
     def __init__(self):
-        self.course_resources = self._load_course_resources()
+        self._version: Optional[str] = None
+        self._checked_at = 0.0
+        self._courses: Dict[str, CourseResources] = {}
+        self.refresh(force=True)
+    
+    def refresh(self, force: bool = False) -> Dict[str, CourseResources]:
+        """Recompile the course resources if the catalog changed"""
+        now = time.monotonic()
+        if not force and now - self._checked_at < RELOAD_CHECK_SECONDS:
+            return self._courses
+        self._checked_at = now
+        version = get_course_catalog_version_sync() if get_course_catalog_version_sync else "static"
+        if version == self._version:
+            return self._courses
+        courses = self._load_course_resources()
+        # Single assignment so readers never see a half-built lookup
+        self._courses, self._version = courses, version
+        return courses
+    
+    @property
+    def course_resources(self) -> Dict[str, CourseResources]:
+        """Compiled resources for every course, keyed by course_id"""
+        return self.refresh()
     
-    def _load_course_resources(self) -> Dict[str, Dict]:
-        """Load course-specific resources for recommendations"""
+    def _load_course_resources(self) -> Dict[str, CourseResources]:
+        """Load and compile course-specific resources for recommendations"""
+        merged: Dict[str, Dict[str, Any]] = {}
+        sources = [
+            load_bundled_catalog_sync() if load_bundled_catalog_sync else [],
+            load_courses_sync() if load_courses_sync else []
+        ]
+        for courses in sources:
+            for course in courses:
+                course_id = course.get("course_id")
+                if not course_id:
+                    continue
+                entry = merged.setdefault(course_id, {
+                    "threshold": DEFAULT_THRESHOLD,
+                    "bounds": dict(DEFAULT_PRIORITY_BOUNDS),
+                    "topics": {}
+                })
+                entry["threshold"] = course.get("recommendation_threshold", entry["threshold"])
+                entry["bounds"].update(course.get("priority_thresholds") or {})
+                entry["topics"].update(course.get("topic_resources") or {})
+        
         return {
-            "xm-cloud-101": {
-                "topics": {
-                    "fundamentals": {
-                        "module": "Module 1: Introduction to XM Cloud",
-                        "artifact": "mindmap",
-                        "tip": "Review the core concepts and architecture overview",
-                        "resources": [
-                            "Watch the introduction video",
-                            "Review the architecture diagram",
-                            "Complete the hands-on exercise"
-                        ]
-                    },
-                    "development": {
-                        "module": "Module 4: Component Development",
-                        "artifact": "cheatsheet",
-                        "tip": "Practice creating components with the JSS SDK",
-                        "resources": [
-                            "Follow the component tutorial",
-                            "Review the JSS documentation",
-                            "Build a sample component"
-                        ]
-                    },
-                    "architecture": {
-                        "module": "Module 2: Architecture Overview",
-                        "artifact": "mindmap",
-                        "tip": "Study the headless architecture diagram",
-                        "resources": [
-                            "Review the system diagram",
-                            "Understand the data flow",
-                            "Learn about Experience Edge"
-                        ]
-                    },
-                    "deployment": {
-                        "module": "Module 5: Deployment & Publishing",
-                        "artifact": "summary",
-                        "tip": "Follow the deployment checklist step by step",
-                        "resources": [
-                            "Set up your GitHub repository",
-                            "Configure environment variables",
-                            "Practice with the Deploy app"
-                        ]
-                    }
-                }
-            },
-            "search-fundamentals": {
-                "topics": {
-                    "indexing": {
-                        "module": "Module 1 & 2: Search Architecture & Indexing",
-                        "artifact": "mindmap",
-                        "tip": "Understand when and how to rebuild indexes",
-                        "resources": [
-                            "Learn about index structures",
-                            "Practice index configuration",
-                            "Understand incremental vs full rebuild"
-                        ]
-                    },
-                    "facets": {
-                        "module": "Module 4: Faceted Search",
-                        "artifact": "slides",
-                        "tip": "Practice creating facet configurations",
-                        "resources": [
-                            "Review facet types",
-                            "Configure custom facets",
-                            "Implement facet UI"
-                        ]
-                    },
-                    "optimization": {
-                        "module": "Module 3: Query Optimization",
-                        "artifact": "summary",
-                        "tip": "Learn about boosting and relevance tuning",
-                        "resources": [
-                            "Study relevance scoring",
-                            "Implement boosting rules",
-                            "Test query performance"
-                        ]
-                    }
-                }
-            },
-            "content-hub-101": {
-                "topics": {
-                    "dam": {
-                        "module": "Module 2: Asset Management",
-                        "artifact": "mindmap",
-                        "tip": "Explore different asset types and metadata",
-                        "resources": [
-                            "Upload and organize assets",
-                            "Configure metadata schemas",
-                            "Learn about renditions"
-                        ]
-                    },
-                    "cmp": {
-                        "module": "Module 3: Content Operations",
-                        "artifact": "slides",
-                        "tip": "Understand the content lifecycle",
-                        "resources": [
-                            "Create content items",
-                            "Set up taxonomies",
-                            "Learn about content types"
-                        ]
-                    },
-                    "workflows": {
-                        "module": "Module 5: Workflows & Approvals",
-                        "artifact": "workflow",
-                        "tip": "Practice creating approval workflows",
-                        "resources": [
-                            "Design workflow stages",
-                            "Configure notifications",
-                            "Test approval processes"
-                        ]
-                    },
-                    "integration": {
-                        "module": "Module 4: Integration Patterns",
-                        "artifact": "slides",
-                        "tip": "Review API documentation and examples",
-                        "resources": [
-                            "Study the REST API",
-                            "Implement webhooks",
-                            "Build a sample integration"
-                        ]
-                    }
-                }
-            }
+            course_id: CourseResources(course_id, entry["threshold"], entry["bounds"], entry["topics"])
+            for course_id, entry in merged.items()
         }
     
     def generate_recommendations(
         self,
         course_id: str,
         topic_scores: Dict[str, Dict],
-        threshold: float = 70.0
+        threshold: Optional[float] = None
     ) -> List[Dict[str, Any]]:
         """
         Generate recommendations based on quiz topic scores.
@@ -157,68 +172,45 @@ class RecommendationEngine:
         Args:
             course_id: Course identifier
             topic_scores: Dictionary mapping topics to score dictionaries
+                (percentage, or correct and total)
             threshold: Score percentage below which topics are recommended
+                (defaults to the course's threshold)
             
         Returns:
             List of recommendations sorted by priority
         """
-        recommendations = []
-        course_resources = self.course_resources.get(course_id, {})
-        topic_resources = course_resources.get("topics", {})
+        course = self.refresh().get(course_id, _NO_RESOURCES)
+        if threshold is None:
+            threshold = course.threshold
         
+        recommendations = []
         for topic, scores in topic_scores.items():
-            percentage = scores.get("percentage", 0)
-            if isinstance(percentage, (int, float)):
-                pass
-            else:
+            percentage = scores.get("percentage")
+            if not isinstance(percentage, (int, float)):
                 total = scores.get("total", 1)
                 correct = scores.get("correct", 0)
                 percentage = (correct / total * 100) if total > 0 else 0
             
             # Only recommend for topics below threshold
             if percentage < threshold:
-                resource = topic_resources.get(topic, self._default_resource(topic))
-                
-                # Determine priority based on score
-                if percentage < 40:
-                    priority = "high"
-                elif percentage < 60:
-                    priority = "medium"
-                else:
-                    priority = "low"
-                
+                module, artifact, tip, resources = course.resource(topic)
                 recommendations.append({
                     "topic": topic,
                     "score": percentage,
-                    "priority": priority,
-                    "module": resource.get("module", f"Review {topic} section"),
-                    "artifact": resource.get("artifact", "summary"),
-                    "tip": resource.get("tip", f"Focus on {topic} concepts"),
-                    "resources": resource.get("resources", [])
+                    "priority": course.priority(percentage),
+                    "module": module,
+                    "artifact": artifact,
+                    "tip": tip,
+                    "resources": list(resources)
                 })
         
-        # Sort by score (lowest first) and then by priority
-        priority_order = {"high": 0, "medium": 1, "low": 2}
+        # Sort by priority, then by score (lowest first)
         recommendations.sort(
-            key=lambda x: (priority_order.get(x["priority"], 3), x["score"])
+            key=lambda x: (PRIORITY_ORDER.get(x["priority"], 3), x["score"])
         )
         
         return recommendations
     
-    def _default_resource(self, topic: str) -> Dict[str, Any]:
-        """Generate default resource for unknown topics"""
-        topic_title = topic.replace("_", " ").title()
-        return {
-            "module": f"Review {topic_title} section",
-            "artifact": "summary",
-            "tip": f"Focus on {topic_title.lower()} concepts",
-            "resources": [
-                f"Review {topic_title.lower()} materials",
-                "Practice with examples",
-                "Take notes on key concepts"
-            ]
-        }
-    
     def get_next_steps(
         self,
         course_id: str,
@@ -298,32 +290,22 @@ class RecommendationEngine:
         Returns:
             List of suggested next courses with reasons
         """
-        all_courses = [
-            {"id": "xm-cloud-101", "title": "XM Cloud Fundamentals", "prereqs": []},
-            {"id": "search-fundamentals", "title": "Search Fundamentals", "prereqs": ["xm-cloud-101"]},
-            {"id": "content-hub-101", "title": "Content Hub Basics", "prereqs": []},
-        ]
+        graph = get_prerequisite_graph()
         
         suggestions = []
         
-        for course in all_courses:
-            if course["id"] in completed_courses:
-                continue
-            
-            # Check prerequisites
-            prereqs_met = all(p in completed_courses for p in course["prereqs"])
-            
-            if prereqs_met:
-                suggestions.append({
-                    "course_id": course["id"],
-                    "title": course["title"],
-                    "reason": "Prerequisites completed" if course["prereqs"] else "Great starting point",
-                    "recommended": True
-                })
+        for course in graph.next_unlocked(graph.mask(completed_courses)):
+            suggestions.append({
+                "course_id": course["course_id"],
+                "title": course["title"],
+                "reason": "Prerequisites completed" if course["prerequisites"] else "Great starting point",
+                "recommended": True
+            })
         
         return suggestions
 
 
-
-
-
+@lru_cache()
+def get_recommendation_engine() -> RecommendationEngine:
+    """Get the process-wide recommendation engine"""
+    return RecommendationEngine()
@@ -0,0 +1,168 @@
+"""
+Reranker - CPU-only second-stage scoring of retrieved knowledge base chunks
+"""
+import re
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+
+_TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+_STOPWORDS = {
+    "a", "an", "the", "is", "are", "was", "were", "be", "do", "does", "did",
+    "what", "how", "why", "when", "which", "who", "can", "i", "me", "my",
+    "you", "of", "in", "on", "to", "for", "and", "or", "it", "this", "that",
+    "with", "about", "from", "by", "as", "at"
+}
+
+_MODULE_MENTION_PATTERN = re.compile(r"\bmodule\s+(\d+)\b")
+
+
+def _tokenize(text: str) -> List[str]:
+    return _TOKEN_PATTERN.findall((text or "").lower())
+
+
+def _min_window(positions: List[List[int]]) -> int:
+    """Length of the smallest token span containing one position from every list"""
+    events = sorted((pos, term) for term, plist in enumerate(positions) for pos in plist)
+    needed = len(positions)
+    counts = [0] * needed
+    covered = 0
+    best = None
+    left = 0
+    for right_pos, term in events:
+        if counts[term] == 0:
+            covered += 1
+        counts[term] += 1
+        while covered == needed:
+            left_pos, left_term = events[left]
+            span = right_pos - left_pos + 1
+            if best is None or span < best:
+                best = span
+            counts[left_term] -= 1
+            if counts[left_term] == 0:
+                covered -= 1
+            left += 1
+    return best or 0
+
+
+class FeatureReranker:
+    """
+    Feature-based reranker for first-stage retrieval candidates.
+
+    Scores every candidate in one batched call using:
+    - Query term coverage
+    - Term proximity (smallest span containing the matched terms)
+    - Topic match against the chunk topic
+    - Module priors (configured weights, or an explicit "module N" in the query)
+    - The normalized first-stage score
+
+    A hard latency budget is enforced; when it is exceeded the first-stage
+    order is returned unchanged.
+    """
+
+    def __init__(
+        self,
+        candidates: int = 20,
+        timeout_ms: float = 50.0,
+        module_priors: Optional[Dict[int, float]] = None
+    ):
+        self.candidates = candidates
+        self.timeout_ms = timeout_ms
+        self.module_priors = module_priors or {}
+        self.weights = {
+            "coverage": 3.0,
+            "proximity": 2.0,
+            "topic": 1.5,
+            "module": 1.0,
+            "first_stage": 1.0
+        }
+
+    def rerank(
+        self,
+        query: str,
+        chunks: List[Dict],
+        top_k: int
+    ) -> Tuple[List[Dict], Dict[str, Any]]:
+        """
+        Rerank candidates against the query.
+
+        Args:
+            query: User question
+            chunks: First-stage candidates, best first (each with a "score")
+            top_k: Number of chunks to return
+
+        Returns:
+            Tuple of the top_k reranked chunks and latency statistics
+        """
+        start = time.perf_counter()
+        deadline = start + self.timeout_ms / 1000
+        candidates = chunks[:self.candidates]
+
+        stats = {
+            "candidates": len(candidates),
+            "timed_out": False,
+            "rerank_ms": 0.0
+        }
+        if len(candidates) < 2:
+            stats["rerank_ms"] = (time.perf_counter() - start) * 1000
+            return candidates[:top_k], stats
+
+        query_terms = list(dict.fromkeys(t for t in _tokenize(query) if t not in _STOPWORDS))
+        mentioned = _MODULE_MENTION_PATTERN.search((query or "").lower())
+        mentioned_module = int(mentioned.group(1)) if mentioned else None
+        max_first_stage = max((c.get("score", 0) or 0) for c in candidates) or 1.0
+
+        scored = []
+        for position, chunk in enumerate(candidates):
+            if time.perf_counter() > deadline:
+                stats["timed_out"] = True
+                stats["rerank_ms"] = (time.perf_counter() - start) * 1000
+                return candidates[:top_k], stats
+            features = self._features(chunk, query_terms, mentioned_module, max_first_stage)
+            score = sum(self.weights[name] * value for name, value in features.items())
+            # Ties keep first-stage order
+            scored.append((-score, position, chunk, score))
+
+        scored.sort(key=lambda item: (item[0], item[1]))
+        reranked = [{**chunk, "rerank_score": round(score, 4)} for _, _, chunk, score in scored[:top_k]]
+        stats["rerank_ms"] = (time.perf_counter() - start) * 1000
+        return reranked, stats
+
+    def _features(
+        self,
+        chunk: Dict,
+        query_terms: List[str],
+        mentioned_module: Optional[int],
+        max_first_stage: float
+    ) -> Dict[str, float]:
+        """Compute the normalized feature vector for one chunk"""
+        tokens = _tokenize(chunk.get("content", ""))
+        positions: Dict[str, List[int]] = {term: [] for term in query_terms}
+        for index, token in enumerate(tokens):
+            if token in positions:
+                positions[token].append(index)
+        matched = [plist for plist in positions.values() if plist]
+
+        coverage = len(matched) / len(query_terms) if query_terms else 0.0
+        if len(matched) >= 2:
+            proximity = len(matched) / _min_window(matched)
+        else:
+            proximity = float(bool(matched))
+
+        topic_tokens = set(_tokenize(chunk.get("topic", "")))
+        topic = 1.0 if topic_tokens and topic_tokens.intersection(query_terms) else 0.0
+
+        module = chunk.get("module")
+        if mentioned_module is not None:
+            module_score = 1.0 if module == mentioned_module else 0.0
+        else:
+            module_score = self.module_priors.get(module, 0.0) if isinstance(module, int) else 0.0
+
+        return {
+            "coverage": coverage,
+            "proximity": proximity,
+            "topic": topic,
+            "module": module_score,
+            "first_stage": (chunk.get("score", 0) or 0) / max_first_stage
+        }
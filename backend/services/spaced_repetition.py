@@ -0,0 +1,253 @@
+"""
+Spaced Repetition - SM-2 review scheduling for missed quiz questions
+"""
+import heapq
+import itertools
+import logging
+import threading
+import time
+from functools import lru_cache
+from pathlib import Path
+import sys
+from typing import Any, Dict, List, Optional, Tuple
+
+# Add backend to path for storage import
+backend_path = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_path))
+
+try:
+    from models.local_storage import (
+        append_review_cards_sync,
+        read_review_cards_log_sync,
+        compact_review_cards_sync
+    )
+except ImportError:
+    append_review_cards_sync = None
+    read_review_cards_log_sync = None
+    compact_review_cards_sync = None
+
+logger = logging.getLogger(__name__)
+
+DAY_SECONDS = 86400
+
+# SM-2 parameters
+INITIAL_EASINESS = 2.5
+MIN_EASINESS = 1.3
+PASSING_QUALITY = 3  # Review grades 0-5; below this the card is relearned
+
+# Compact the card log on load once it holds this many lines per live card
+COMPACT_RATIO = 2
+
+CardKey = Tuple[str, str]  # (course_id, question_id)
+
+
+def _new_card(user_id: str, course_id: str, question_id: str, now: float) -> Dict[str, Any]:
+    return {
+        "user_id": user_id,
+        "course_id": course_id,
+        "question_id": question_id,
+        "easiness": INITIAL_EASINESS,
+        "interval_days": 0,
+        "repetitions": 0,
+        "lapses": 0,
+        "due": now,
+        "last_reviewed": None
+    }
+
+
+def sm2(card: Dict[str, Any], quality: int, now: float):
+    """
+    Apply one SM-2 review to a card in place.
+
+    Args:
+        card: Card state (easiness, interval_days, repetitions, lapses, due)
+        quality: Recall grade 0 (blackout) to 5 (perfect)
+        now: Review time (epoch seconds)
+    """
+    if quality < PASSING_QUALITY:
+        card["repetitions"] = 0
+        card["interval_days"] = 1
+        card["lapses"] += 1
+    else:
+        card["repetitions"] += 1
+        if card["repetitions"] == 1:
+            card["interval_days"] = 1
+        elif card["repetitions"] == 2:
+            card["interval_days"] = 6
+        else:
+            card["interval_days"] = round(card["interval_days"] * card["easiness"])
+    card["easiness"] = max(
+        MIN_EASINESS,
+        card["easiness"] + 0.1 - (5 - quality) * (0.08 + (5 - quality) * 0.02)
+    )
+    card["due"] = now + card["interval_days"] * DAY_SECONDS
+    card["last_reviewed"] = now
+
+
+class ReviewScheduler:
+    """
+    Review cards for quiz questions a learner got wrong.
+
+    Features:
+    - One card per (user, course, question), created or reset on a wrong answer
+    - SM-2 intervals and easiness from 0-5 review grades
+    - Per-user min-heap on due time: the next due card is a peek, and taking
+      k due cards is O(k log n). Rescheduling pushes a new heap entry and the
+      outdated one is skipped when it surfaces (lazy deletion)
+    - Card states persist to an append-only log, compacted on load. Every
+      worker folds lines appended by any worker before each read or
+      update, so cards created or reviewed on one worker are seen by all
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._cards: Dict[str, Dict[CardKey, Dict[str, Any]]] = {}
+        self._heaps: Dict[str, List[Tuple[float, int, CardKey]]] = {}
+        self._latest: Dict[str, Dict[CardKey, int]] = {}  # Sequence of each card's live heap entry
+        self._sequence = itertools.count()
+        self._offset = 0
+        self._inode: Optional[int] = None
+        self._lines = 0  # Log lines folded since the log was last replaced
+        with self._lock:
+            self._refresh()
+            card_count = sum(len(cards) for cards in self._cards.values())
+            if compact_review_cards_sync and self._lines > COMPACT_RATIO * max(card_count, 1):
+                compact_review_cards_sync()
+
+    def _refresh(self):
+        """Fold card states appended by any worker since the last read (caller holds the lock)"""
+        if not read_review_cards_log_sync:
+            return
+        cards, self._offset, inode = read_review_cards_log_sync(self._offset, self._inode)
+        if inode != self._inode:
+            # Log was replaced (compacted); rebuild from the new file
+            self._cards, self._heaps, self._latest = {}, {}, {}
+            self._inode, self._lines = inode, 0
+        self._lines += len(cards)
+        for card in cards:
+            try:
+                self._schedule(card)
+            except KeyError:
+                logger.warning("Skipping corrupt review card")
+
+    def _schedule(self, card: Dict[str, Any]):
+        """Store a card and push its due time (caller holds the lock)"""
+        user_id = card["user_id"]
+        key = (card["course_id"], card["question_id"])
+        sequence = next(self._sequence)
+        self._cards.setdefault(user_id, {})[key] = card
+        self._latest.setdefault(user_id, {})[key] = sequence
+        heapq.heappush(self._heaps.setdefault(user_id, []), (card["due"], sequence, key))
+
+    def _is_current(self, user_id: str, entry: Tuple[float, int, CardKey]) -> bool:
+        return self._latest[user_id].get(entry[2]) == entry[1]
+
+    def _persist(self, cards: List[Dict[str, Any]]):
+        """Append changed cards, then fold them (and anything else new) from the log (caller holds the lock)"""
+        if append_review_cards_sync and read_review_cards_log_sync:
+            append_review_cards_sync(cards)
+            self._refresh()
+            return
+        for card in cards:
+            self._schedule(card)
+
+    def add_missed(self, user_id: str, course_id: str, question_ids: List[str], now: Optional[float] = None) -> int:
+        """
+        Create cards for missed questions, or send existing cards back to relearning.
+
+        Args:
+            user_id: Learner identifier
+            course_id: Course identifier
+            question_ids: Questions answered incorrectly
+
+        Returns:
+            Number of cards created or reset
+        """
+        now = time.time() if now is None else now
+        changed = []
+        with self._lock:
+            self._refresh()
+            cards = self._cards.get(user_id, {})
+            for question_id in question_ids:
+                card = cards.get((course_id, question_id))
+                if card is None:
+                    card = _new_card(user_id, course_id, question_id, now)
+                else:
+                    card = dict(card, repetitions=0, interval_days=0, lapses=card["lapses"] + 1, due=now)
+                changed.append(card)
+            self._persist(changed)
+        return len(changed)
+
+    def due(self, user_id: str, limit: int = 20, now: Optional[float] = None) -> List[Dict[str, Any]]:
+        """
+        Cards due for review, earliest first.
+
+        Args:
+            user_id: Learner identifier
+            limit: Maximum cards to return
+            now: Reference time (epoch seconds)
+
+        Returns:
+            Up to `limit` card states with due <= now
+        """
+        now = time.time() if now is None else now
+        with self._lock:
+            self._refresh()
+            heap = self._heaps.get(user_id)
+            if not heap:
+                return []
+            taken = []
+            while heap and len(taken) < limit and heap[0][0] <= now:
+                entry = heapq.heappop(heap)
+                if self._is_current(user_id, entry):
+                    taken.append(entry)
+            for entry in taken:
+                heapq.heappush(heap, entry)
+            return [dict(self._cards[user_id][entry[2]]) for entry in taken]
+
+    def next_due(self, user_id: str) -> Optional[float]:
+        """Due time of the user's earliest card (None if they have no cards)"""
+        with self._lock:
+            self._refresh()
+            heap = self._heaps.get(user_id)
+            while heap and not self._is_current(user_id, heap[0]):
+                heapq.heappop(heap)
+            return heap[0][0] if heap else None
+
+    def review(
+        self,
+        user_id: str,
+        course_id: str,
+        question_id: str,
+        quality: int,
+        now: Optional[float] = None
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Record a review and reschedule the card.
+
+        Args:
+            user_id: Learner identifier
+            course_id: Course identifier
+            question_id: Question the card is for
+            quality: Recall grade 0-5
+            now: Review time (epoch seconds)
+
+        Returns:
+            The updated card, or None if the user has no such card
+        """
+        now = time.time() if now is None else now
+        with self._lock:
+            self._refresh()
+            card = self._cards.get(user_id, {}).get((course_id, question_id))
+            if card is None:
+                return None
+            card = dict(card)
+            sm2(card, quality, now)
+            self._persist([card])
+            return dict(card)
+
+
+@lru_cache()
+def get_review_scheduler() -> ReviewScheduler:
+    """Get the process-wide review scheduler"""
+    return ReviewScheduler()
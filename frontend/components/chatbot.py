@@ -216,8 +216,16 @@ def render_chatbot(course_id: str):
         
         # Get AI response
         api = APIClient()
+        chat_sessions = st.session_state.setdefault("chat_sessions", {})
         try:
-            response = api.chat(course_id=course_id, message=prompt)
+            response = api.chat(
+                course_id=course_id,
+                message=prompt,
+                session_id=chat_sessions.get(course_id),
+                user_id=st.session_state.get("user_id")
+            )
+            if response.get("session_id"):
+                chat_sessions[course_id] = response["session_id"]
             assistant_content = response.get("message", "I couldn't process that request.")
         except Exception:
             # Use mock response for demo
@@ -235,6 +243,12 @@ def render_chatbot(course_id: str):
     # Clear chat button
     st.markdown("---")
     if st.button("🗑️ Clear Chat History", key=f"clear_chat_{course_id}"):
+        session_id = st.session_state.get("chat_sessions", {}).pop(course_id, None)
+        if session_id:
+            try:
+                APIClient().clear_chat_session(session_id, st.session_state.get("user_id"))
+            except Exception:
+                pass
         st.session_state.chat_messages[course_id] = [
             st.session_state.chat_messages[course_id][0]  # Keep initial greeting
         ]
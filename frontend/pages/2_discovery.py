@@ -73,8 +73,11 @@ Feel free to share as much or as little as you'd like!"""
             try:
                 response = api.discover_courses(
                     message=prompt,
-                    history=st.session_state.discovery_messages[:-1]
+                    session_id=st.session_state.get("discovery_session_id"),
+                    user_id=st.session_state.get("user_id")
                 )
+                if response.get("session_id"):
+                    st.session_state.discovery_session_id = response["session_id"]
                 
                 assistant_message = {
                     "role": "assistant",
@@ -205,6 +208,12 @@ def render_sidebar():
         st.markdown("---")
         
         if st.button("🔄 Start Over"):
+            session_id = st.session_state.pop("discovery_session_id", None)
+            if session_id:
+                try:
+                    APIClient().reset_discovery(session_id, st.session_state.get("user_id"))
+                except Exception:
+                    pass
             st.session_state.discovery_messages = []
             st.session_state.discovery_complete = False
             st.session_state.recommended_courses = []
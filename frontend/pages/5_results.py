@@ -55,6 +55,43 @@ def render_score_overview(results: dict, course_name: str):
     
     st.progress(percentage / 100)
 
+def render_ranking(course_id: str):
+    """Render percentile rank and course leaderboard"""
+    user_id = st.session_state.get("user_id")
+    api = APIClient()
+    
+    # Fetched independently: a learner without a ranked result still sees the leaderboard
+    try:
+        percentile = api.get_percentile(user_id, course_id) if user_id else None
+    except Exception:
+        percentile = None
+    try:
+        leaderboard = api.get_leaderboard(course_id, limit=5)
+    except Exception:
+        leaderboard = None
+    
+    if not percentile and not leaderboard:
+        return
+    
+    st.markdown("### 🏆 How You Compare")
+    
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        if percentile:
+            st.metric("Percentile", f"{percentile['percentile']:.0f}th")
+            st.caption(
+                f"Your best score of {percentile['percentage']:.0f}% ranks above "
+                f"{percentile['percentile']:.0f}% of {percentile['participants']} learners"
+            )
+    
+    with col2:
+        if leaderboard:
+            st.markdown("**Leaderboard**")
+        for entry in (leaderboard or {}).get("entries", []):
+            marker = " ⭐" if entry["user_id"] == user_id else ""
+            st.markdown(f"{entry['rank']}. {entry['user_id']} - {entry['percentage']:.0f}%{marker}")
+
 def render_topic_breakdown(results: dict):
     """Render topic-by-topic breakdown"""
     st.markdown("### 📈 Topic Performance")
@@ -303,6 +340,10 @@ def main():
     
     st.markdown("---")
     
+    render_ranking(selected_course)
+    
+    st.markdown("---")
+    
     render_topic_breakdown(results)
     
     st.markdown("---")
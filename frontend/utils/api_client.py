@@ -2,8 +2,9 @@
 API Client - FastAPI Backend Communication
 """
 import os
+import json
 import requests
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Iterator, Tuple
 
 
 class APIClient:
@@ -42,25 +43,51 @@ class APIClient:
     
     # ===== Discovery Endpoints =====
     
-    def discover_courses(self, message: str, history: List[Dict] = None) -> Dict[str, Any]:
+    def discover_courses(
+        self,
+        message: str,
+        session_id: Optional[str] = None,
+        user_id: Optional[str] = None
+    ) -> Dict[str, Any]:
         """Send message to discovery agent
         
+        Conversation history is kept server-side; pass the session_id returned
+        by the previous call to continue the same conversation.
+        
         Args:
             message: User message
-            history: Conversation history
+            session_id: Discovery session identifier (None starts a new session)
+            user_id: User identifier
             
         Returns:
-            Agent response with message and optional recommendations
+            Agent response with message, optional recommendations and session_id
         """
         return self._request(
             "POST",
             "/api/discover",
             json={
                 "message": message,
-                "history": history or []
+                "session_id": session_id,
+                "user_id": user_id
             }
         )
     
+    def reset_discovery(self, session_id: Optional[str] = None, user_id: Optional[str] = None) -> Dict[str, Any]:
+        """Reset a discovery conversation and drop its server-side memory
+        
+        Args:
+            session_id: Discovery session identifier
+            user_id: Owner of the session (None for anonymous sessions)
+            
+        Returns:
+            Reset confirmation
+        """
+        return self._request(
+            "POST",
+            "/api/discover/reset",
+            params={"session_id": session_id, "user_id": user_id}
+        )
+    
     # ===== Course Endpoints =====
     
     def get_courses(self) -> List[Dict[str, Any]]:
@@ -71,6 +98,45 @@ class APIClient:
         """
         return self._request("GET", "/api/courses")
     
+    def search_courses(
+        self,
+        query: Optional[str] = None,
+        difficulty: Optional[List[str]] = None,
+        role: Optional[List[str]] = None,
+        topic: Optional[List[str]] = None,
+        duration: Optional[List[str]] = None,
+        limit: int = 20,
+        offset: int = 0
+    ) -> Dict[str, Any]:
+        """Search the course catalog with facet filters
+        
+        Args:
+            query: Free-text query
+            difficulty: Difficulty levels to include
+            role: Roles to include
+            topic: Topics to include
+            duration: Duration buckets to include (short, medium, long)
+            limit: Page size
+            offset: Page offset
+            
+        Returns:
+            Matching courses with total and facet counts
+        """
+        params = {
+            "q": query,
+            "difficulty": difficulty,
+            "role": role,
+            "topic": topic,
+            "duration": duration,
+            "limit": limit,
+            "offset": offset
+        }
+        return self._request(
+            "GET",
+            "/api/courses/search",
+            params={key: value for key, value in params.items() if value is not None}
+        )
+    
     def get_course(self, course_id: str) -> Dict[str, Any]:
         """Get a specific course by ID
         
@@ -84,16 +150,26 @@ class APIClient:
     
     # ===== Chat Endpoints =====
     
-    def chat(self, course_id: str, message: str, history: List[Dict] = None) -> Dict[str, Any]:
+    def chat(
+        self,
+        course_id: str,
+        message: str,
+        session_id: Optional[str] = None,
+        user_id: Optional[str] = None
+    ) -> Dict[str, Any]:
         """Send message to course-specific RAG chatbot
         
+        Conversation history is kept server-side; pass the session_id returned
+        by the previous call to continue the same conversation.
+        
         Args:
             course_id: Course identifier for knowledge base filtering
             message: User message
-            history: Conversation history
+            session_id: Chat session identifier (None starts a new session)
+            user_id: User identifier
             
         Returns:
-            Chatbot response with message and sources
+            Chatbot response with message, sources and session_id
         """
         return self._request(
             "POST",
@@ -101,10 +177,61 @@ class APIClient:
             json={
                 "course_id": course_id,
                 "message": message,
-                "history": history or []
+                "session_id": session_id,
+                "user_id": user_id
             }
         )
     
+    def chat_stream(
+        self,
+        course_id: str,
+        message: str,
+        session_id: Optional[str] = None,
+        user_id: Optional[str] = None
+    ) -> Iterator[Tuple[str, Any]]:
+        """Stream a chatbot response as Server-Sent Events
+        
+        Args:
+            course_id: Course identifier for knowledge base filtering
+            message: User message
+            session_id: Chat session identifier (None starts a new session)
+            user_id: User identifier
+            
+        Yields:
+            (event, data) tuples - "sources", then "token" events, then "done"
+        """
+        url = f"{self.base_url}/api/chat/stream"
+        payload = {
+            "course_id": course_id,
+            "message": message,
+            "session_id": session_id,
+            "user_id": user_id
+        }
+        
+        with requests.post(url, json=payload, stream=True, timeout=self.timeout) as response:
+            response.raise_for_status()
+            event = "message"
+            for line in response.iter_lines(decode_unicode=True):
+                if not line:
+                    continue
+                if line.startswith("event:"):
+                    event = line[len("event:"):].strip()
+                elif line.startswith("data:"):
+                    yield event, json.loads(line[len("data:"):].strip())
+                    event = "message"
+    
+    def clear_chat_session(self, session_id: str, user_id: Optional[str] = None) -> Dict[str, Any]:
+        """Delete the server-side memory for a chat session
+        
+        Args:
+            session_id: Chat session identifier
+            user_id: Owner of the session (None for anonymous sessions)
+            
+        Returns:
+            Deletion confirmation
+        """
+        return self._request("DELETE", f"/api/chat/session/{session_id}", params={"user_id": user_id})
+    
     # ===== Notes Endpoints =====
     
     def get_notes(self, user_id: str, course_id: str) -> Dict[str, Any]:
@@ -217,6 +344,39 @@ class APIClient:
             }
         )
     
+    def start_adaptive_quiz(self, user_id: str, course_id: str) -> Dict[str, Any]:
+        """Start an adaptive quiz
+    
+        Args:
+            user_id: User identifier
+            course_id: Course identifier
+    
+        Returns:
+            Session id, first question and the initial ability estimate
+        """
+        return self._request(
+            "POST",
+            "/api/quiz/adaptive/start",
+            json={"user_id": user_id, "course_id": course_id}
+        )
+    
+    def answer_adaptive_quiz(self, session_id: str, question_id: str, answer: int) -> Dict[str, Any]:
+        """Answer the current adaptive quiz question
+    
+        Args:
+            session_id: Adaptive quiz session identifier
+            question_id: Question being answered
+            answer: Selected answer index
+    
+        Returns:
+            Next question (or the final result once done) and the updated ability estimate
+        """
+        return self._request(
+            "POST",
+            "/api/quiz/adaptive/answer",
+            json={"session_id": session_id, "question_id": question_id, "answer": answer}
+        )
+    
     # ===== Results Endpoints =====
     
     def get_results(self, user_id: str, course_id: str) -> Dict[str, Any]:
@@ -231,6 +391,30 @@ class APIClient:
         """
         return self._request("GET", f"/api/results/{user_id}/{course_id}")
     
+    def get_percentile(self, user_id: str, course_id: str) -> Dict[str, Any]:
+        """Get a user's percentile rank among all learners of a course
+    
+        Args:
+            user_id: User identifier
+            course_id: Course identifier
+    
+        Returns:
+            Best percentage, percentile and participant count
+        """
+        return self._request("GET", f"/api/leaderboard/{course_id}/percentile/{user_id}")
+    
+    def get_leaderboard(self, course_id: str, limit: int = 10) -> Dict[str, Any]:
+        """Get the top learners for a course
+    
+        Args:
+            course_id: Course identifier
+            limit: Number of entries
+    
+        Returns:
+            Participant count and ranked entries
+        """
+        return self._request("GET", f"/api/leaderboard/{course_id}", params={"limit": limit})
+    
     # ===== User Endpoints =====
     
     def get_user_progress(self, user_id: str) -> Dict[str, Any]:
@@ -0,0 +1,131 @@
+"""
+Course Matching Benchmark
+Compares the original linear-scan course matcher against the inverted-index
+CourseMatchIndex on a synthetic catalog, and checks that both return the same
+recommendations.
+
+Usage:
+    python scripts/benchmark_course_matching.py --courses 10000 --queries 500
+"""
+import argparse
+import json
+import random
+import statistics
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import sys
+sys.path.append(str(Path(__file__).parent.parent / "backend"))
+
+from services.course_index import CourseMatchIndex
+
+ROLES = ["developer", "marketer", "architect", "admin", "content author", "analyst", "designer"]
+INTERESTS = ["headless", "search", "content", "development", "workflow"]
+
+
+def generate_catalog(size: int, vocabulary_size: int, seed: int) -> List[Dict]:
+    """Generate a synthetic catalog with realistic role/keyword distributions"""
+    rng = random.Random(seed)
+    vocabulary = INTERESTS + [f"topic{i}" for i in range(vocabulary_size)]
+    return [
+        {
+            "course_id": f"course-{i:05d}",
+            "title": f"Synthetic Course {i}",
+            "roles": rng.sample(ROLES, rng.randint(1, 3)),
+            "keywords": rng.sample(vocabulary, rng.randint(3, 8))
+        }
+        for i in range(size)
+    ]
+
+
+def legacy_match(courses: List[Dict], role: Optional[str], interests: List[str]) -> List[Dict]:
+    """The original DiscoveryAgent._match_courses linear scan"""
+    scored_courses = []
+    for course in courses:
+        score = 0
+        reason_parts = []
+        if role and role in course["roles"]:
+            score += 3
+            reason_parts.append(f"great for {role}s")
+        for interest in interests:
+            if interest in course["keywords"]:
+                score += 2
+                reason_parts.append(f"covers {interest}")
+        for keyword in course["keywords"]:
+            if keyword in " ".join(interests).lower():
+                score += 1
+        if score > 0:
+            reason = ", ".join(reason_parts[:2]) if reason_parts else "recommended based on your profile"
+            scored_courses.append({
+                "course_id": course["course_id"],
+                "title": course["title"],
+                "score": score,
+                "reason": reason.capitalize()
+            })
+    scored_courses.sort(key=lambda x: x["score"], reverse=True)
+    return scored_courses[:3]
+
+
+def time_queries(match, queries: List[Dict]) -> List[float]:
+    """Per-query latencies in milliseconds"""
+    latencies = []
+    for query in queries:
+        start = time.perf_counter()
+        match(query["role"], query["interests"])
+        latencies.append((time.perf_counter() - start) * 1000)
+    return latencies
+
+
+def summarize(latencies: List[float]) -> Dict[str, float]:
+    ordered = sorted(latencies)
+    return {
+        "mean_ms": round(statistics.mean(ordered), 4),
+        "p50_ms": round(ordered[len(ordered) // 2], 4),
+        "p99_ms": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))], 4)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark discovery course matching")
+    parser.add_argument("--courses", type=int, default=10000)
+    parser.add_argument("--vocabulary", type=int, default=2000, help="Synthetic keyword vocabulary size")
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    courses = generate_catalog(args.courses, args.vocabulary, args.seed)
+    rng = random.Random(args.seed + 1)
+    queries = [
+        {
+            "role": rng.choice(ROLES + [None]),
+            "interests": rng.sample(INTERESTS, rng.randint(0, 3))
+        }
+        for _ in range(args.queries)
+    ]
+
+    start = time.perf_counter()
+    index = CourseMatchIndex(courses)
+    build_ms = (time.perf_counter() - start) * 1000
+
+    mismatches = sum(
+        1 for q in queries
+        if legacy_match(courses, q["role"], q["interests"]) != index.top(q["role"], q["interests"])
+    )
+
+    legacy = summarize(time_queries(lambda r, i: legacy_match(courses, r, i), queries))
+    indexed = summarize(time_queries(index.top, queries))
+
+    print(json.dumps({
+        "courses": args.courses,
+        "queries": args.queries,
+        "index_build_ms": round(build_ms, 2),
+        "legacy": legacy,
+        "indexed": indexed,
+        "speedup_mean": round(legacy["mean_ms"] / indexed["mean_ms"], 1) if indexed["mean_ms"] else None,
+        "result_mismatches": mismatches
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,224 @@
+"""
+Discovery Replay Benchmark
+Replays labeled discovery conversations through DiscoveryAgent.process_message
+and/or the /api/discover route, and reports per-turn latency percentiles,
+throughput at a given concurrency, and agreement of the recommendations with
+the expected courses.
+
+Usage:
+    python scripts/benchmark_discovery_replay.py --mode both --concurrency 8
+    python scripts/benchmark_discovery_replay.py --synthetic 200 --no-mock
+    python scripts/benchmark_discovery_replay.py --mode route --base-url http://localhost:8000
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import sys
+sys.path.append(str(Path(__file__).parent.parent / "backend"))
+
+from config import settings
+from services.discovery_agent import DiscoveryAgent
+from models.local_storage import load_courses_sync
+
+DEFAULT_CORPUS = Path(__file__).parent.parent / "data" / "discovery" / "replay_corpus.json"
+
+
+def load_corpus(path: Path) -> List[Dict]:
+    """Load labeled conversations ({"conversations": [{id, turns, expected_courses}]})"""
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f).get("conversations", [])
+
+
+def generate_conversations(count: int, seed: int) -> List[Dict]:
+    """Synthetic two-turn conversations labeled with the course they were built from"""
+    rng = random.Random(seed)
+    courses = [c for c in load_courses_sync() if c.get("roles") and c.get("keywords")]
+    conversations = []
+    for i in range(count):
+        course = rng.choice(courses)
+        keywords = rng.sample(course["keywords"], min(2, len(course["keywords"])))
+        conversations.append({
+            "id": f"synthetic-{i:04d}",
+            "turns": [
+                f"I work as a {rng.choice(course['roles'])}",
+                f"I'd like to get better at {' and '.join(keywords)}"
+            ],
+            "expected_courses": [course["course_id"]]
+        })
+    return conversations
+
+
+def percentiles(latencies: List[float]) -> Dict[str, float]:
+    """Latency summary in milliseconds"""
+    if not latencies:
+        return {}
+    ordered = sorted(latencies)
+
+    def pick(q: float) -> float:
+        return round(ordered[min(len(ordered) - 1, int(len(ordered) * q))], 3)
+
+    return {
+        "count": len(ordered),
+        "mean_ms": round(sum(ordered) / len(ordered), 3),
+        "p50_ms": pick(0.50),
+        "p90_ms": pick(0.90),
+        "p99_ms": pick(0.99),
+        "max_ms": round(ordered[-1], 3)
+    }
+
+
+def agreement(results: List[Dict]) -> Dict[str, float]:
+    """
+    Compare each conversation's final recommendations with its labels.
+
+    - hit_rate: at least one expected course was recommended
+    - top1_accuracy: the first recommendation is an expected course
+    - precision / recall: over recommended vs expected course ids
+    """
+    labeled = [r for r in results if r["expected_courses"]]
+    if not labeled:
+        return {}
+
+    hits = top1 = 0
+    precision = recall = 0.0
+    for result in labeled:
+        expected = set(result["expected_courses"])
+        recommended = result["recommended_courses"]
+        overlap = expected.intersection(recommended)
+        hits += bool(overlap)
+        top1 += bool(recommended) and recommended[0] in expected
+        precision += len(overlap) / len(recommended) if recommended else 0.0
+        recall += len(overlap) / len(expected)
+
+    n = len(labeled)
+    return {
+        "conversations": n,
+        "recommended": sum(1 for r in labeled if r["recommended_courses"]),
+        "hit_rate": round(hits / n, 4),
+        "top1_accuracy": round(top1 / n, 4),
+        "precision": round(precision / n, 4),
+        "recall": round(recall / n, 4)
+    }
+
+
+async def replay_agent(agent: DiscoveryAgent, conversation: Dict, latencies: List[float]) -> Dict:
+    """Replay one conversation directly through the agent with a fresh profile"""
+    profile = DiscoveryAgent.new_profile()
+    recommended: List[str] = []
+    for message in conversation["turns"]:
+        start = time.perf_counter()
+        response = await agent.process_message(message, profile=profile)
+        latencies.append((time.perf_counter() - start) * 1000)
+        if response.get("recommended_courses"):
+            recommended = [c["course_id"] for c in response["recommended_courses"]]
+    return {**conversation, "recommended_courses": recommended}
+
+
+async def replay_route(client, conversation: Dict, latencies: List[float]) -> Dict:
+    """Replay one conversation through /api/discover using a server-side session"""
+    session_id: Optional[str] = None
+    recommended: List[str] = []
+    for message in conversation["turns"]:
+        start = time.perf_counter()
+        response = await client.post("/api/discover", json={"message": message, "session_id": session_id})
+        latencies.append((time.perf_counter() - start) * 1000)
+        body = response.json()
+        session_id = body.get("session_id") or session_id
+        if body.get("recommended_courses"):
+            recommended = [c["course_id"] for c in body["recommended_courses"]]
+    if session_id:
+        # Don't leave benchmark sessions in conversation storage
+        await client.post("/api/discover/reset", params={"session_id": session_id})
+    return {**conversation, "recommended_courses": recommended}
+
+
+async def run_replay(replay, conversations: List[Dict], concurrency: int) -> Dict:
+    """Replay all conversations with at most `concurrency` in flight (turns stay in order)"""
+    latencies: List[float] = []
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def bounded(conversation: Dict) -> Dict:
+        async with semaphore:
+            return await replay(conversation, latencies)
+
+    start = time.perf_counter()
+    results = await asyncio.gather(*(bounded(c) for c in conversations))
+    elapsed = time.perf_counter() - start
+
+    return {
+        "concurrency": concurrency,
+        "turns": len(latencies),
+        "elapsed_s": round(elapsed, 4),
+        "throughput_turns_per_s": round(len(latencies) / elapsed, 2) if elapsed else None,
+        "latency": percentiles(latencies),
+        "agreement": agreement(results),
+        "misses": [
+            {"id": r["id"], "expected": r["expected_courses"], "recommended": r["recommended_courses"]}
+            for r in results
+            if r["expected_courses"] and not set(r["expected_courses"]).intersection(r["recommended_courses"])
+        ]
+    }
+
+
+async def benchmark(args, conversations: List[Dict]) -> Dict:
+    report = {
+        "corpus": str(args.corpus) if not args.synthetic else f"synthetic:{args.synthetic}",
+        "conversations": len(conversations),
+        "mock_mode": settings.MOCK_MODE,
+        "repeat": args.repeat
+    }
+    replayed = conversations * args.repeat
+
+    if args.mode in ("agent", "both"):
+        agent = DiscoveryAgent()
+        report["agent"] = await run_replay(
+            lambda c, lat: replay_agent(agent, c, lat), replayed, args.concurrency
+        )
+
+    if args.mode in ("route", "both"):
+        import httpx
+        if args.base_url:
+            client = httpx.AsyncClient(base_url=args.base_url, timeout=30)
+        else:
+            from main import app
+            client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://replay")
+        async with client:
+            report["route"] = await run_replay(
+                lambda c, lat: replay_route(client, c, lat), replayed, args.concurrency
+            )
+
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay discovery conversations and measure speed and quality")
+    parser.add_argument("--corpus", type=Path, default=DEFAULT_CORPUS, help="Labeled conversation corpus (JSON)")
+    parser.add_argument("--synthetic", type=int, default=0, help="Generate N synthetic conversations instead")
+    parser.add_argument("--mode", choices=["agent", "route", "both"], default="both")
+    parser.add_argument("--concurrency", type=int, default=1, help="Conversations in flight at once")
+    parser.add_argument("--repeat", type=int, default=1, help="Replay the corpus this many times")
+    parser.add_argument("--base-url", help="Benchmark a running server instead of the in-process app")
+    parser.add_argument("--no-mock", action="store_true", help="Disable MOCK_MODE to exercise multi-turn profiles")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", type=Path, help="Also write the JSON report to this file")
+    args = parser.parse_args()
+
+    if args.no_mock:
+        settings.MOCK_MODE = False
+
+    conversations = generate_conversations(args.synthetic, args.seed) if args.synthetic else load_corpus(args.corpus)
+    report = asyncio.run(benchmark(args, conversations))
+
+    output = json.dumps(report, indent=2)
+    print(output)
+    if args.output:
+        args.output.write_text(output + "\n", encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
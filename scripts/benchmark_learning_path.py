@@ -0,0 +1,117 @@
+"""
+Learning Path Benchmark
+Builds the prerequisite graph for a synthetic catalog, times path-to-target
+and next-unlocked queries, and checks both against a plain graph walk.
+
+Usage:
+    python scripts/benchmark_learning_path.py --courses 5000
+    python scripts/benchmark_learning_path.py --courses 20000 --max-prereqs 4
+"""
+import argparse
+import json
+import random
+import time
+from pathlib import Path
+from typing import Dict, List, Set
+
+import sys
+sys.path.append(str(Path(__file__).parent.parent / "backend"))
+
+from services.learning_path import PrerequisiteGraph
+
+
+def synthetic_catalog(count: int, max_prereqs: int, seed: int) -> List[Dict]:
+    """Courses that each require up to max_prereqs earlier courses, listed in shuffled order"""
+    rng = random.Random(seed)
+    courses = []
+    for i in range(count):
+        earlier = range(max(0, i - 200), i)
+        prereqs = rng.sample(earlier, min(len(earlier), rng.randint(0, max_prereqs)))
+        courses.append({
+            "course_id": f"course-{i:05d}",
+            "title": f"Course {i}",
+            "prerequisites": [f"course-{p:05d}" for p in prereqs]
+        })
+    rng.shuffle(courses)
+    return courses
+
+
+def walk_ancestors(prereqs: Dict[str, List[str]], target: str) -> Set[str]:
+    """All transitive prerequisites by depth-first search"""
+    seen: Set[str] = set()
+    stack = list(prereqs[target])
+    while stack:
+        course_id = stack.pop()
+        if course_id not in seen:
+            seen.add(course_id)
+            stack.extend(prereqs[course_id])
+    return seen
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the prerequisite graph planner")
+    parser.add_argument("--courses", type=int, default=5000)
+    parser.add_argument("--max-prereqs", type=int, default=3)
+    parser.add_argument("--queries", type=int, default=2000)
+    parser.add_argument("--completed", type=int, default=20, help="Completed courses per next-unlocked query")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    catalog = synthetic_catalog(args.courses, args.max_prereqs, args.seed)
+    prereqs = {c["course_id"]: c["prerequisites"] for c in catalog}
+
+    start = time.perf_counter()
+    graph = PrerequisiteGraph(catalog)
+    build_s = time.perf_counter() - start
+
+    rng = random.Random(args.seed + 1)
+    targets = [rng.choice(catalog)["course_id"] for _ in range(args.queries)]
+    completed_sets = [
+        [rng.choice(catalog)["course_id"] for _ in range(args.completed)]
+        for _ in range(args.queries)
+    ]
+
+    start = time.perf_counter()
+    paths = [graph.path_to(target) for target in targets]
+    path_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    unlocked = [graph.next_unlocked(graph.mask(completed)) for completed in completed_sets]
+    next_s = time.perf_counter() - start
+
+    mismatches = 0
+    for target, path in zip(targets[:200], paths):
+        steps = [step["course_id"] for step in path]
+        position = {course_id: i for i, course_id in enumerate(steps)}
+        ordered = all(position[p] < position[c] for c in steps for p in prereqs[c])
+        if set(steps) != walk_ancestors(prereqs, target) | {target} or not ordered:
+            mismatches += 1
+    for completed, courses in zip(completed_sets[:200], unlocked):
+        done = set(completed)
+        expected = {
+            course_id for course_id, required in prereqs.items()
+            if course_id not in done and all(p in done for p in required)
+        }
+        if {c["course_id"] for c in courses} != expected:
+            mismatches += 1
+
+    print(json.dumps({
+        "courses": len(graph),
+        "edges": sum(len(p) for p in prereqs.values()),
+        "build_ms": round(build_s * 1000, 2),
+        "path_to": {
+            "queries": len(targets),
+            "mean_steps": round(sum(len(p) for p in paths) / len(paths), 1),
+            "per_query_us": round(path_s / len(targets) * 1e6, 2)
+        },
+        "next_unlocked": {
+            "queries": len(completed_sets),
+            "mean_courses": round(sum(len(u) for u in unlocked) / len(unlocked), 1),
+            "per_query_us": round(next_s / len(completed_sets) * 1e6, 2)
+        },
+        "mismatches": mismatches
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+"""
+Quiz Scoring Benchmark
+Scores synthetic submissions with the original per-question dict loop and with
+the vectorized scoring engine (one at a time and as a batch), and checks that
+all three agree.
+
+Usage:
+    python scripts/benchmark_quiz_scoring.py --submissions 100000
+    python scripts/benchmark_quiz_scoring.py --course xm-cloud-101
+"""
+import argparse
+import json
+import random
+import time
+from pathlib import Path
+from typing import Dict, List
+
+import sys
+sys.path.append(str(Path(__file__).parent.parent / "backend"))
+
+from services.quiz_service import CompiledQuiz, get_quiz_service
+from services.quiz_scoring import np, score_submission, score_submissions
+
+
+def synthetic_quiz(questions: int, topics: int, seed: int) -> CompiledQuiz:
+    """A quiz with random answer keys spread over a few topics"""
+    rng = random.Random(seed)
+    return CompiledQuiz("synthetic", {
+        "title": "Synthetic Quiz",
+        "passing_score": 70,
+        "questions": [
+            {
+                "id": f"q{i}",
+                "question": f"Question {i}",
+                "options": ["a", "b", "c", "d"],
+                "correct": rng.randrange(4),
+                "topic": f"topic{rng.randrange(topics)}"
+            }
+            for i in range(questions)
+        ]
+    })
+
+
+def generate_submissions(quiz: CompiledQuiz, count: int, seed: int) -> List[Dict[str, int]]:
+    """Submissions that skip ~5% of questions and answer ~70% correctly"""
+    rng = random.Random(seed)
+    submissions = []
+    for _ in range(count):
+        answers = {}
+        for question in quiz.questions:
+            roll = rng.random()
+            if roll < 0.05:
+                continue
+            answers[question["id"]] = question["correct"] if roll < 0.75 else rng.randrange(4)
+        submissions.append(answers)
+    return submissions
+
+
+def legacy_score(questions: List[Dict], answers: Dict[str, int]) -> Dict:
+    """The original router/QuizService loop over question dicts"""
+    score = 0
+    topic_scores = {}
+    for question in questions:
+        is_correct = answers.get(question["id"], -1) == question["correct"]
+        if is_correct:
+            score += 1
+        topic = question["topic"]
+        if topic not in topic_scores:
+            topic_scores[topic] = {"correct": 0, "total": 0}
+        topic_scores[topic]["total"] += 1
+        if is_correct:
+            topic_scores[topic]["correct"] += 1
+    return {"score": score, "topic_scores": topic_scores}
+
+
+def timed(fn) -> float:
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark quiz scoring")
+    parser.add_argument("--submissions", type=int, default=100000)
+    parser.add_argument("--questions", type=int, default=20, help="Synthetic quiz size")
+    parser.add_argument("--topics", type=int, default=5, help="Synthetic quiz topic count")
+    parser.add_argument("--course", help="Use a real course quiz instead of a synthetic one")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    quiz = get_quiz_service().get_quiz(args.course) if args.course else synthetic_quiz(args.questions, args.topics, args.seed)
+    if not quiz:
+        raise SystemExit(f"No quiz for course {args.course}")
+    submissions = generate_submissions(quiz, args.submissions, args.seed + 1)
+
+    legacy_results: List[Dict] = []
+    single_results: List[Dict] = []
+    batch_results: List[Dict] = []
+
+    legacy_s = timed(lambda: legacy_results.extend(legacy_score(quiz.questions, s) for s in submissions))
+    single_s = timed(lambda: single_results.extend(score_submission(quiz, s) for s in submissions))
+    batch_s = timed(lambda: batch_results.extend(score_submissions(quiz, submissions)))
+
+    mismatches = 0
+    for legacy, single, batch in zip(legacy_results, single_results, batch_results):
+        legacy_topics = [legacy["topic_scores"][topic]["correct"] for topic in quiz.topics]
+        if not (legacy["score"] == single["score"] == batch["score"]
+                and legacy_topics == single["topic_correct"] == batch["topic_correct"]):
+            mismatches += 1
+
+    def rate(seconds: float) -> Dict[str, float]:
+        return {
+            "total_s": round(seconds, 4),
+            "per_submission_us": round(seconds / len(submissions) * 1e6, 3),
+            "submissions_per_s": round(len(submissions) / seconds) if seconds else None
+        }
+
+    print(json.dumps({
+        "quiz": quiz.course_id,
+        "questions": len(quiz),
+        "topics": len(quiz.topics),
+        "submissions": len(submissions),
+        "numpy": np is not None,
+        "legacy_loop": rate(legacy_s),
+        "engine_single": rate(single_s),
+        "engine_batch": rate(batch_s),
+        "batch_speedup": round(legacy_s / batch_s, 1) if batch_s else None,
+        "result_mismatches": mismatches
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
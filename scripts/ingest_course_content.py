@@ -0,0 +1,72 @@
+"""
+Course Content Ingestion Script
+Chunks raw course text or transcripts into the local knowledge base using
+RAG_CHUNK_SIZE / RAG_CHUNK_OVERLAP, optionally embedding and indexing the chunks.
+
+Usage:
+    python scripts/ingest_course_content.py xm-cloud-101 transcripts/module2.txt --module 2 --embed
+"""
+import argparse
+from pathlib import Path
+
+import sys
+sys.path.append(str(Path(__file__).parent.parent / "backend"))
+
+from dotenv import load_dotenv
+
+from services.ingestion import ingest_course_content, iter_file_lines
+
+# Load environment variables
+load_dotenv()
+
+
+def main():
+    """Main ingestion function"""
+    parser = argparse.ArgumentParser(description="Ingest raw course content into the knowledge base")
+    parser.add_argument("course_id", help="Course identifier, e.g. xm-cloud-101")
+    parser.add_argument("path", type=Path, help="Text or transcript file to ingest")
+    parser.add_argument("--source-id", help="Identifier used in chunk ids (defaults to the file name)")
+    parser.add_argument("--type", default="transcript", help="Chunk type: transcript, text, summary")
+    parser.add_argument("--topic", default="", help="Topic to tag every chunk with")
+    parser.add_argument("--module", type=int, help="Module number if the file has no module headings")
+    parser.add_argument("--chunk-size", type=int, help="Override RAG_CHUNK_SIZE")
+    parser.add_argument("--chunk-overlap", type=int, help="Override RAG_CHUNK_OVERLAP")
+    parser.add_argument("--embed", action="store_true", help="Generate embeddings and update the FAISS index")
+    args = parser.parse_args()
+
+    print("\n" + "="*50)
+    print("📥 CourseCompanion Content Ingestion")
+    print("="*50 + "\n")
+
+    embed_batch = None
+    if args.embed:
+        from generate_embeddings import EmbeddingGenerator
+        generator = EmbeddingGenerator()
+        embed_batch = generator.generate_embeddings_batch
+        print(f"🤖 Using model: {generator.model}\n")
+
+    stats = ingest_course_content(
+        course_id=args.course_id,
+        lines=iter_file_lines(args.path),
+        source_id=args.source_id or args.path.stem,
+        content_type=args.type,
+        topic=args.topic,
+        module=args.module,
+        chunk_size=args.chunk_size,
+        chunk_overlap=args.chunk_overlap,
+        embed_batch=embed_batch
+    )
+
+    print(f"  ✓ {stats['chunks']} chunks written for {stats['course_id']}")
+    if stats["replaced"]:
+        print(f"  ✓ {stats['replaced']} chunks from the previous ingest of this source replaced")
+    if args.embed:
+        print(f"  ✓ {stats['embedded']} chunks embedded (FAISS index updated: {stats['indexed']})")
+
+    print("\n" + "="*50)
+    print("✅ Ingestion complete!")
+    print("="*50 + "\n")
+
+
+if __name__ == "__main__":
+    main()